@@ -22,7 +22,17 @@ from google.adk.models import Gemini
 from google.genai import types
 from langchain_google_vertexai import VertexAIEmbeddings
 
-from {{cookiecutter.agent_directory}}.retrievers import get_compressor, get_retriever
+from {{cookiecutter.agent_directory}}.embeddings import BatchingEmbeddings
+from {{cookiecutter.agent_directory}}.retrieval_cache import RetrievalCache
+from {{cookiecutter.agent_directory}}.retrieval_pipeline import (
+    RetrievalPipeline,
+    Retriever,
+)
+from {{cookiecutter.agent_directory}}.retrievers import (
+    get_compressor,
+    get_local_retriever,
+    get_retriever,
+)
 from {{cookiecutter.agent_directory}}.templates import format_docs
 
 EMBEDDING_MODEL = "text-embedding-005"
@@ -36,8 +46,11 @@ os.environ["GOOGLE_CLOUD_LOCATION"] = LLM_LOCATION
 os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "True"
 
 vertexai.init(project=project_id, location=LOCATION)
-embedding = VertexAIEmbeddings(
-    project=project_id, location=LOCATION, model_name=EMBEDDING_MODEL
+# Query embeddings are memoized and concurrent misses are sent as one batch
+embedding = BatchingEmbeddings.from_env(
+    VertexAIEmbeddings(
+        project=project_id, location=LOCATION, model_name=EMBEDDING_MODEL
+    )
 )
 
 {% if cookiecutter.datastore_type == "vertex_ai_search" %}
@@ -78,9 +91,24 @@ retriever = get_retriever(
 compressor = get_compressor(
     project_id=project_id,
 )
+retrievers: dict[str, Retriever] = {"datastore": retriever}
+# Set LOCAL_INDEX_PATH to a process_data JSONL export to also query an in-process
+# index; its candidates are merged with the datastore's before the rerank
+local_index_path = os.getenv("LOCAL_INDEX_PATH")
+if local_index_path:
+    retrievers["local_index"] = get_local_retriever(local_index_path, embedding)
+# Candidates are fetched from every retriever concurrently and re-ranked with
+# Vertex AI Rank under deadlines set by RETRIEVAL_TIMEOUT_SECONDS and
+# RERANK_TIMEOUT_SECONDS
+retrieval_pipeline = RetrievalPipeline.from_env(
+    retrievers=retrievers, compressor=compressor
+)
+# Repeated queries reuse ranked results until the TTL expires or the ingestion
+# pipeline publishes a new datastore version to DATASTORE_VERSION_URI
+retrieval_cache = RetrievalCache.from_env(embedding=embedding)
 
 
-def retrieve_docs(query: str) -> str:
+async def retrieve_docs(query: str) -> str:
     """
     Useful for retrieving relevant documents based on a query.
     Use this when you need additional information to answer a question.
@@ -92,11 +120,9 @@ def retrieve_docs(query: str) -> str:
         str: Formatted string containing relevant document content retrieved and ranked based on the query.
     """
     try:
-        # Use the retriever to fetch relevant documents based on the query
-        retrieved_docs = retriever.invoke(query)
-        # Re-rank docs with Vertex AI Rank for better relevance
-        ranked_docs = compressor.compress_documents(
-            documents=retrieved_docs, query=query
+        # Fetch and re-rank documents concurrently without blocking the event loop
+        ranked_docs = await retrieval_cache.aget_or_retrieve(
+            query, retrieval_pipeline.aretrieve
         )
         # Format ranked documents into a consistent structure for LLM consumption
         formatted_docs = format_docs.format(docs=ranked_docs)
@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+
+from langchain_core.embeddings import Embeddings
+
+EmbedBatch = Callable[[list[str]], list[list[float]]]
+
+
+def _query_batch_fn(embeddings: Embeddings) -> EmbedBatch:
+    # VertexAIEmbeddings can embed several queries in one request; other models
+    # fall back to one call per text
+    embed = getattr(embeddings, "embed", None)
+    if embed is not None:
+        return lambda texts: embed(
+            texts, batch_size=len(texts), embeddings_task_type="RETRIEVAL_QUERY"
+        )
+    return lambda texts: [embeddings.embed_query(text) for text in texts]
+
+
+class BatchingEmbeddings(Embeddings):
+    """Embedding front-end that memoizes query embeddings and batches misses.
+
+    Query embeddings are cached by text hash in a bounded LRU. Misses from
+    concurrent callers are collected for up to ``batch_window`` seconds (or
+    until ``max_batch_size`` texts are waiting) and embedded in one request by
+    the first caller of the window, while the others wait for its result.
+    Document embeddings are passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        *,
+        batch_window: float = 0.005,
+        max_batch_size: int = 32,
+        cache_size: int = 4096,
+        embed_batch: EmbedBatch | None = None,
+    ) -> None:
+        """Initialize the front-end.
+
+        Args:
+            embeddings: Underlying embedding model
+            batch_window: Seconds to wait for more queries before sending a batch
+            max_batch_size: Queries that trigger an immediate batch
+            cache_size: Query embeddings kept in the LRU
+            embed_batch: Embeds a list of queries in one call; inferred when omitted
+        """
+        self.embeddings = embeddings
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.cache_size = cache_size
+        self.embed_batch = embed_batch or _query_batch_fn(embeddings)
+        self._cache: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, Future[list[float]]]] = []
+        self._window_open = False
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of query embeddings served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def embed_query(self, text: str) -> list[float]:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        future: Future[list[float]] = Future()
+        batch = None
+        lead_window = False
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+            self._pending.append((text, future))
+            if len(self._pending) >= self.max_batch_size:
+                batch, self._pending = self._pending, []
+            elif not self._window_open:
+                self._window_open = lead_window = True
+
+        if batch:
+            self._run_batch(batch)
+        if lead_window:
+            time.sleep(self.batch_window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._window_open = False
+            if batch:
+                self._run_batch(batch)
+        vector = future.result()
+        with self._lock:
+            self._cache[key] = vector
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return list(vector)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def _run_batch(self, batch: list[tuple[str, Future[list[float]]]]) -> None:
+        unique = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = dict(zip(unique, self.embed_batch(unique), strict=True))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        with self._lock:
+            self.batches += 1
+        for text, future in batch:
+            future.set_result(vectors[text])
+
+    @classmethod
+    def from_env(cls, embeddings: Embeddings) -> "BatchingEmbeddings":
+        """Wrap ``embeddings`` with settings from EMBEDDING_* environment variables."""
+        return cls(
+            embeddings,
+            batch_window=float(os.environ.get("EMBEDDING_BATCH_WINDOW_MS", 5)) / 1000,
+            max_batch_size=int(os.environ.get("EMBEDDING_MAX_BATCH_SIZE", 32)),
+            cache_size=int(os.environ.get("EMBEDDING_CACHE_SIZE", 4096)),
+        )
@@ -0,0 +1,366 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process vector index over the JSONL export produced by ``process_data``.
+
+Opt-in: when ``LOCAL_INDEX_PATH`` is set, the agent queries this index next to
+the Vertex AI datastore and the retrieval pipeline merges both result lists;
+``get_retriever`` also accepts ``local_index_path`` to use it instead of Vertex
+AI, e.g. in tests. The MagicMock fallback in ``retrievers.py`` still applies
+when Vertex AI is unavailable.
+Run ``python -m <agent_dir>.local_index <path>`` to measure recall@k of the
+approximate index against exact search.
+"""
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+# Corpora below this size are searched exhaustively, which is both exact and fast
+IVF_MIN_DOCUMENTS = 20000
+_CACHE_FILES = ("embeddings.npy", "documents.jsonl")
+_IVF_CACHE_FILES = ("centroids.npy", "list_order.npy", "list_offsets.npy")
+
+
+def _source_files(path: str | Path) -> list[Path]:
+    path = Path(path)
+    if path.is_dir():
+        return sorted(path.glob("*.jsonl"))
+    if any(char in path.name for char in "*?["):
+        return sorted(path.parent.glob(path.name))
+    return [path]
+
+
+def _parse_record(line: str) -> dict[str, Any]:
+    record = json.loads(line)
+    # BigQuery exports wrap the document in a json_data string column
+    if "json_data" in record:
+        record = json.loads(record["json_data"])
+    return record
+
+
+def build_index_cache(
+    source: str | Path, cache_dir: str | Path, embedding_field: str = "embedding"
+) -> None:
+    """Convert JSONL records into a memory-mappable embedding matrix.
+
+    Embeddings are L2-normalized and written as one float32 ``.npy`` matrix so
+    they can be memory-mapped instead of parsed on every start. The remaining
+    fields are kept line-aligned in ``documents.jsonl``.
+
+    Args:
+        source: JSONL file, directory of JSONL files, or glob pattern
+        cache_dir: Directory for the converted index files
+        embedding_field: Record field holding the embedding vector
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    vectors: list[list[float]] = []
+    with open(cache_dir / "documents.jsonl", "w", encoding="utf-8") as out:
+        for file in _source_files(source):
+            with open(file, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = _parse_record(line)
+                    vectors.append(record.pop(embedding_field))
+                    out.write(json.dumps(record) + "\n")
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.save(cache_dir / "embeddings.npy", matrix / np.where(norms == 0, 1, norms))
+    for name in _IVF_CACHE_FILES:
+        (cache_dir / name).unlink(missing_ok=True)
+
+
+def _default_n_lists(n_documents: int) -> int:
+    return int(np.sqrt(n_documents)) if n_documents >= IVF_MIN_DOCUMENTS else 0
+
+
+def _kmeans(
+    vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """Spherical k-means on a training sample, returning unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_clusters * 64)
+    sample = np.asarray(vectors[rng.choice(len(vectors), sample_size, replace=False)])
+    centroids = sample[rng.choice(sample_size, n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        for cluster in range(n_clusters):
+            members = sample[assignment == cluster]
+            if len(members):
+                centroids[cluster] = members.sum(axis=0)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+    return centroids
+
+
+@dataclass
+class _InvertedLists:
+    centroids: np.ndarray
+    order: np.ndarray
+    offsets: np.ndarray
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, n_lists: int) -> "_InvertedLists":
+        centroids = _kmeans(embeddings, n_lists)
+        assignment = np.empty(len(embeddings), dtype=np.int32)
+        # Assign in blocks to bound the size of the similarity matrix
+        for start in range(0, len(embeddings), 8192):
+            block = np.asarray(embeddings[start : start + 8192])
+            assignment[start : start + len(block)] = np.argmax(
+                block @ centroids.T, axis=1
+            )
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        return cls(centroids, order, offsets)
+
+
+class LocalVectorIndex:
+    """Cosine-similarity index over a (possibly memory-mapped) embedding matrix.
+
+    Small corpora are searched by brute force. From ``IVF_MIN_DOCUMENTS``
+    documents on, an inverted-file index groups vectors around k-means
+    centroids and only the ``n_probe`` lists closest to the query are scanned.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        documents: list[Document],
+        *,
+        n_lists: int | None = None,
+        n_probe: int = 8,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            embeddings: L2-normalized float32 matrix, one row per document
+            documents: Documents aligned with the embedding rows
+            n_lists: IVF list count; None picks sqrt(n) for large corpora, 0 disables IVF
+            n_probe: Lists scanned per query when IVF is enabled
+        """
+        if len(embeddings) != len(documents):
+            raise ValueError(
+                f"Got {len(embeddings)} embeddings for {len(documents)} documents"
+            )
+        self.embeddings = embeddings
+        self.documents = documents
+        self.n_probe = n_probe
+        if n_lists is None:
+            n_lists = _default_n_lists(len(documents))
+        self.ivf = _InvertedLists.build(embeddings, n_lists) if n_lists else None
+
+    @classmethod
+    def from_jsonl(
+        cls,
+        source: str | Path,
+        cache_dir: str | Path | None = None,
+        *,
+        embedding_field: str = "embedding",
+        content_field: str = "content",
+        n_lists: int | None = None,
+        n_probe: int = 8,
+    ) -> "LocalVectorIndex":
+        """Load the index from a ``process_data`` JSONL export.
+
+        The export is converted once into ``cache_dir`` (default: a
+        ``.local_index`` directory next to it) and memory-mapped on later loads.
+        The cache is rebuilt whenever a source file is newer than it.
+
+        Args:
+            source: JSONL file, directory of JSONL files, or glob pattern
+            cache_dir: Directory for the converted, memory-mappable files
+            embedding_field: Record field holding the embedding vector
+            content_field: Record field holding the document text
+            n_lists: IVF list count; None picks sqrt(n) for large corpora, 0 disables IVF
+            n_probe: Lists scanned per query when IVF is enabled
+
+        Returns:
+            LocalVectorIndex: Index over the exported documents
+        """
+        files = _source_files(source)
+        if not files or not all(file.exists() for file in files):
+            raise FileNotFoundError(f"No JSONL files found at {source}")
+        cache = Path(cache_dir) if cache_dir else files[0].parent / ".local_index"
+        source_mtime = max(file.stat().st_mtime for file in files)
+        if any(
+            not (cache / name).exists() or (cache / name).stat().st_mtime < source_mtime
+            for name in _CACHE_FILES
+        ):
+            logging.info(f"Building local vector index cache in {cache}")
+            build_index_cache(source, cache, embedding_field)
+
+        embeddings = np.load(cache / "embeddings.npy", mmap_mode="r")
+        documents = []
+        with open(cache / "documents.jsonl", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                content = record.pop(content_field, "")
+                documents.append(Document(page_content=content, metadata=record))
+
+        if n_lists is None:
+            n_lists = _default_n_lists(len(documents))
+        # The inverted lists are cached next to the embeddings, not rebuilt
+        index = cls(embeddings, documents, n_lists=0, n_probe=n_probe)
+        if not n_lists:
+            return index
+        cached = [cache / name for name in _IVF_CACHE_FILES]
+        if all(path.exists() for path in cached):
+            index.ivf = _InvertedLists(*(np.load(path) for path in cached))
+        if index.ivf is None or len(index.ivf.centroids) != n_lists:
+            index.ivf = _InvertedLists.build(embeddings, n_lists)
+            for path, array in zip(
+                cached,
+                (index.ivf.centroids, index.ivf.order, index.ivf.offsets),
+                strict=True,
+            ):
+                np.save(path, array)
+        return index
+
+    def search(
+        self, query: np.ndarray, k: int = 10, *, exact: bool = False
+    ) -> list[tuple[int, float]]:
+        """Return the ``k`` nearest documents as (row, cosine similarity) pairs.
+
+        Args:
+            query: Query embedding
+            k: Number of results
+            exact: Scan every vector even when an IVF index exists
+
+        Returns:
+            list[tuple[int, float]]: Matches ordered by decreasing similarity
+        """
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        if self.ivf is None or exact:
+            candidates = None
+            scores = self.embeddings @ query
+        else:
+            n_probe = min(self.n_probe, len(self.ivf.centroids))
+            lists = np.argpartition(self.ivf.centroids @ query, -n_probe)[-n_probe:]
+            candidates = np.concatenate(
+                [
+                    self.ivf.order[self.ivf.offsets[i] : self.ivf.offsets[i + 1]]
+                    for i in lists
+                ]
+            )
+            candidates.sort()
+            scores = self.embeddings[candidates] @ query
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(-scores[top])]
+        rows = top if candidates is None else candidates[top]
+        return [
+            (int(row), float(score))
+            for row, score in zip(rows, scores[top], strict=True)
+        ]
+
+
+class LocalIndexRetriever(BaseRetriever):
+    """LangChain retriever backed by a ``LocalVectorIndex``."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: LocalVectorIndex
+    embedding: Embeddings
+    k: int = 10
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        vector = np.asarray(self.embedding.embed_query(query), dtype=np.float32)
+        return [
+            self.index.documents[row].model_copy()
+            for row, _ in self.index.search(vector, self.k)
+        ]
+
+
+@dataclass
+class RecallReport:
+    """Result of ``evaluate_recall``."""
+
+    recall_at_k: float
+    approximate_p50_ms: float
+    exact_p50_ms: float
+
+
+def evaluate_recall(
+    index: LocalVectorIndex, queries: np.ndarray, k: int = 10
+) -> RecallReport:
+    """Measure recall@k and latency of the index against exhaustive search.
+
+    Args:
+        index: Index to evaluate
+        queries: Query embeddings, one per row
+        k: Number of neighbours compared per query
+
+    Returns:
+        RecallReport: Mean recall@k and median per-query latencies
+    """
+    recalls, approximate_ms, exact_ms = [], [], []
+    for query in queries:
+        started = time.perf_counter()
+        approximate = {row for row, _ in index.search(query, k)}
+        approximate_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        exact = {row for row, _ in index.search(query, k, exact=True)}
+        exact_ms.append((time.perf_counter() - started) * 1000)
+        recalls.append(len(approximate & exact) / max(len(exact), 1))
+    return RecallReport(
+        recall_at_k=float(np.mean(recalls)),
+        approximate_p50_ms=float(np.median(approximate_ms)),
+        exact_p50_ms=float(np.median(exact_ms)),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark recall@k of the local vector index"
+    )
+    parser.add_argument("source", help="process_data JSONL file, directory or glob")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--n-probe", type=int, default=8)
+    args = parser.parse_args()
+
+    benchmark_index = LocalVectorIndex.from_jsonl(
+        args.source, n_lists=args.n_lists, n_probe=args.n_probe
+    )
+    # Perturbed corpus vectors stand in for query embeddings
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(benchmark_index.documents), args.queries)
+    sample = np.asarray(benchmark_index.embeddings[rows])
+    sample += rng.normal(0, 0.01, sample.shape).astype(np.float32)
+    report = evaluate_recall(benchmark_index, sample, args.k)
+    print(
+        f"documents={len(benchmark_index.documents)} "
+        f"ivf_lists={0 if benchmark_index.ivf is None else len(benchmark_index.ivf.centroids)} "
+        f"recall@{args.k}={report.recall_at_k:.3f} "
+        f"approximate_p50={report.approximate_p50_ms:.2f}ms "
+        f"exact_p50={report.exact_p50_ms:.2f}ms"
+    )
@@ -0,0 +1,270 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+class QueryEmbedder(Protocol):
+    def embed_query(self, text: str) -> list[float]: ...
+
+
+@dataclass
+class _Entry:
+    docs: list[Document]
+    expires_at: float
+    vector: np.ndarray | None
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache key."""
+    return re.sub(r"\s+", " ", query).strip().strip("?.!").casefold()
+
+
+def read_version_marker(uri: str) -> str:
+    """Read the datastore version published by the ingestion pipeline.
+
+    Args:
+        uri: ``gs://`` object or local file holding the version string
+
+    Returns:
+        str: Version string, or an empty string if no version was published yet
+    """
+    if uri.startswith("gs://"):
+        from google.cloud import storage
+
+        bucket_name, _, blob_name = uri[5:].partition("/")
+        blob = storage.Client().bucket(bucket_name).get_blob(blob_name)
+        return blob.download_as_text().strip() if blob is not None else ""
+    path = Path(uri)
+    return path.read_text(encoding="utf-8").strip() if path.exists() else ""
+
+
+class RetrievalCache:
+    """Caches ranked retrieval results so repeated queries skip search and rerank.
+
+    Lookups first match the normalized query text. When an ``embedding`` is
+    given and no exact entry exists, the query is embedded and the closest
+    cached query is reused if its cosine similarity reaches
+    ``similarity_threshold``. Entries expire after ``ttl`` seconds, the least
+    recently used are evicted beyond ``max_entries``, and everything is dropped
+    when ``version_source`` reports a new datastore version. Results whose
+    ``degraded`` attribute is set (see ``RetrievalResult``) only live for
+    ``degraded_ttl`` seconds, and are not cached at all when it is 0.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        ttl: float = 600.0,
+        degraded_ttl: float = 30.0,
+        embedding: QueryEmbedder | None = None,
+        similarity_threshold: float = 0.95,
+        version_source: Callable[[], str] | None = None,
+        version_check_interval: float = 60.0,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached queries
+            ttl: Seconds a cached result stays valid
+            degraded_ttl: Seconds a degraded result stays valid
+            embedding: Embedding model enabling near-duplicate lookups
+            similarity_threshold: Minimum cosine similarity for a near-duplicate hit
+            version_source: Callable returning the current datastore version
+            version_check_interval: Minimum seconds between version checks
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.degraded_ttl = degraded_ttl
+        self.embedding = embedding
+        self.similarity_threshold = similarity_threshold
+        self.version_source = version_source
+        self.version_check_interval = version_check_interval
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: str | None = None
+        self._next_version_check = 0.0
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def get_or_retrieve(
+        self, query: str, retrieve: Callable[[str], list[Document]]
+    ) -> list[Document]:
+        """Return cached documents for ``query``, calling ``retrieve`` on a miss.
+
+        Args:
+            query: User query passed to the retrieval tool
+            retrieve: Callable running search and rerank for a query
+
+        Returns:
+            list[Document]: Ranked documents for the query
+        """
+        docs, key, vector = self._lookup(query)
+        if docs is not None:
+            return docs
+        docs = retrieve(query)
+        self._store(key, docs, vector)
+        return docs
+
+    async def aget_or_retrieve(
+        self, query: str, retrieve: Callable[[str], Awaitable[list[Document]]]
+    ) -> list[Document]:
+        """Async variant of ``get_or_retrieve`` for coroutine retrieval pipelines.
+
+        Args:
+            query: User query passed to the retrieval tool
+            retrieve: Coroutine function running search and rerank for a query
+
+        Returns:
+            list[Document]: Ranked documents for the query
+        """
+        # The lookup may call the embedding model, so keep it off the event loop
+        docs, key, vector = await asyncio.to_thread(self._lookup, query)
+        if docs is not None:
+            return docs
+        docs = await retrieve(query)
+        self._store(key, docs, vector)
+        return docs
+
+    def _lookup(
+        self, query: str
+    ) -> tuple[list[Document] | None, str, np.ndarray | None]:
+        self._check_version()
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is not None:
+                self.hits += 1
+                return list(entry.docs), key, entry.vector
+
+        vector = None
+        if self.embedding is not None:
+            vector = self._unit_vector(self.embedding.embed_query(key))
+            with self._lock:
+                entry = self._nearest_entry(vector, now)
+                if entry is not None:
+                    self.semantic_hits += 1
+                    return list(entry.docs), key, vector
+
+        with self._lock:
+            self.misses += 1
+        return None, key, vector
+
+    def _store(self, key: str, docs: list[Document], vector: np.ndarray | None) -> None:
+        ttl = self.degraded_ttl if getattr(docs, "degraded", False) else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = _Entry(list(docs), time.monotonic() + ttl, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def _live_entry(self, key: str, now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest_entry(self, vector: np.ndarray, now: float) -> _Entry | None:
+        candidates = [
+            (key, entry)
+            for key, entry in self._entries.items()
+            if entry.vector is not None and entry.expires_at > now
+        ]
+        if not candidates:
+            return None
+        scores = np.stack([entry.vector for _, entry in candidates]) @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        key, entry = candidates[best]
+        self._entries.move_to_end(key)
+        return entry
+
+    @staticmethod
+    def _unit_vector(values: list[float]) -> np.ndarray:
+        vector = np.asarray(values, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self) -> None:
+        if self.version_source is None or time.monotonic() < self._next_version_check:
+            return
+        self._next_version_check = time.monotonic() + self.version_check_interval
+        try:
+            version = self.version_source()
+        except Exception:
+            logging.warning("Could not read datastore version", exc_info=True)
+            return
+        if version != self._version:
+            if self._version is not None:
+                logging.info(
+                    f"Datastore version changed to {version!r}, clearing cache"
+                )
+            self.clear()
+            self._version = version
+
+    @classmethod
+    def from_env(cls, embedding: QueryEmbedder | None = None) -> "RetrievalCache":
+        """Build the cache from RETRIEVAL_CACHE_* and DATASTORE_VERSION_URI.
+
+        The near-duplicate tier costs one embedding call per exact miss, so it
+        is only enabled when RETRIEVAL_CACHE_SIMILARITY_THRESHOLD is set.
+
+        Args:
+            embedding: Embedding model used by the near-duplicate tier
+
+        Returns:
+            RetrievalCache: Configured cache
+        """
+        threshold = os.environ.get("RETRIEVAL_CACHE_SIMILARITY_THRESHOLD")
+        version_uri = os.environ.get("DATASTORE_VERSION_URI")
+        return cls(
+            max_entries=int(os.environ.get("RETRIEVAL_CACHE_MAX_ENTRIES", 256)),
+            ttl=float(os.environ.get("RETRIEVAL_CACHE_TTL_SECONDS", 600.0)),
+            degraded_ttl=float(
+                os.environ.get("RETRIEVAL_CACHE_DEGRADED_TTL_SECONDS", 30.0)
+            ),
+            embedding=embedding if threshold else None,
+            similarity_threshold=float(threshold) if threshold else 0.95,
+            version_source=(lambda: read_version_marker(version_uri))
+            if version_uri
+            else None,
+        )
@@ -0,0 +1,266 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from typing import Any, Protocol, TypeVar
+
+from langchain_core.documents import Document
+
+T = TypeVar("T")
+
+
+class Retriever(Protocol):
+    def invoke(self, input: str, **kwargs: Any) -> list[Document]: ...
+
+
+class Compressor(Protocol):
+    def compress_documents(
+        self, documents: Sequence[Document], query: str, **kwargs: Any
+    ) -> Sequence[Document]: ...
+
+
+class RetrievalResult(list[Document]):
+    """Documents returned by ``RetrievalPipeline.aretrieve``.
+
+    ``degraded`` is set when a retriever failed or the rerank was skipped, so
+    caches can avoid keeping a partial or un-reranked answer for long.
+    """
+
+    def __init__(self, documents: Sequence[Document] = (), degraded: bool = False):
+        super().__init__(documents)
+        self.degraded = degraded
+
+
+class LatencyTracker:
+    """Rolling window of call latencies used to decide when to hedge."""
+
+    def __init__(self, window: int = 100, min_samples: int = 10) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> float | None:
+        """Return the latency percentile, or None until enough samples exist."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    tracker: LatencyTracker,
+    *,
+    percentile: float = 95.0,
+    default_delay: float = 1.0,
+    max_attempts: int = 2,
+) -> T:
+    """Run ``call``, starting a duplicate whenever the previous one runs slow.
+
+    A new attempt is started each time the latest one exceeds the tracked
+    latency ``percentile`` (``default_delay`` until enough samples exist). The
+    first successful attempt wins and the rest are cancelled.
+
+    Args:
+        call: Factory for one attempt
+        tracker: Latency history of this call
+        percentile: Latency percentile after which to hedge
+        default_delay: Hedge delay used before the tracker has enough samples
+        max_attempts: Maximum concurrent attempts, including the first
+
+    Returns:
+        T: Result of the first attempt to succeed
+    """
+    delay = tracker.percentile(percentile) or default_delay
+    started = time.monotonic()
+    pending: set[asyncio.Future[T]] = set()
+    attempts = 0
+    try:
+        while True:
+            # Start an attempt on entry, after a slow attempt and after a failure
+            if attempts < max_attempts:
+                pending.add(asyncio.ensure_future(call()))
+                attempts += 1
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if attempts < max_attempts else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                tracker.record(time.monotonic() - started)
+                return succeeded[0].result()
+            if not pending and attempts >= max_attempts:
+                raise next(iter(done)).exception()  # type: ignore[misc]
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def merge_candidates(
+    results: Sequence[Sequence[Document]], max_documents: int
+) -> list[Document]:
+    """Interleave retriever results round-robin and drop duplicate content."""
+    merged: list[Document] = []
+    seen: set[str] = set()
+    for rank in range(max((len(docs) for docs in results), default=0)):
+        for docs in results:
+            if rank < len(docs) and docs[rank].page_content not in seen:
+                seen.add(docs[rank].page_content)
+                merged.append(docs[rank])
+    return merged[:max_documents]
+
+
+class RetrievalPipeline:
+    """Fans a query out to several retrievers concurrently, then reranks.
+
+    Each retriever call is hedged against its own latency history and bounded
+    by ``retrieval_timeout``; retrievers that fail or time out are skipped as
+    long as one returns results. The rerank is bounded by ``rerank_timeout``
+    and, if it fails or times out, the merged candidates are returned in
+    retrieval order instead. Results affected by either fallback are marked
+    ``degraded``.
+    """
+
+    def __init__(
+        self,
+        retrievers: Mapping[str, Retriever],
+        compressor: Compressor,
+        *,
+        retrieval_timeout: float = 5.0,
+        rerank_timeout: float = 2.0,
+        hedge_percentile: float = 95.0,
+        max_candidates: int = 20,
+        top_n: int = 5,
+    ) -> None:
+        """Initialize the pipeline.
+
+        Args:
+            retrievers: Named retrievers queried in parallel
+            compressor: Reranker applied to the merged candidates
+            retrieval_timeout: Seconds to wait for each retriever
+            rerank_timeout: Seconds to wait for the rerank before falling back
+            hedge_percentile: Latency percentile after which a retriever call is duplicated
+            max_candidates: Maximum merged candidates sent to the reranker
+            top_n: Documents returned when falling back to un-reranked results
+        """
+        self.retrievers = dict(retrievers)
+        self.compressor = compressor
+        self.retrieval_timeout = retrieval_timeout
+        self.rerank_timeout = rerank_timeout
+        self.hedge_percentile = hedge_percentile
+        self.max_candidates = max_candidates
+        self.top_n = top_n
+        self.latency = {name: LatencyTracker() for name in self.retrievers}
+        self.rerank_fallbacks = 0
+
+    async def aretrieve(self, query: str) -> RetrievalResult:
+        """Retrieve candidates from every retriever and rerank them.
+
+        Args:
+            query: Search query
+
+        Returns:
+            RetrievalResult: Reranked documents, or the top un-reranked
+            candidates marked ``degraded``
+        """
+        names = list(self.retrievers)
+        results = await asyncio.gather(
+            *(self._retrieve_from(name, query) for name in names),
+            return_exceptions=True,
+        )
+        candidates: list[list[Document]] = []
+        for name, result in zip(names, results, strict=True):
+            if isinstance(result, BaseException):
+                logging.warning(f"Retriever {name!r} failed: {result!r}")
+            else:
+                candidates.append(result)
+        if not candidates:
+            raise RuntimeError("All retrievers failed")
+        degraded = len(candidates) < len(names)
+        merged = merge_candidates(candidates, self.max_candidates)
+        if not merged:
+            return RetrievalResult(degraded=degraded)
+
+        try:
+            ranked = await asyncio.wait_for(
+                asyncio.to_thread(
+                    self.compressor.compress_documents, documents=merged, query=query
+                ),
+                timeout=self.rerank_timeout,
+            )
+        except Exception as e:
+            self.rerank_fallbacks += 1
+            logging.warning(f"Rerank failed, returning un-reranked results: {e!r}")
+            return RetrievalResult(merged[: self.top_n], degraded=True)
+        return RetrievalResult(ranked, degraded=degraded)
+
+    async def _retrieve_from(self, name: str, query: str) -> list[Document]:
+        retriever = self.retrievers[name]
+        return await asyncio.wait_for(
+            hedged(
+                lambda: asyncio.to_thread(retriever.invoke, query),
+                self.latency[name],
+                percentile=self.hedge_percentile,
+                default_delay=self.retrieval_timeout / 2,
+            ),
+            timeout=self.retrieval_timeout,
+        )
+
+    @classmethod
+    def from_env(
+        cls, retrievers: Mapping[str, Retriever], compressor: Compressor
+    ) -> "RetrievalPipeline":
+        """Build the pipeline with timeouts from RETRIEVAL_* environment variables."""
+        return cls(
+            retrievers,
+            compressor,
+            retrieval_timeout=float(os.environ.get("RETRIEVAL_TIMEOUT_SECONDS", 5.0)),
+            rerank_timeout=float(os.environ.get("RERANK_TIMEOUT_SECONDS", 2.0)),
+            hedge_percentile=float(os.environ.get("RETRIEVAL_HEDGE_PERCENTILE", 95.0)),
+        )
+
+
+class InMemoryRetriever:
+    """Offline stand-in retriever ranking documents by query term overlap.
+
+    ``latency`` adds a fixed delay per call to simulate a remote backend.
+    """
+
+    def __init__(
+        self, documents: Sequence[Document], *, latency: float = 0.0, top_k: int = 10
+    ) -> None:
+        self.documents = list(documents)
+        self.latency = latency
+        self.top_k = top_k
+
+    def invoke(self, input: str, **kwargs: Any) -> list[Document]:
+        if self.latency:
+            time.sleep(self.latency)
+        terms = set(re.findall(r"\w+", input.lower()))
+        scored = [
+            (len(terms & set(re.findall(r"\w+", doc.page_content.lower()))), i)
+            for i, doc in enumerate(self.documents)
+        ]
+        ranked = sorted((s for s in scored if s[0] > 0), key=lambda s: (-s[0], s[1]))
+        return [self.documents[i] for _, i in ranked[: self.top_k]]
@@ -18,6 +18,8 @@ import os
 from unittest.mock import MagicMock
 from langchain_google_community.vertex_rank import VertexAIRank
 from langchain_google_vertexai import VertexAIEmbeddings
+
+from {{cookiecutter.agent_directory}}.local_index import LocalIndexRetriever, LocalVectorIndex
 {% if cookiecutter.datastore_type == "vertex_ai_search" -%}
 from langchain_google_community import VertexAISearchRetriever
 
@@ -30,13 +32,17 @@ def get_retriever(
     embedding_column: str = "embedding",
     max_documents: int = 10,
     custom_embedding_ratio: float = 0.5,
-) -> VertexAISearchRetriever:
+    local_index_path: str | None = None,
+) -> VertexAISearchRetriever | LocalIndexRetriever:
     """
     Creates and returns an instance of the retriever service.
 
     Uses mock service if the INTEGRATION_TEST environment variable is set to "TRUE",
-    otherwise initializes real Vertex AI retriever.
+    otherwise initializes real Vertex AI retriever. If local_index_path points to
+    a process_data JSONL export, an in-process index over it is used instead.
     """
+    if local_index_path:
+        return get_local_retriever(local_index_path, embedding, max_documents)
     try:
         return VertexAISearchRetriever(
             project_id=project_id,
@@ -76,10 +82,16 @@ def get_retriever(
     vector_search_index: str,
     vector_search_index_endpoint: str,
     embedding: VertexAIEmbeddings,
-) -> VectorStoreRetriever:
+    local_index_path: str | None = None,
+) -> VectorStoreRetriever | LocalIndexRetriever:
     """
     Creates and returns an instance of the retriever service.
+
+    If local_index_path points to a process_data JSONL export, an in-process
+    index over it is used instead of Vertex AI Vector Search.
     """
+    if local_index_path:
+        return get_local_retriever(local_index_path, embedding)
     try:
         aiplatform.init(
             project=project_id,
@@ -113,6 +125,21 @@ def get_retriever(
         return retriever
 {% endif %}
 
+def get_local_retriever(
+    local_index_path: str, embedding: VertexAIEmbeddings, max_documents: int = 10
+) -> LocalIndexRetriever:
+    """
+    Creates a retriever over a local, memory-mapped copy of the exported documents.
+
+    Useful for local development and tests without a deployed datastore.
+    """
+    return LocalIndexRetriever(
+        index=LocalVectorIndex.from_jsonl(local_index_path),
+        embedding=embedding,
+        k=max_documents,
+    )
+
+
 def get_compressor(project_id: str, top_n: int = 5) -> VertexAIRank:
     """
     Creates and returns an instance of the compressor service.
@@ -12,17 +12,74 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from langchain_core.prompts import (
-    PromptTemplate,
-)
+import os
+from collections.abc import Iterable
+
+from langchain_core.documents import Document
+
+
+class DocumentFormatter:
+    """Formats retrieved documents into the context block sent to the LLM.
+
+    The document template is split around ``{content}`` once at construction,
+    so formatting only fills in indices and concatenates strings; document
+    text is copied verbatim and never parsed as a template. When ``max_chars``
+    is set, documents are added until the budget is spent and the one that
+    crosses it is cut short, so later documents are never read.
+    """
+
+    def __init__(
+        self,
+        header: str = "## Context provided:\n",
+        document_template: str = "\n<Document {index}>\n{content}\n</Document {index}>\n",
+        max_chars: int | None = None,
+        truncation_marker: str = "\n[...]",
+    ) -> None:
+        """Initialize the formatter.
+
+        Args:
+            header: Text placed before the documents
+            document_template: Per-document template with ``{index}`` and ``{content}``
+            max_chars: Character budget for the whole output (about 4 characters per token)
+            truncation_marker: Appended to a document cut short by the budget
+        """
+        self.header = header
+        self.max_chars = max_chars
+        self.truncation_marker = truncation_marker
+        self._prefix, self._suffix = document_template.split("{content}")
+
+    def format(self, docs: Iterable[Document], max_chars: int | None = None) -> str:
+        """Format documents, truncating once the character budget is reached.
+
+        Args:
+            docs: Ranked documents, most relevant first
+            max_chars: Overrides the formatter's character budget
+
+        Returns:
+            str: Formatted context
+        """
+        budget = max_chars if max_chars is not None else self.max_chars
+        parts = [self.header]
+        remaining = budget - len(self.header) if budget is not None else None
+        for index, doc in enumerate(docs):
+            prefix = self._prefix.format(index=index)
+            suffix = self._suffix.format(index=index)
+            content = doc.page_content
+            if remaining is not None:
+                room = remaining - len(prefix) - len(suffix)
+                if room <= len(self.truncation_marker):
+                    break
+                if len(content) > room:
+                    content = (
+                        content[: room - len(self.truncation_marker)]
+                        + self.truncation_marker
+                    )
+                remaining -= len(prefix) + len(content) + len(suffix)
+            parts += (prefix, content, suffix)
+        return "".join(parts)
+
 
-format_docs = PromptTemplate.from_template(
-    """## Context provided:
-{% for doc in docs%}
-<Document {{ loop.index0 }}>
-{{ doc.page_content | safe }}
-</Document {{ loop.index0 }}>
-{% endfor %}
-""",
-    template_format="jinja2",
+# Cap the context at ~8k tokens by default; override with RETRIEVAL_CONTEXT_MAX_CHARS
+format_docs = DocumentFormatter(
+    max_chars=int(os.environ.get("RETRIEVAL_CONTEXT_MAX_CHARS", 32000))
 )
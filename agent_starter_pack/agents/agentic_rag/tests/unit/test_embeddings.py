@@ -0,0 +1,72 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from {{cookiecutter.agent_directory}}.embeddings import BatchingEmbeddings
+
+
+class LengthEmbeddings(Embeddings):
+    """Stand-in model embedding each text as its length, recording batch calls."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    def embed(self, texts: list[str], **kwargs: object) -> list[list[float]]:
+        self.batches.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed([text])[0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed(texts)
+
+
+def test_repeated_queries_are_memoized() -> None:
+    model = LengthEmbeddings()
+    embeddings = BatchingEmbeddings(model, batch_window=0)
+
+    assert embeddings.embed_query("abc") == [3.0]
+    assert embeddings.embed_query("abc") == [3.0]
+
+    assert len(model.batches) == 1
+    assert embeddings.hit_rate == 0.5
+
+
+def test_concurrent_queries_share_a_batch() -> None:
+    model = LengthEmbeddings()
+    embeddings = BatchingEmbeddings(model, batch_window=0.2, max_batch_size=8)
+    texts = ["a" * n for n in range(1, 9)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        vectors = list(pool.map(embeddings.embed_query, texts))
+
+    assert vectors == [[float(n)] for n in range(1, 9)]
+    assert len(model.batches) < len(texts)
+    assert sorted(text for batch in model.batches for text in batch) == texts
+
+
+def test_batch_errors_reach_every_caller() -> None:
+    class FailingEmbeddings(LengthEmbeddings):
+        def embed(self, texts: list[str], **kwargs: object) -> list[list[float]]:
+            raise RuntimeError("quota exceeded")
+
+    embeddings = BatchingEmbeddings(FailingEmbeddings(), batch_window=0)
+
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        embeddings.embed_query("abc")
@@ -0,0 +1,99 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from {{cookiecutter.agent_directory}}.local_index import (
+    LocalIndexRetriever,
+    LocalVectorIndex,
+    evaluate_recall,
+)
+
+
+class FixedEmbedding(Embeddings):
+    """Embeds every query as the vector it was constructed with."""
+
+    def __init__(self, vector: np.ndarray) -> None:
+        self.vector = vector
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.vector.tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.vector.tolist() for _ in texts]
+
+
+@pytest.fixture
+def corpus(tmp_path: Path) -> tuple[Path, np.ndarray]:
+    """Write a clustered corpus in the BigQuery JSONL export format."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 32))
+    vectors = centers[rng.integers(0, 20, 2000)] + rng.normal(0, 0.1, (2000, 32))
+    export = tmp_path / "export"
+    export.mkdir()
+    with open(export / "000000000000.jsonl", "w") as f:
+        for i, vector in enumerate(vectors):
+            document = {
+                "id": f"q{i}__0",
+                "embedding": vector.tolist(),
+                "content": f"doc {i}",
+            }
+            f.write(
+                json.dumps({"id": f"q{i}__0", "json_data": json.dumps(document)}) + "\n"
+            )
+    return export, vectors
+
+
+def test_loads_export_memory_mapped(corpus: tuple[Path, np.ndarray]) -> None:
+    export, vectors = corpus
+
+    index = LocalVectorIndex.from_jsonl(export)
+
+    assert isinstance(index.embeddings, np.memmap)
+    assert index.ivf is None
+    row, score = index.search(vectors[42], k=1)[0]
+    assert row == 42
+    assert score == pytest.approx(1.0, abs=1e-5)
+    assert index.documents[row].metadata["id"] == "q42__0"
+
+
+def test_ivf_recall_against_exact_search(corpus: tuple[Path, np.ndarray]) -> None:
+    export, vectors = corpus
+
+    index = LocalVectorIndex.from_jsonl(export, n_lists=20, n_probe=4)
+    reloaded = LocalVectorIndex.from_jsonl(export, n_lists=20, n_probe=4)
+
+    assert index.ivf is not None and reloaded.ivf is not None
+    np.testing.assert_array_equal(index.ivf.order, reloaded.ivf.order)
+    report = evaluate_recall(index, vectors[:50], k=10)
+    assert report.recall_at_k >= 0.9
+
+
+def test_retriever_returns_documents(corpus: tuple[Path, np.ndarray]) -> None:
+    export, vectors = corpus
+    retriever = LocalIndexRetriever(
+        index=LocalVectorIndex.from_jsonl(export),
+        embedding=FixedEmbedding(vectors[7]),
+        k=3,
+    )
+
+    docs = retriever.invoke("anything")
+
+    assert len(docs) == 3
+    assert docs[0].page_content == "doc 7"
@@ -0,0 +1,124 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+import pytest
+from langchain_core.documents import Document
+
+from {{cookiecutter.agent_directory}}.retrieval_cache import RetrievalCache
+from {{cookiecutter.agent_directory}}.retrieval_pipeline import (
+    InMemoryRetriever,
+    RetrievalPipeline,
+)
+
+
+class CountingRetriever:
+    """Stand-in for search + rerank that counts round trips."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, query: str) -> list[Document]:
+        self.calls += 1
+        return [Document(page_content=f"answer to {query}")]
+
+
+class KeywordEmbedding:
+    """Embeds queries by keyword presence so paraphrases land close together."""
+
+    keywords = ("pandas", "csv", "json", "save")
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(word in text) for word in self.keywords]
+
+
+def test_normalized_repeat_skips_retrieval() -> None:
+    retrieve = CountingRetriever()
+    cache = RetrievalCache()
+
+    first = cache.get_or_retrieve("How to save a CSV?", retrieve)
+    second = cache.get_or_retrieve("  how to save a csv ", retrieve)
+
+    assert retrieve.calls == 1
+    assert second == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_similar_query_hits_semantic_tier() -> None:
+    retrieve = CountingRetriever()
+    cache = RetrievalCache(embedding=KeywordEmbedding(), similarity_threshold=0.99)
+
+    cache.get_or_retrieve("save pandas dataframe to csv", retrieve)
+    cache.get_or_retrieve("pandas: save as csv file", retrieve)
+    cache.get_or_retrieve("save pandas dataframe to json", retrieve)
+
+    assert retrieve.calls == 2
+    assert cache.semantic_hits == 1
+
+
+def test_expired_and_evicted_entries_are_refetched() -> None:
+    retrieve = CountingRetriever()
+    cache = RetrievalCache(max_entries=1, ttl=0)
+
+    cache.get_or_retrieve("a", retrieve)
+    cache.get_or_retrieve("a", retrieve)
+
+    assert retrieve.calls == 2
+
+
+def test_new_datastore_version_invalidates_cache() -> None:
+    retrieve = CountingRetriever()
+    version = ["v1"]
+    cache = RetrievalCache(version_source=lambda: version[0], version_check_interval=0)
+
+    cache.get_or_retrieve("q", retrieve)
+    cache.get_or_retrieve("q", retrieve)
+    version[0] = "v2"
+    cache.get_or_retrieve("q", retrieve)
+
+    assert retrieve.calls == 2
+
+
+class SlowCompressor:
+    """Stand-in reranker that times out until ``healthy`` is set."""
+
+    def __init__(self) -> None:
+        self.healthy = False
+
+    def compress_documents(self, documents: list[Document], query: str) -> list:
+        if not self.healthy:
+            time.sleep(0.5)
+        return list(documents)
+
+
+@pytest.mark.asyncio
+async def test_degraded_results_are_not_kept_for_the_full_ttl() -> None:
+    compressor = SlowCompressor()
+    pipeline = RetrievalPipeline(
+        {"search": InMemoryRetriever([Document(page_content="save csv")])},
+        compressor,
+        rerank_timeout=0.05,
+    )
+    cache = RetrievalCache(degraded_ttl=0)
+
+    degraded = await cache.aget_or_retrieve("save csv", pipeline.aretrieve)
+    compressor.healthy = True
+    await cache.aget_or_retrieve("save csv", pipeline.aretrieve)
+    await cache.aget_or_retrieve("save csv", pipeline.aretrieve)
+
+    assert degraded.degraded
+    assert pipeline.rerank_fallbacks == 1
+    # The un-reranked result was not cached; the reranked one was
+    assert (cache.hits, cache.misses) == (1, 2)
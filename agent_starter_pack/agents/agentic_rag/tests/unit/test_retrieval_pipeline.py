@@ -0,0 +1,108 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from collections.abc import Sequence
+
+import pytest
+from langchain_core.documents import Document
+
+from {{cookiecutter.agent_directory}}.retrieval_pipeline import (
+    InMemoryRetriever,
+    LatencyTracker,
+    RetrievalPipeline,
+    hedged,
+)
+
+DOCS = [
+    Document(page_content="save a pandas dataframe to csv with to_csv"),
+    Document(page_content="read a csv file into pandas with read_csv"),
+    Document(page_content="write json with the json module"),
+]
+
+
+class ReverseCompressor:
+    """Stand-in reranker that reverses candidates, optionally after a delay."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+
+    def compress_documents(
+        self, documents: Sequence[Document], query: str
+    ) -> list[Document]:
+        time.sleep(self.latency)
+        return list(reversed(documents))
+
+
+class FailingRetriever:
+    def invoke(self, input: str) -> list[Document]:
+        raise ConnectionError("backend unavailable")
+
+
+@pytest.mark.asyncio
+async def test_merges_retrievers_and_reranks() -> None:
+    pipeline = RetrievalPipeline(
+        {
+            "search": InMemoryRetriever(DOCS[:2], latency=0.1),
+            "vector": InMemoryRetriever(DOCS, latency=0.1),
+            "broken": FailingRetriever(),
+        },
+        ReverseCompressor(),
+    )
+
+    started = time.monotonic()
+    docs = await pipeline.aretrieve("pandas csv")
+
+    assert time.monotonic() - started < 0.2
+    assert [doc.page_content for doc in docs] == [
+        DOCS[1].page_content,
+        DOCS[0].page_content,
+    ]
+    # A failed retriever leaves the result partial
+    assert docs.degraded
+
+
+@pytest.mark.asyncio
+async def test_rerank_timeout_falls_back_to_candidates() -> None:
+    pipeline = RetrievalPipeline(
+        {"search": InMemoryRetriever(DOCS)},
+        ReverseCompressor(latency=0.5),
+        rerank_timeout=0.05,
+        top_n=1,
+    )
+
+    docs = await pipeline.aretrieve("pandas csv")
+
+    assert docs == [DOCS[0]]
+    assert docs.degraded
+    assert pipeline.rerank_fallbacks == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged() -> None:
+    latencies = iter([1.0, 0.01])
+    calls = 0
+
+    async def call() -> float:
+        nonlocal calls
+        calls += 1
+        latency = next(latencies)
+        await asyncio.sleep(latency)
+        return latency
+
+    result = await hedged(call, LatencyTracker(), default_delay=0.05)
+
+    assert result == 0.01
+    assert calls == 2
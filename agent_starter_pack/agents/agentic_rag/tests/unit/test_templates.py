@@ -0,0 +1,40 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from langchain_core.documents import Document
+
+from {{cookiecutter.agent_directory}}.templates import DocumentFormatter, format_docs
+
+
+def test_formats_documents_verbatim() -> None:
+    docs = [Document(page_content="a <b> {x}"), Document(page_content="c")]
+
+    assert format_docs.format(docs=docs) == (
+        "## Context provided:\n"
+        "\n<Document 0>\na <b> {x}\n</Document 0>\n"
+        "\n<Document 1>\nc\n</Document 1>\n"
+    )
+
+
+def test_budget_truncates_and_drops_documents() -> None:
+    formatter = DocumentFormatter(max_chars=120)
+    docs = [Document(page_content="x" * 30), Document(page_content="y" * 100)]
+    docs.append(Document(page_content="never read"))
+
+    formatted = formatter.format(docs)
+
+    assert len(formatted) <= 120
+    assert "x" * 30 in formatted
+    assert formatted.endswith("[...]\n</Document 1>\n")
+    assert "never read" not in formatted
@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from google.genai import types
+
+from {{cookiecutter.agent_directory}}.app_utils.artifact_service import (
+    LocalBlobStore,
+    StreamingArtifactService,
+    create_artifact_service,
+)
+
+
+@pytest.fixture
+def service(tmp_path: Path) -> StreamingArtifactService:
+    return StreamingArtifactService(
+        LocalBlobStore(tmp_path, chunk_size=4), cache_item_max_bytes=16
+    )
+
+
+@pytest.mark.asyncio
+async def test_round_trip_keeps_versions_and_metadata(
+    service: StreamingArtifactService,
+) -> None:
+    scope = {"app_name": "app", "user_id": "u", "session_id": "s"}
+    image = types.Part.from_bytes(data=b"\x89PNG" * 10, mime_type="image/png")
+
+    first = await service.save_artifact(filename="img.png", artifact=image, **scope)
+    second = await service.save_artifact(
+        filename="img.png",
+        artifact=types.Part(text="caption"),
+        custom_metadata={"source": "test"},
+        **scope,
+    )
+
+    assert (first, second) == (0, 1)
+    assert await service.list_versions(filename="img.png", **scope) == [0, 1]
+    loaded = await service.load_artifact(filename="img.png", version=0, **scope)
+    assert loaded is not None and loaded.inline_data is not None
+    assert loaded.inline_data.data == b"\x89PNG" * 10
+    latest = await service.load_artifact(filename="img.png", **scope)
+    assert latest is not None and latest.text == "caption"
+    info = await service.get_artifact_version(filename="img.png", **scope)
+    assert info is not None and info.custom_metadata == {"source": "test"}
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_small_artifacts_are_served_from_memory(
+    service: StreamingArtifactService,
+) -> None:
+    scope = {"app_name": "app", "user_id": "u", "session_id": "s"}
+    await service.save_artifact(
+        filename="small.txt", artifact=types.Part(text="hi"), **scope
+    )
+    await service.save_artifact(
+        filename="large.txt", artifact=types.Part(text="x" * 100), **scope
+    )
+
+    for filename in ("small.txt", "large.txt"):
+        await service.load_artifact(filename=filename, version=0, **scope)
+
+    assert (service.hits, service.misses) == (1, 1)
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_get_distinct_versions(
+    service: StreamingArtifactService,
+) -> None:
+    scope = {"app_name": "app", "user_id": "u", "filename": "user:notes.txt"}
+
+    versions = await asyncio.gather(
+        *(
+            service.save_artifact(artifact=types.Part(text=str(i)), **scope)
+            for i in range(5)
+        )
+    )
+
+    assert sorted(versions) == [0, 1, 2, 3, 4]
+    keys = await service.list_artifact_keys(app_name="app", user_id="u", session_id="s")
+    assert keys == ["user:notes.txt"]
+    await service.delete_artifact(**scope)
+    assert await service.list_versions(**scope) == []
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_temporary_store_is_removed_on_close(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv("ARTIFACTS_DIR", raising=False)
+    service = create_artifact_service(None)
+    assert isinstance(service, StreamingArtifactService)
+    root = service.store.root
+
+    await service.save_artifact(
+        app_name="app",
+        user_id="u",
+        session_id="s",
+        filename="note.txt",
+        artifact=types.Part(text="hello"),
+    )
+    assert any(root.rglob("*"))
+
+    await service.close()
+    assert not root.exists()
@@ -0,0 +1,87 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from {{cookiecutter.agent_directory}}.app_utils.log_sink import (
+    BatchingLogSink,
+    create_log_sink,
+)
+
+
+def test_records_are_written_in_batches() -> None:
+    batches: list[list] = []
+    sink = BatchingLogSink(batches.append, max_batch_size=3, flush_interval=5.0)
+
+    for score in range(7):
+        sink.log_struct({"score": score})
+    sink.close()
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert batches[0][0] == ({"score": 0}, "INFO")
+
+
+def test_log_struct_does_not_wait_for_writer() -> None:
+    writing = threading.Event()
+    release = threading.Event()
+
+    def blocked_writer(_batch: list) -> None:
+        writing.set()
+        release.wait()
+
+    sink = BatchingLogSink(blocked_writer, flush_interval=0.01)
+    sink.log_struct({"score": -1})
+    assert writing.wait(timeout=5)
+
+    # The writer is stuck until release is set, so these must not wait on it
+    logger = threading.Thread(
+        target=lambda: [sink.log_struct({"score": score}) for score in range(50)]
+    )
+    logger.start()
+    logger.join(timeout=5)
+
+    assert not logger.is_alive()
+    release.set()
+    sink.close()
+
+
+def test_full_queue_drops_instead_of_blocking() -> None:
+    release = threading.Event()
+    sink = BatchingLogSink(
+        lambda _batch: release.wait(), max_batch_size=1, max_queue_size=2
+    )
+
+    for score in range(10):
+        sink.log_struct({"score": score})
+
+    assert sink.dropped > 0
+    release.set()
+    sink.close()
+
+
+def test_file_stand_in(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    log_file = tmp_path / "feedback.jsonl"
+    monkeypatch.setenv("LOG_SINK", str(log_file))
+    sink = create_log_sink(__name__)
+
+    sink.log_struct({"score": 5, "text": "great"}, severity="INFO")
+    sink.flush()
+
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert records == [{"score": 5, "text": "great", "severity": "INFO"}]
+    sink.close()
@@ -0,0 +1,126 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions import InMemorySessionService
+
+from {{cookiecutter.agent_directory}}.app_utils.session_cache import CachedSessionService
+
+
+class CountingSessionService(InMemorySessionService):
+    """In-memory backend that counts reads and event appends."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gets = 0
+        self.appends = 0
+
+    async def get_session(self, **kwargs):  # type: ignore[override]
+        self.gets += 1
+        return await super().get_session(**kwargs)
+
+    async def append_event(self, session, event):  # type: ignore[override]
+        self.appends += 1
+        return await super().append_event(session, event)
+
+
+def _event(text: str, **state: str) -> Event:
+    return Event(
+        author="user",
+        invocation_id="inv",
+        custom_metadata={"text": text},
+        actions=EventActions(state_delta=state),
+    )
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_cache() -> None:
+    backend = CountingSessionService()
+    cache = CachedSessionService(backend)
+    session = await cache.create_session(app_name="app", user_id="u")
+
+    for _ in range(3):
+        await cache.get_session(app_name="app", user_id="u", session_id=session.id)
+
+    assert backend.gets == 0
+    assert cache.hits == 3
+
+
+@pytest.mark.asyncio
+async def test_appends_are_buffered_until_flush() -> None:
+    backend = CountingSessionService()
+    cache = CachedSessionService(backend, max_staleness=60)
+    session = await cache.create_session(app_name="app", user_id="u")
+
+    await cache.append_event(session, _event("a", color="red"))
+    await cache.append_event(session, _event("b"))
+    assert backend.appends == 0
+
+    cached = await cache.get_session(app_name="app", user_id="u", session_id=session.id)
+    assert cached is not None
+    assert len(cached.events) == 2
+    assert cached.state["color"] == "red"
+
+    await cache.close()
+    stored = await backend.get_session(
+        app_name="app", user_id="u", session_id=session.id
+    )
+    assert backend.appends == 2
+    assert stored is not None
+    assert len(stored.events) == 2
+    assert stored.state["color"] == "red"
+
+
+@pytest.mark.asyncio
+async def test_batch_size_triggers_flush() -> None:
+    backend = CountingSessionService()
+    cache = CachedSessionService(backend, max_staleness=60, max_batch_size=2)
+    session = await cache.create_session(app_name="app", user_id="u")
+
+    await cache.append_event(session, _event("a"))
+    await asyncio.sleep(0.05)
+    assert backend.appends == 0
+
+    await cache.append_event(session, _event("b"))
+
+    async def backend_flushed() -> None:
+        while backend.appends < 2:
+            await asyncio.sleep(0.01)
+
+    # The flush runs in a background task; wait for it without flushing ourselves
+    await asyncio.wait_for(backend_flushed(), timeout=5)
+
+    assert backend.appends == 2
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_miss_flushes_before_reading_backend() -> None:
+    backend = CountingSessionService()
+    cache = CachedSessionService(backend, max_sessions=1, max_staleness=60)
+    first = await cache.create_session(app_name="app", user_id="u")
+    await cache.append_event(first, _event("a"))
+    # Creating a second session evicts the first from the read cache
+    await cache.create_session(app_name="app", user_id="u")
+
+    session = await cache.get_session(app_name="app", user_id="u", session_id=first.id)
+
+    assert session is not None
+    assert len(session.events) == 1
+    assert cache.misses == 1
+    await cache.close()
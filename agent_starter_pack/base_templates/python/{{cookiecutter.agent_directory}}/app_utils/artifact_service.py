@@ -0,0 +1,621 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import functools
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TypeVar
+from urllib.parse import urlparse
+
+from google.adk.artifacts.base_artifact_service import BaseArtifactService
+from google.genai import types
+
+try:
+    from google.adk.artifacts.base_artifact_service import ArtifactVersion
+    from google.adk.cli.service_registry import get_service_registry
+except ImportError:  # google-adk < 1.17 has no version metadata or service registry
+    ArtifactVersion = None
+    get_service_registry = None
+
+T = TypeVar("T")
+
+# Resumable upload chunks must be a multiple of 256 KiB
+_CHUNK_ALIGNMENT = 256 * 1024
+# Metadata keys shared with ADK's GcsArtifactService so either can read the other
+_DISPLAY_NAME_KEY = "adkDisplayName"
+_IS_TEXT_KEY = "adkIsText"
+_FILE_URI_KEY = "adkFileUri"
+_INTERNAL_KEYS = {_DISPLAY_NAME_KEY, _IS_TEXT_KEY, _FILE_URI_KEY}
+_MAX_SAVE_ATTEMPTS = 10
+
+
+@dataclass
+class BlobInfo:
+    """Metadata of one stored artifact version."""
+
+    uri: str
+    content_type: str | None
+    create_time: float
+    metadata: dict[str, str] = field(default_factory=dict)
+
+
+class GcsBlobStore:
+    """Blob store on a GCS bucket using chunked, resumable uploads.
+
+    Payloads larger than ``chunk_size`` go through a resumable upload session
+    in ``chunk_size`` pieces, so a transient error only retries one chunk.
+    """
+
+    def __init__(self, bucket_name: str, chunk_size: int = 8 * 1024 * 1024) -> None:
+        self.bucket_name = bucket_name.removeprefix("gs://")
+        self.chunk_size = max(
+            _CHUNK_ALIGNMENT, chunk_size - chunk_size % _CHUNK_ALIGNMENT
+        )
+        self._bucket: Any = None
+
+    @property
+    def bucket(self) -> Any:
+        # Created lazily so the store can be pickled for Agent Engine deployment
+        if self._bucket is None:
+            from google.cloud import storage
+
+            self._bucket = storage.Client().bucket(self.bucket_name)
+        return self._bucket
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**self.__dict__, "_bucket": None}
+
+    def upload(
+        self,
+        name: str,
+        data: bytes,
+        content_type: str | None,
+        metadata: dict[str, str],
+    ) -> None:
+        """Create a blob, raising FileExistsError if the name is taken."""
+        from google.api_core import exceptions
+
+        chunk_size = self.chunk_size if len(data) > self.chunk_size else None
+        blob = self.bucket.blob(name, chunk_size=chunk_size)
+        blob.metadata = metadata or None
+        try:
+            blob.upload_from_file(
+                io.BytesIO(data),
+                size=len(data),
+                content_type=content_type,
+                if_generation_match=0,
+            )
+        except exceptions.PreconditionFailed as e:
+            raise FileExistsError(name) from e
+
+    def download(self, name: str) -> tuple[bytes, BlobInfo] | None:
+        blob = self.bucket.get_blob(name)
+        if blob is None:
+            return None
+        if blob.size and blob.size > self.chunk_size:
+            blob.chunk_size = self.chunk_size
+        return blob.download_as_bytes(), self._info(blob)
+
+    def stat(self, name: str) -> BlobInfo | None:
+        blob = self.bucket.get_blob(name)
+        return self._info(blob) if blob is not None else None
+
+    def list(self, prefix: str) -> list[str]:
+        return [blob.name for blob in self.bucket.list_blobs(prefix=prefix)]
+
+    def delete(self, name: str) -> None:
+        from google.api_core import exceptions
+
+        try:
+            self.bucket.blob(name).delete()
+        except exceptions.NotFound:
+            pass
+
+    def close(self) -> None:
+        pass
+
+    def _info(self, blob: Any) -> BlobInfo:
+        return BlobInfo(
+            uri=f"gs://{self.bucket_name}/{blob.name}",
+            content_type=blob.content_type,
+            create_time=blob.time_created.timestamp(),
+            metadata=dict(blob.metadata or {}),
+        )
+
+
+class LocalBlobStore:
+    """Blob store on a local directory, standing in for a bucket in dev and tests.
+
+    Payloads are written in ``chunk_size`` pieces to a hidden temporary file
+    that is then hard-linked into place, so a version appears atomically and
+    an existing version is never overwritten. With ``remove_on_close`` the
+    directory is deleted by ``close``.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        chunk_size: int = 8 * 1024 * 1024,
+        *,
+        remove_on_close: bool = False,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.chunk_size = chunk_size
+        self.remove_on_close = remove_on_close
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def close(self) -> None:
+        if self.remove_on_close:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def _path(self, name: str) -> Path:
+        path = (self.root / name).resolve()
+        if not path.is_relative_to(self.root) or path.name.startswith("."):
+            raise ValueError(f"Invalid blob name: {name}")
+        return path
+
+    @staticmethod
+    def _meta_path(path: Path) -> Path:
+        return path.with_name(f".{path.name}.meta.json")
+
+    def upload(
+        self,
+        name: str,
+        data: bytes,
+        content_type: str | None,
+        metadata: dict[str, str],
+    ) -> None:
+        """Create a blob, raising FileExistsError if the name is taken."""
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=path.parent, prefix=".upload-", delete=False
+        ) as tmp:
+            view = memoryview(data)
+            for start in range(0, len(view), self.chunk_size):
+                tmp.write(view[start : start + self.chunk_size])
+        try:
+            # The sidecar is created exclusively first so it doubles as the
+            # version lock and is always present once the payload is visible
+            with open(self._meta_path(path), "x", encoding="utf-8") as f:
+                json.dump({"content_type": content_type, "metadata": metadata}, f)
+            os.link(tmp.name, path)
+        finally:
+            os.unlink(tmp.name)
+
+    def download(self, name: str) -> tuple[bytes, BlobInfo] | None:
+        info = self.stat(name)
+        if info is None:
+            return None
+        return self._path(name).read_bytes(), info
+
+    def stat(self, name: str) -> BlobInfo | None:
+        path = self._path(name)
+        if not path.is_file():
+            return None
+        meta = json.loads(self._meta_path(path).read_text(encoding="utf-8"))
+        return BlobInfo(
+            uri=path.as_uri(),
+            content_type=meta["content_type"],
+            create_time=path.stat().st_mtime,
+            metadata=meta["metadata"],
+        )
+
+    def list(self, prefix: str) -> list[str]:
+        base = self.root / prefix.rpartition("/")[0]
+        if not base.is_dir():
+            return []
+        names = (
+            path.relative_to(self.root).as_posix()
+            for path in base.rglob("*")
+            if path.is_file() and not path.name.startswith(".")
+        )
+        return sorted(name for name in names if name.startswith(prefix))
+
+    def delete(self, name: str) -> None:
+        path = self._path(name)
+        path.unlink(missing_ok=True)
+        self._meta_path(path).unlink(missing_ok=True)
+
+
+BlobStore = GcsBlobStore | LocalBlobStore
+
+
+def _encode_part(
+    artifact: types.Part, custom_metadata: dict[str, Any] | None
+) -> tuple[bytes, str | None, dict[str, str]]:
+    """Split a part into payload, content type and blob metadata."""
+    metadata = {
+        key: str(value)
+        for key, value in (custom_metadata or {}).items()
+        if key not in _INTERNAL_KEYS
+    }
+    if artifact.inline_data is not None:
+        if artifact.inline_data.display_name:
+            metadata[_DISPLAY_NAME_KEY] = artifact.inline_data.display_name
+        return (
+            artifact.inline_data.data or b"",
+            artifact.inline_data.mime_type,
+            metadata,
+        )
+    if artifact.text is not None:
+        metadata[_IS_TEXT_KEY] = "true"
+        return artifact.text.encode("utf-8"), "text/plain", metadata
+    if artifact.file_data is not None and artifact.file_data.file_uri:
+        metadata[_FILE_URI_KEY] = artifact.file_data.file_uri
+        return b"", artifact.file_data.mime_type, metadata
+    raise ValueError("Artifact must have either inline_data, text or file_data.")
+
+
+def _decode_part(data: bytes, info: BlobInfo) -> types.Part:
+    """Rebuild the saved part from its payload and blob metadata."""
+    if file_uri := info.metadata.get(_FILE_URI_KEY):
+        return types.Part(
+            file_data=types.FileData(file_uri=file_uri, mime_type=info.content_type)
+        )
+    if info.metadata.get(_IS_TEXT_KEY) == "true":
+        return types.Part(text=data.decode("utf-8"))
+    return types.Part(
+        inline_data=types.Blob(
+            mime_type=info.content_type,
+            data=data,
+            display_name=info.metadata.get(_DISPLAY_NAME_KEY),
+        )
+    )
+
+
+class _ArtifactLRU:
+    """LRU of decoded artifact versions bounded by total payload bytes."""
+
+    def __init__(self, max_bytes: int, max_item_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[types.Part, int]] = OrderedDict()
+
+    def get(self, name: str) -> types.Part | None:
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        self._entries.move_to_end(name)
+        return entry[0].model_copy(deep=True)
+
+    def put(self, name: str, part: types.Part, size: int) -> None:
+        if size > self.max_item_bytes or size > self.max_bytes:
+            return
+        self.discard(name)
+        self._entries[name] = (part.model_copy(deep=True), size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+
+    def discard(self, name: str) -> None:
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+
+class StreamingArtifactService(BaseArtifactService):
+    """Artifact service that keeps blob I/O off the event loop.
+
+    Every blocking store call runs on a dedicated thread pool, so large
+    uploads and downloads never stall request handling and are not limited
+    by the default executor shared with other ``asyncio.to_thread`` work.
+    Artifact versions are immutable, so small ones are also kept in a
+    byte-bounded in-memory LRU on save and load, letting repeated loads skip
+    the store. The LRU is only a cache: every version is still written to
+    the store, so evicting it never loses an artifact. Blob names and metadata follow ADK's ``GcsArtifactService``
+    layout, so artifacts written by either service remain readable.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        *,
+        max_workers: int = 8,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_item_max_bytes: int = 1024 * 1024,
+    ) -> None:
+        """Initialize the service.
+
+        Args:
+            store: Blob store holding the artifact versions
+            max_workers: Threads available for concurrent blob transfers
+            cache_max_bytes: Total payload bytes kept in the memory cache
+            cache_item_max_bytes: Largest payload eligible for the memory cache
+        """
+        self.store = store
+        self.max_workers = max_workers
+        self._cache = _ArtifactLRU(cache_max_bytes, cache_item_max_bytes)
+        self._executor: ThreadPoolExecutor | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**self.__dict__, "_executor": None}
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="artifact-io"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args)
+        )
+
+    @staticmethod
+    def _prefix(
+        app_name: str, user_id: str, filename: str, session_id: str | None
+    ) -> str:
+        if filename.startswith("user:"):
+            return f"{app_name}/{user_id}/user/{filename}/"
+        if session_id is None:
+            raise ValueError(
+                "Session ID must be provided for session-scoped artifacts."
+            )
+        return f"{app_name}/{user_id}/{session_id}/{filename}/"
+
+    async def _versions(self, prefix: str) -> list[int]:
+        names = await self._run(self.store.list, prefix)
+        suffixes = (name[len(prefix) :] for name in names)
+        return sorted(int(s) for s in suffixes if s.isascii() and s.isdigit())
+
+    async def _resolve_version(self, prefix: str, version: int | None) -> int | None:
+        if version is not None:
+            return version
+        versions = await self._versions(prefix)
+        return versions[-1] if versions else None
+
+    async def save_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        artifact: types.Part | dict[str, Any],
+        session_id: str | None = None,
+        custom_metadata: dict[str, Any] | None = None,
+    ) -> int:
+        if isinstance(artifact, dict):
+            artifact = types.Part.model_validate(artifact)
+        prefix = self._prefix(app_name, user_id, filename, session_id)
+        data, content_type, metadata = _encode_part(artifact, custom_metadata)
+        versions = await self._versions(prefix)
+        version = versions[-1] + 1 if versions else 0
+        # A concurrent save may claim the same number; creates never overwrite,
+        # so move on to the next version and try again
+        for attempt in range(_MAX_SAVE_ATTEMPTS):
+            try:
+                await self._run(
+                    self.store.upload,
+                    f"{prefix}{version}",
+                    data,
+                    content_type,
+                    metadata,
+                )
+                break
+            except FileExistsError:
+                if attempt == _MAX_SAVE_ATTEMPTS - 1:
+                    raise
+                version += 1
+        self._cache.put(f"{prefix}{version}", artifact, len(data))
+        return version
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: str | None = None,
+        version: int | None = None,
+    ) -> types.Part | None:
+        prefix = self._prefix(app_name, user_id, filename, session_id)
+        version = await self._resolve_version(prefix, version)
+        if version is None:
+            return None
+        name = f"{prefix}{version}"
+        cached = self._cache.get(name)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        result = await self._run(self.store.download, name)
+        if result is None:
+            return None
+        data, info = result
+        part = _decode_part(data, info)
+        self._cache.put(name, part, len(data))
+        return part
+
+    async def list_artifact_keys(
+        self, *, app_name: str, user_id: str, session_id: str | None = None
+    ) -> list[str]:
+        prefixes = [f"{app_name}/{user_id}/user/"]
+        if session_id:
+            prefixes.append(f"{app_name}/{user_id}/{session_id}/")
+        listings = await asyncio.gather(
+            *(self._run(self.store.list, prefix) for prefix in prefixes)
+        )
+        return sorted(
+            {
+                name[len(prefix) :].rpartition("/")[0]
+                for prefix, names in zip(prefixes, listings, strict=True)
+                for name in names
+            }
+        )
+
+    async def delete_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: str | None = None,
+    ) -> None:
+        prefix = self._prefix(app_name, user_id, filename, session_id)
+        names = [f"{prefix}{version}" for version in await self._versions(prefix)]
+        for name in names:
+            self._cache.discard(name)
+        await asyncio.gather(*(self._run(self.store.delete, name) for name in names))
+
+    async def list_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: str | None = None,
+    ) -> list[int]:
+        return await self._versions(
+            self._prefix(app_name, user_id, filename, session_id)
+        )
+
+    async def list_artifact_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: str | None = None,
+    ) -> "list[ArtifactVersion]":
+        prefix = self._prefix(app_name, user_id, filename, session_id)
+        versions = await self._versions(prefix)
+        infos = await asyncio.gather(
+            *(self._run(self.store.stat, f"{prefix}{v}") for v in versions)
+        )
+        return [
+            self._artifact_version(version, info)
+            for version, info in zip(versions, infos, strict=True)
+            if info is not None
+        ]
+
+    async def get_artifact_version(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: str | None = None,
+        version: int | None = None,
+    ) -> "ArtifactVersion | None":
+        prefix = self._prefix(app_name, user_id, filename, session_id)
+        version = await self._resolve_version(prefix, version)
+        if version is None:
+            return None
+        info = await self._run(self.store.stat, f"{prefix}{version}")
+        return self._artifact_version(version, info) if info is not None else None
+
+    @staticmethod
+    def _artifact_version(version: int, info: BlobInfo) -> "ArtifactVersion":
+        if ArtifactVersion is None:
+            raise NotImplementedError(
+                "Artifact version metadata requires google-adk >= 1.17"
+            )
+        return ArtifactVersion(
+            version=version,
+            canonical_uri=info.metadata.get(_FILE_URI_KEY, info.uri),
+            custom_metadata={
+                key: value
+                for key, value in info.metadata.items()
+                if key not in _INTERNAL_KEYS
+            },
+            create_time=info.create_time,
+            mime_type=info.content_type,
+        )
+
+    async def close(self) -> None:
+        """Wait for in-flight transfers, release the thread pool and the store."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown)
+        await asyncio.to_thread(self.store.close)
+
+
+def create_artifact_service(bucket_name: str | None) -> BaseArtifactService:
+    """Create the artifact service for this deployment.
+
+    Artifacts go to ``bucket_name`` when set. Otherwise ARTIFACTS_DIR selects a
+    local directory stand-in, and without either artifacts are written to a
+    fresh temporary directory that is removed when the service is closed.
+    On Cloud Run that directory lives in the in-memory filesystem, so set a
+    bucket or ARTIFACTS_DIR outside local development. Transfer and cache
+    sizes can be tuned with the ARTIFACT_* variables.
+
+    Args:
+        bucket_name: GCS bucket for artifacts, with or without ``gs://``
+
+    Returns:
+        BaseArtifactService: Service to pass to the ADK runner or app
+    """
+    chunk_size = int(os.environ.get("ARTIFACT_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+    artifacts_dir = os.environ.get("ARTIFACTS_DIR")
+    store: BlobStore
+    if bucket_name:
+        store = GcsBlobStore(bucket_name, chunk_size=chunk_size)
+    elif artifacts_dir:
+        store = LocalBlobStore(artifacts_dir, chunk_size=chunk_size)
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="artifacts-")
+        logging.warning(
+            "No artifact bucket or ARTIFACTS_DIR configured; storing artifacts "
+            f"in {temp_dir} until the artifact service is closed"
+        )
+        store = LocalBlobStore(temp_dir, chunk_size=chunk_size, remove_on_close=True)
+    return StreamingArtifactService(
+        store,
+        max_workers=int(os.environ.get("ARTIFACT_MAX_WORKERS", 8)),
+        cache_max_bytes=int(
+            os.environ.get("ARTIFACT_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        ),
+        cache_item_max_bytes=int(
+            os.environ.get("ARTIFACT_CACHE_ITEM_MAX_BYTES", 1024 * 1024)
+        ),
+    )
+
+
+def register_artifact_service(
+    artifact_service_uri: str, artifact_service: BaseArtifactService
+) -> None:
+    """Make ``get_fast_api_app`` use a pre-built artifact service for this URI.
+
+    ADK releases without a service registry (before 1.17) keep building their
+    own service from the URI.
+
+    Args:
+        artifact_service_uri: Artifact service URI passed to ``get_fast_api_app``
+        artifact_service: Service to return for that URI's scheme
+    """
+    if get_service_registry is None:
+        logging.warning(
+            "google-adk < 1.17 has no service registry; using ADK's default "
+            f"artifact service for {artifact_service_uri}"
+        )
+        return
+    scheme = urlparse(artifact_service_uri).scheme
+    get_service_registry().register_artifact_service(
+        scheme, lambda _uri, **_kwargs: artifact_service
+    )
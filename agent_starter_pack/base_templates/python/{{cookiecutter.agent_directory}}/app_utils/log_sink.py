@@ -0,0 +1,190 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+LogRecord = tuple[dict[str, Any], str]
+LogWriter = Callable[[list[LogRecord]], None]
+
+_STOP = object()
+
+
+class BatchingLogSink:
+    """Queues structured log records and writes them in batches from a thread.
+
+    ``log_struct`` only enqueues, so request handlers return immediately. A
+    daemon thread writes a batch once ``max_batch_size`` records are queued or
+    ``flush_interval`` seconds after the first record of the batch arrived.
+    The queue is bounded: when full, new records are dropped with a warning
+    rather than blocking the caller.
+    """
+
+    def __init__(
+        self,
+        writer: LogWriter,
+        *,
+        max_batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+    ) -> None:
+        """Initialize the sink.
+
+        Args:
+            writer: Callable that persists a batch of (info, severity) records
+            max_batch_size: Maximum records per write
+            flush_interval: Maximum seconds a record waits before being written
+            max_queue_size: Maximum queued records before new ones are dropped
+        """
+        self.writer = writer
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+        atexit.register(self.close)
+
+    def log_struct(self, info: dict[str, Any], severity: str = "INFO") -> None:
+        """Queue a structured record without waiting for it to be written.
+
+        Args:
+            info: JSON-serializable payload
+            severity: Cloud Logging severity name
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((info, severity))
+        except queue.Full:
+            self.dropped += 1
+            logging.warning("Log sink queue full, dropping structured log record")
+
+    def flush(self) -> None:
+        """Block until every queued record has been handed to the writer."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write the remaining records and stop the background thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        # Started lazily so forked worker processes get their own thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="log-sink", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: list[LogRecord]) -> None:
+        try:
+            self.writer(batch)
+        except Exception:
+            logging.exception(f"Failed to write {len(batch)} structured log record(s)")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+def cloud_logging_writer(name: str) -> LogWriter:
+    """Return a writer that sends each batch to Cloud Logging in one request."""
+    from google.cloud import logging as google_cloud_logging
+
+    logger = google_cloud_logging.Client().logger(name)
+
+    def write(records: list[LogRecord]) -> None:
+        batch = logger.batch()
+        for info, severity in records:
+            batch.log_struct(info, severity=severity)
+        batch.commit()
+
+    return write
+
+
+def jsonl_writer(path: str) -> LogWriter:
+    """Return a writer that appends records as JSON lines to a file or stdout."""
+
+    def write(records: list[LogRecord]) -> None:
+        lines = "".join(
+            json.dumps({**info, "severity": severity}, default=str) + "\n"
+            for info, severity in records
+        )
+        if path == "stdout":
+            sys.stdout.write(lines)
+            sys.stdout.flush()
+            return
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    return write
+
+
+def create_log_sink(name: str) -> BatchingLogSink:
+    """Create the structured log sink for this service.
+
+    Records go to Cloud Logging by default. Set LOG_SINK to ``stdout`` or to a
+    file path to write JSON lines locally instead, e.g. in tests.
+
+    Args:
+        name: Cloud Logging log name
+
+    Returns:
+        BatchingLogSink: Sink with a ``log_struct`` method like a Cloud Logging logger
+    """
+    target = os.environ.get("LOG_SINK")
+    writer = jsonl_writer(target) if target else cloud_logging_writer(name)
+    return BatchingLogSink(
+        writer,
+        max_batch_size=int(os.environ.get("LOG_SINK_MAX_BATCH_SIZE", 100)),
+        flush_interval=float(os.environ.get("LOG_SINK_FLUSH_INTERVAL_SECONDS", 1.0)),
+    )
@@ -0,0 +1,283 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from google.adk.events.event import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+
+_SessionKey = tuple[str, str, str]
+
+
+@dataclass
+class _CachedSession:
+    session: Session
+    expires_at: float
+    # The backend's own copy of the session, used as the append target so
+    # persistent backends see the revision they last wrote
+    shadow: Session | None = None
+
+
+@dataclass
+class _PendingWrites:
+    shadow: Session | None
+    events: list[Event] = field(default_factory=list)
+
+
+class CachedSessionService(BaseSessionService):
+    """Write-behind cache in front of any ADK session service.
+
+    Reads are served from an LRU with a TTL. Appended events are applied to the
+    caller's session immediately and buffered, then written to the backend by a
+    background flusher at most ``max_staleness`` seconds later, or as soon as a
+    session buffers ``max_batch_size`` events. Reads that miss the cache flush
+    that session first, so callers always see their own writes.
+
+    Buffered events live only in this process until flushed. Call ``flush()``
+    (done by ``Runner.close()``) or ``close()`` on shutdown. With several
+    instances serving the same session, prefer a short TTL.
+    """
+
+    def __init__(
+        self,
+        backend: BaseSessionService,
+        *,
+        max_sessions: int = 1024,
+        ttl: float = 300.0,
+        max_staleness: float = 1.0,
+        max_batch_size: int = 32,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            backend: The session service that persists sessions
+            max_sessions: Maximum number of sessions kept in the read cache
+            ttl: Seconds a cached session is served before re-reading the backend
+            max_staleness: Maximum seconds an event stays buffered before flushing
+            max_batch_size: Buffered events per session that trigger a flush
+        """
+        self.backend = backend
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        self.max_batch_size = max_batch_size
+        self._cache: OrderedDict[_SessionKey, _CachedSession] = OrderedDict()
+        self._pending: dict[_SessionKey, _PendingWrites] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+        self._batch_flushes: set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls, backend: BaseSessionService) -> "CachedSessionService":
+        """Build a cache configured from SESSION_CACHE_* environment variables."""
+        return cls(
+            backend,
+            max_sessions=int(os.environ.get("SESSION_CACHE_MAX_SESSIONS", 1024)),
+            ttl=float(os.environ.get("SESSION_CACHE_TTL_SECONDS", 300.0)),
+            max_staleness=float(
+                os.environ.get("SESSION_CACHE_MAX_STALENESS_SECONDS", 1.0)
+            ),
+            max_batch_size=int(os.environ.get("SESSION_CACHE_MAX_BATCH_SIZE", 32)),
+        )
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: dict[str, Any] | None = None,
+        session_id: str | None = None,
+    ) -> Session:
+        session = await self.backend.create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        self._put(session.model_copy(deep=True), shadow=session)
+        return session.model_copy(deep=True)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: GetSessionConfig | None = None,
+    ) -> Session | None:
+        key = (app_name, user_id, session_id)
+        cached = self._cache.get(key)
+        if cached is not None and cached.expires_at > time.monotonic():
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return _apply_config(cached.session.model_copy(deep=True), config)
+
+        self.misses += 1
+        self._cache.pop(key, None)
+        await self._flush_key(key)
+        session = await self.backend.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None and config is None:
+            self._put(session.model_copy(deep=True), shadow=session)
+            return session.model_copy(deep=True)
+        return session
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: str | None = None
+    ) -> ListSessionsResponse:
+        return await self.backend.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        key = (app_name, user_id, session_id)
+        self._cache.pop(key, None)
+        self._pending.pop(key, None)
+        await self.backend.delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> dict[str, Any]:
+        await self.flush()
+        return await self.backend.get_user_state(app_name=app_name, user_id=user_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        key = (session.app_name, session.user_id, session.id)
+        cached = self._cache.get(key)
+        pending = self._pending.get(key)
+        if pending is None:
+            shadow = cached.shadow if cached is not None else None
+            pending = self._pending[key] = _PendingWrites(shadow=shadow)
+        pending.events.append(event)
+        self._put(session, shadow=pending.shadow)
+
+        if len(pending.events) >= self.max_batch_size:
+            task = asyncio.create_task(self._flush_key(key))
+            self._batch_flushes.add(task)
+            task.add_done_callback(self._batch_flushes.discard)
+        self._ensure_flusher()
+        return event
+
+    async def flush_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        """Write any buffered events for one session, e.g. when it ends."""
+        await self._flush_key((app_name, user_id, session_id))
+
+    async def flush(self) -> None:
+        """Write every buffered event to the backend."""
+        for key in list(self._pending):
+            await self._flush_key(key)
+
+    async def close(self) -> None:
+        """Stop the background flusher and write every buffered event."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._batch_flushes:
+            await asyncio.gather(*self._batch_flushes)
+        await self.flush()
+
+    def _put(self, session: Session, shadow: Session | None) -> None:
+        key = (session.app_name, session.user_id, session.id)
+        self._cache[key] = _CachedSession(session, time.monotonic() + self.ttl, shadow)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_sessions:
+            self._cache.popitem(last=False)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.max_staleness)
+            await self.flush()
+
+    async def _flush_key(self, key: _SessionKey) -> None:
+        async with self._flush_lock:
+            pending = self._pending.pop(key, None)
+            if pending is None or not pending.events:
+                return
+            app_name, user_id, session_id = key
+            written = 0
+            try:
+                shadow = pending.shadow
+                if shadow is None:
+                    shadow = await self.backend.get_session(
+                        app_name=app_name, user_id=user_id, session_id=session_id
+                    )
+                if shadow is None:
+                    logging.warning(
+                        f"Dropping {len(pending.events)} buffered event(s) for "
+                        f"missing session {session_id}"
+                    )
+                    return
+                for event in pending.events:
+                    await self.backend.append_event(shadow, event)
+                    written += 1
+            except Exception:
+                logging.exception(f"Failed to flush events for session {session_id}")
+                # Keep unwritten events ahead of anything buffered meanwhile and
+                # re-read the backend revision on the next attempt
+                retry = self._pending.setdefault(key, _PendingWrites(shadow=None))
+                retry.shadow = None
+                retry.events[:0] = pending.events[written:]
+                self._set_shadow(key, None)
+                return
+            # Later appends keep using this revision of the session
+            self._set_shadow(key, shadow)
+
+    def _set_shadow(self, key: _SessionKey, shadow: Session | None) -> None:
+        if key in self._pending:
+            self._pending[key].shadow = shadow
+        if key in self._cache:
+            self._cache[key].shadow = shadow
+
+
+def _apply_config(session: Session, config: GetSessionConfig | None) -> Session:
+    if config is None:
+        return session
+    if config.after_timestamp is not None:
+        session.events = [
+            event
+            for event in session.events
+            if event.timestamp >= config.after_timestamp
+        ]
+    if config.num_recent_events is not None:
+        session.events = (
+            session.events[-config.num_recent_events :]
+            if config.num_recent_events
+            else []
+        )
+    return session
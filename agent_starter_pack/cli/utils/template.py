@@ -86,7 +86,8 @@ def resolve_agent_alias(name: str | None) -> str | None:
 # This replaces Jinja2 conditionals in filenames for Windows compatibility.
 #
 # Format: "relative/path/to/file_or_dir": lambda config: bool_condition
-# The config dict contains: agent_name, cicd_runner, is_adk, is_adk_live, is_a2a
+# The config dict contains: agent_name, deployment_target, cicd_runner, session_type,
+# is_adk, is_adk_live, is_a2a
 # =============================================================================
 
 # Helper: exclude service.tf only for adk_live + agent_engine combination
@@ -110,8 +111,20 @@ CONDITIONAL_FILES = {
     "{agent_directory}/app_utils/converters": (
         lambda c: c.get("is_a2a") and c.get("agent_name") == "langgraph"
     ),
+    "{agent_directory}/app_utils/session_cache.py": lambda c: c.get("is_adk"),
+    "tests/unit/test_session_cache.py": lambda c: c.get("is_adk"),
+    "{agent_directory}/app_utils/artifact_service.py": lambda c: c.get("is_adk"),
+    "tests/unit/test_artifact_service.py": lambda c: c.get("is_adk"),
     # Agent Engine deployment target conditionals
     "{agent_directory}/app_utils/expose_app.py": lambda c: c.get("is_adk_live"),
+    # Cloud Run deployment target conditionals
+    "{agent_directory}/app_utils/session_pool.py": (
+        lambda c: (
+            c.get("session_type") == "cloud_sql"
+            and c.get("is_adk")
+            and not (c.get("is_a2a") or c.get("is_adk_live"))
+        )
+    ),
     "tests/helpers.py": lambda c: c.get("is_a2a"),
     "deployment/terraform/service.tf": _exclude_adk_live_agent_engine,
     "deployment/terraform/dev/service.tf": _exclude_adk_live_agent_engine,
@@ -132,7 +145,7 @@ def apply_conditional_files(
     Args:
         project_path: Path to the generated project directory
         config: Configuration dict with keys: agent_name, cicd_runner,
-                is_adk, is_adk_live, is_a2a
+                is_adk, is_adk_live, is_a2a, session_type
         agent_directory: Name of the agent directory (replaces {agent_directory} placeholder)
     """
     for rel_path_template, condition_fn in CONDITIONAL_FILES.items():
@@ -1722,6 +1735,7 @@ def process_template(
                 "agent_name": agent_name,
                 "deployment_target": deployment_target,
                 "cicd_runner": cicd_runner or "google_cloud_build",
+                "session_type": session_type or "",
                 "is_adk": "adk" in tags,
                 "is_adk_live": "adk_live" in tags,
                 "is_a2a": "a2a" in tags,
@@ -0,0 +1,166 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Sharded JSONL / Parquet export of Arrow record batches for the process_data component.
+
+Record batches are written to numbered shards under a ``gs://`` or local URI
+prefix as they arrive, so memory use is bounded by one batch regardless of the
+size of the export.
+"""
+
+import gzip
+import json
+import os
+from collections.abc import Iterable
+from typing import IO, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+FILE_FORMATS = ("jsonl", "parquet")
+
+
+def open_output(uri: str, storage_client: Optional[object] = None) -> IO[bytes]:
+    """Open a ``gs://``, ``file://`` or local path for streaming binary writes.
+
+    Args:
+        uri: Destination of the file
+        storage_client: Cloud Storage client used for ``gs://`` URIs
+
+    Returns:
+        IO[bytes]: Writable file object
+    """
+    if uri.startswith("gs://"):
+        from google.cloud import storage
+
+        client = storage_client or storage.Client()
+        bucket_name, _, blob_name = uri[5:].partition("/")
+        return client.bucket(bucket_name).blob(blob_name).open("wb")
+    path = uri[len("file://") :] if uri.startswith("file://") else uri
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return open(path, "wb")
+
+
+def shard_suffix(file_format: str, compression: Optional[str] = None) -> str:
+    """File extension of the shards written for ``file_format`` and ``compression``."""
+    if file_format == "parquet":
+        return ".parquet"
+    return ".jsonl.gz" if compression == "gzip" else ".jsonl"
+
+
+class _ShardWriter:
+    def __init__(
+        self,
+        raw: IO[bytes],
+        file_format: str,
+        compression: Optional[str],
+        schema: pa.Schema,
+    ) -> None:
+        self._raw = raw
+        self._parquet = None
+        self._stream: IO[bytes] = raw
+        if file_format == "parquet":
+            self._parquet = pq.ParquetWriter(
+                raw, schema, compression=compression or "snappy"
+            )
+        elif compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=raw, mode="wb")
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        if self._parquet is not None:
+            self._parquet.write_batch(batch)
+            return
+        lines = (
+            json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+            + "\n"
+            for record in batch.to_pylist()
+        )
+        self._stream.write("".join(lines).encode("utf-8"))
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        elif self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+
+def export_batches(
+    batches: Iterable[pa.RecordBatch],
+    uri_prefix: str,
+    *,
+    file_format: str = "jsonl",
+    compression: Optional[str] = None,
+    max_rows_per_shard: int = 100_000,
+    schema: Optional[pa.Schema] = None,
+    storage_client: Optional[object] = None,
+) -> list[str]:
+    """Stream record batches into numbered shards under ``uri_prefix``.
+
+    Shards are named like BigQuery extract output, ``<uri_prefix>000000000000.jsonl``
+    and so on, so ``<uri_prefix>*.jsonl`` matches all of them. At least one
+    shard is always written, even for an empty export.
+
+    Args:
+        batches: Record batches to export
+        uri_prefix: ``gs://``, ``file://`` or local path prefix of the shards
+        file_format: "jsonl" or "parquet"
+        compression: "gzip" for JSONL; a Parquet codec such as "zstd" for Parquet
+        max_rows_per_shard: Rows after which a new shard is started
+        schema: Schema of an empty Parquet export, when there are no batches
+        storage_client: Cloud Storage client used for ``gs://`` prefixes
+
+    Returns:
+        list[str]: URIs of the written shards
+    """
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Unsupported file format: {file_format!r}")
+    if file_format == "jsonl" and compression not in (None, "gzip"):
+        raise ValueError(f"Unsupported JSONL compression: {compression!r}")
+    suffix = shard_suffix(file_format, compression)
+
+    shards: list[str] = []
+    writer: Optional[_ShardWriter] = None
+    rows_in_shard = 0
+
+    def open_shard(shard_schema: pa.Schema) -> _ShardWriter:
+        uri = f"{uri_prefix}{len(shards):012d}{suffix}"
+        shards.append(uri)
+        return _ShardWriter(
+            open_output(uri, storage_client), file_format, compression, shard_schema
+        )
+
+    try:
+        for batch in batches:
+            offset = 0
+            while offset < batch.num_rows:
+                if writer is None:
+                    writer = open_shard(batch.schema)
+                    rows_in_shard = 0
+                length = min(
+                    batch.num_rows - offset, max_rows_per_shard - rows_in_shard
+                )
+                writer.write(batch.slice(offset, length))
+                offset += length
+                rows_in_shard += length
+                if rows_in_shard >= max_rows_per_shard:
+                    writer.close()
+                    writer = None
+        if not shards:
+            writer = open_shard(schema or pa.schema([]))
+    finally:
+        if writer is not None:
+            writer.close()
+    return shards
@@ -0,0 +1,48 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Datastore version marker written by the ingest_data component.
+
+Serving caches read the marker with ``retrieval_cache.read_version_marker``
+and drop their entries when it changes, so a fresh ingestion never serves
+results cached from the previous datastore contents.
+"""
+
+import logging
+from datetime import datetime, timezone
+
+
+def publish_datastore_version(version_marker_uri: str) -> str:
+    """Write a new datastore version so serving caches drop stale results.
+
+    Args:
+        version_marker_uri: gs:// object or local file holding the version
+
+    Returns:
+        str: The published version
+    """
+    version = datetime.now(timezone.utc).isoformat()
+    if version_marker_uri.startswith("gs://"):
+        from google.cloud import storage
+
+        bucket_name, _, blob_name = version_marker_uri[5:].partition("/")
+        storage.Client().bucket(bucket_name).blob(blob_name).upload_from_string(
+            version
+        )
+    else:
+        with open(version_marker_uri, "w", encoding="utf-8") as f:
+            f.write(version)
+    logging.info(f"Published datastore version {version} to {version_marker_uri}")
+    return version
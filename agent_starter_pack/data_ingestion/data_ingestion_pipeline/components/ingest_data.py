@@ -13,11 +13,18 @@
 # limitations under the License.
 # ruff: noqa
 
+from pathlib import Path
+
 from kfp.dsl import Dataset, Input, component
+
+# Helper modules next to this file are embedded into the component and can be
+# imported at runtime
+HELPER_MODULES_DIR = str(Path(__file__).parent)
 {% if cookiecutter.datastore_type == "vertex_ai_search" %}
 
 @component(
-    base_image="us-docker.pkg.dev/production-ai-template/starter-pack/data_processing:0.2"
+    base_image="us-docker.pkg.dev/production-ai-template/starter-pack/data_processing:0.2",
+    embedded_artifact_path=HELPER_MODULES_DIR,
 )
 def ingest_data(
     project_id: str,
@@ -26,6 +33,10 @@ def ingest_data(
     data_store_id: str,
     embedding_dimension: int = 768,
     embedding_column: str = "embedding",
+    version_marker_uri: str = "",
+    import_timeout: int = 3600,
+    readiness_timeout: int = 900,
+    readiness_sample_size: int = 5,
 ) -> None:
     """Process and ingest documents into Vertex AI Search datastore.
 
@@ -35,11 +46,16 @@ def ingest_data(
         input_files: Input dataset containing documents
         data_store_id: ID of target datastore
         embedding_column: Name of embedding column in schema
+        version_marker_uri: Where to publish the datastore version once ingested
+        import_timeout: Seconds to wait for the import operation
+        readiness_timeout: Seconds to wait for imported documents to be searchable
+        readiness_sample_size: Imported documents probed for searchability
     """
     import json
     import logging
-    import time
 
+    import datastore_version
+    import search_readiness
     from google.api_core.client_options import ClientOptions
     from google.cloud import discoveryengine
 
@@ -151,7 +167,12 @@ def ingest_data(
 
         operation = client.import_documents(request=request)
         logging.info(f"Waiting for import operation: {operation.operation.name}")
-        operation.result()
+        operation.result(timeout=import_timeout)
+        metadata = operation.metadata
+        logging.info(
+            f"Imported {metadata.success_count} documents, "
+            f"{metadata.failure_count} failures"
+        )
 
     client_options = ClientOptions(
         api_endpoint=f"{data_store_region}-discoveryengine.googleapis.com"
@@ -176,17 +197,40 @@ def ingest_data(
         input_files_uri=input_files.uri,
     )
     logging.info("Data import completed")
-    logging.info(
-        "Sleeping for 3 minutes to allow Vertex AI Search to properly index the data..."
+
+    logging.info("Waiting for imported documents to become searchable...")
+    probe_documents = search_readiness.sample_documents(
+        input_files.uri, sample_size=readiness_sample_size
     )
-    time.sleep(180)  # Sleep for 180 seconds (3 minutes)
-    logging.info("Sleep completed. Data indexing should now be complete.")
+    readiness = search_readiness.wait_until_searchable(
+        search_readiness.DiscoveryEngineSearchClient(
+            project_id=project_id,
+            location=data_store_region,
+            data_store_id=data_store_id,
+            client_options=client_options,
+        ),
+        probe_documents,
+        timeout=readiness_timeout,
+    )
+    if readiness.ready:
+        logging.info(
+            f"{readiness.total} sampled documents searchable after "
+            f"{readiness.elapsed:.0f}s"
+        )
+    else:
+        logging.warning(
+            f"Only {readiness.found}/{readiness.total} sampled documents were "
+            f"searchable after {readiness.elapsed:.0f}s; indexing may still be running"
+        )
+    if version_marker_uri:
+        datastore_version.publish_datastore_version(version_marker_uri)
 {% elif cookiecutter.datastore_type == "vertex_ai_vector_search" %}
 from google_cloud_pipeline_components.types.artifact_types import BQTable
 
 
 @component(
-    base_image="us-docker.pkg.dev/production-ai-template/starter-pack/data_processing:0.2"
+    base_image="us-docker.pkg.dev/production-ai-template/starter-pack/data_processing:0.2",
+    embedded_artifact_path=HELPER_MODULES_DIR,
 )
 def ingest_data(
     project_id: str,
@@ -199,16 +243,25 @@ def ingest_data(
     input_table: Input[BQTable],
     is_incremental: bool = True,
     look_back_days: int = 1,
+    version_marker_uri: str = "",
+    max_concurrent_upserts: int = 4,
+    checkpoint_uri: str = "",
 ) -> None:
     """Process and ingest documents into Vertex AI Vector Search.
 
     Args:
         project_id: Google Cloud project ID
+        version_marker_uri: Where to publish the datastore version once ingested
+        max_concurrent_upserts: Upsert batches kept in flight at once
+        checkpoint_uri: Where to record completed batches so a rerun resumes;
+            defaults to a file in the Vector Search data bucket
     """
     import logging
     from datetime import datetime, timedelta
 
     import bigframes.pandas as bpd
+    import datastore_version
+    import vector_search_writer
     from google.cloud import aiplatform
     from langchain_google_vertexai import VectorSearchVectorStore
     from langchain_google_vertexai import VertexAIEmbeddings
@@ -286,24 +339,50 @@ def ingest_data(
         stream_update=True,
     )
 
-    for batch_num, start in enumerate(range(0, len(df), ingestion_batch_size)):
-        ids = (
-            df.iloc[start : start + ingestion_batch_size]
-            .question_id.astype(str)
-            .tolist()
-        )
-        texts = df.iloc[start : start + ingestion_batch_size].text_chunk.tolist()
-        embeddings = df.iloc[start : start + ingestion_batch_size].embedding.tolist()
-        metadatas = (
-            df.iloc[start : start + ingestion_batch_size]
-            .drop(columns=["embedding", "last_edit_date"])
-            .to_dict(orient="records")
-        )
+    # Download the rows once and slice plain column lists into batches
+    local_df = df.to_pandas()
+    metadata_columns = ["question_id", "full_text_md", "text_chunk", "chunk_id"]
+    batches = vector_search_writer.make_batches(
+        {
+            column: local_df[column].tolist()
+            for column in [*metadata_columns, "embedding"]
+        },
+        batch_size=ingestion_batch_size,
+        id_column="question_id",
+        text_column="text_chunk",
+        embedding_column="embedding",
+        metadata_columns=metadata_columns,
+    )
+
+    def upsert(batch: vector_search_writer.UpsertBatch) -> None:
         vector_store.add_texts_with_embeddings(
-            ids=ids,
-            texts=texts,
-            embeddings=embeddings,
-            metadatas=metadatas,
+            ids=batch.ids,
+            texts=batch.texts,
+            embeddings=batch.embeddings,
+            metadatas=batch.metadatas,
             is_complete_overwrite=True,
         )
+
+    checkpoint = vector_search_writer.Checkpoint(
+        checkpoint_uri
+        or f"gs://{vector_search_data_bucket_name.replace('gs://', '')}"
+        f"/ingestion_checkpoints/{dataset}.{table}.json"
+    )
+    writer = vector_search_writer.ParallelUpsertWriter(
+        upsert, max_in_flight=max_concurrent_upserts, checkpoint=checkpoint
+    )
+    result = writer.write(batches)
+    logging.info(
+        f"Upserted {result.written} batches, skipped {result.skipped} "
+        f"already written by a previous run"
+    )
+    if result.failed:
+        raise RuntimeError(
+            f"{len(result.failed)} upsert batches failed: {result.failed}. "
+            f"Rerun the pipeline to resume from {checkpoint.uri}"
+        )
+    checkpoint.clear()
+
+    if version_marker_uri:
+        datastore_version.publish_datastore_version(version_marker_uri)
 {% endif %}
\ No newline at end of file
@@ -20,11 +20,18 @@ https://github.com/GoogleCloudPlatform/generative-ai/blob/main/gemini/use-cases/
 It leverages BigQuery for data processing. We also suggest looking at remote functions for enhanced scalability.
 """
 
+from pathlib import Path
+
 from kfp.dsl import Dataset, Output, component
 
+# Helper modules next to this file are embedded into the component and can be
+# imported at runtime, e.g. so worker functions can run in a process pool
+HELPER_MODULES_DIR = str(Path(__file__).parent)
+
 {% if cookiecutter.datastore_type == "vertex_ai_search" %}
 @component(
-    base_image="us-docker.pkg.dev/production-ai-template/starter-pack/data_processing:0.2"
+    base_image="us-docker.pkg.dev/production-ai-template/starter-pack/data_processing:0.2",
+    embedded_artifact_path=HELPER_MODULES_DIR,
 )
 def process_data(
     project_id: str,
@@ -44,7 +51,7 @@ def process_data(
     1. Fetching data from BigQuery
     2. Converting HTML to markdown
     3. Splitting text into chunks
-    4. Generating embeddings
+    4. Generating embeddings for new or changed chunks
     5. Storing results in BigQuery
     6. Exporting to JSONL
 
@@ -60,20 +67,21 @@ def process_data(
         location: BigQuery location
     """
     import logging
+    import os
+    import tempfile
     from datetime import datetime, timedelta
 
     import backoff
     import bigframes.ml.llm as llm
     import bigframes.pandas as bpd
+    import datastore_export
     import google.api_core.exceptions
-    import swifter
-    from google.cloud import bigquery
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from markdownify import markdownify
+    import preprocessing
+    import pyarrow as pa
+    from google.cloud import bigquery, bigquery_storage
 
     # Initialize logging
     logging.basicConfig(level=logging.INFO)
-    logging.info(f"Using {swifter} for apply operations.")
 
     # Initialize clients
     logging.info("Initializing clients...")
@@ -105,11 +113,10 @@ def process_data(
 
     def fetch_stackoverflow_data(
         dataset_suffix: str, start_date: str, end_date: str
-    ) -> bpd.DataFrame:
-        """Fetch StackOverflow data from BigQuery."""
+    ) -> pa.Table:
+        """Fetch the latest version of each StackOverflow question from BigQuery."""
         query = f"""
             SELECT
-                creation_date,
                 last_edit_date,
                 question_id,
                 question_title,
@@ -118,23 +125,12 @@ def process_data(
             FROM `production-ai-template.stackoverflow_qa_{dataset_suffix}.stackoverflow_python_questions_and_answers`
             WHERE TRUE
                 {f'AND TIMESTAMP_TRUNC(creation_date, DAY) BETWEEN TIMESTAMP("{start_date}") AND TIMESTAMP("{end_date}")' if is_incremental else ""}
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY question_id ORDER BY last_edit_date DESC
+            ) = 1
         """
         logging.info("Fetching StackOverflow data from BigQuery...")
-        return bpd.read_gbq(query)
-
-    def convert_html_to_markdown(html: str) -> str:
-        """Convert HTML into Markdown for easier parsing and rendering after LLM response."""
-        return markdownify(html).strip()
-
-    def create_answers_markdown(answers: list) -> str:
-        """Convert each answer's HTML to markdown and concatenate into a single markdown text."""
-        answers_md = ""
-        for index, answer_record in enumerate(answers):
-            answers_md += (
-                f"\n\n## Answer {index + 1}:\n"  # Answer number is H2 heading size
-            )
-            answers_md += convert_html_to_markdown(answer_record["body"])
-        return answers_md
+        return bq_client.query(query).to_arrow()
 
     def create_table_if_not_exist(
         df: bpd.DataFrame,
@@ -158,87 +154,117 @@ def process_data(
         bq_client.create_dataset(dataset, exists_ok=True)
         bq_client.create_table(table=table, exists_ok=True)
 
+    def add_content_hash_column(table_ref: str) -> bool:
+        """Add content_hash to a table written before content hashing.
+
+        Returns True if the table exists and already had the column.
+        """
+        try:
+            table = bq_client.get_table(table_ref)
+        except google.api_core.exceptions.NotFound:
+            return False
+        if "content_hash" in {field.name for field in table.schema}:
+            return True
+        bq_client.query(
+            f"ALTER TABLE `{table_ref}` ADD COLUMN IF NOT EXISTS content_hash STRING"
+        ).result()
+        return False
+
+    def fetch_existing_embeddings(
+        project_id: str, dataset_id: str, table_id: str
+    ) -> bpd.DataFrame | None:
+        """Fetch stored embeddings keyed by chunk content hash, if any exist."""
+        table_ref = f"{project_id}.{dataset_id}.{table_id}"
+        if not add_content_hash_column(table_ref):
+            return None
+        return bpd.read_gbq(
+            f"""
+            SELECT
+                content_hash,
+                ANY_VALUE(embedding) AS embedding,
+                ANY_VALUE(embedding_statistics) AS embedding_statistics,
+                ANY_VALUE(embedding_status) AS embedding_status,
+                TRUE AS has_embedding
+            FROM `{table_ref}`
+            WHERE content_hash IS NOT NULL AND ARRAY_LENGTH(embedding) > 0
+            GROUP BY content_hash
+            """,
+            use_cache=False,
+        )
+
     # Fetch and preprocess data
     logging.info("Fetching and preprocessing data...")
-    df = fetch_stackoverflow_data(
+    questions = fetch_stackoverflow_data(
         start_date=START_DATE.strftime("%Y-%m-%d"),
         end_date=END_DATE.strftime("%Y-%m-%d"),
         dataset_suffix=location.lower().replace("-", "_"),
     )
-    df = (
-        df.sort_values("last_edit_date", ascending=False)
-        .drop_duplicates("question_id")
-        .reset_index(drop=True)
-    )
-    logging.info("Data fetched and preprocessed.")
-
-    # Convert content to markdown
-    logging.info("Converting content to markdown...")
-
-    # Create markdown fields efficiently
-    df["question_title_md"] = (
-        "# " + df["question_title"] + "\n"
-    )  # Title is H1 heading size
-    df["question_text_md"] = (
-        df["question_text"].to_pandas().swifter.apply(convert_html_to_markdown) + "\n"
-    )
-    df["answers_md"] = df["answers"].to_pandas().swifter.apply(create_answers_markdown)
-
-    # Create a column containing the whole markdown text
-    df["full_text_md"] = (
-        df["question_title_md"] + df["question_text_md"] + df["answers_md"]
-    )
-    logging.info("Content converted to markdown.")
-
-    # Keep only necessary columns
-    df = df[["last_edit_date", "question_id", "question_text", "full_text_md"]]
-
-    # Split text into chunks
-    logging.info("Splitting text into chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        length_function=len,
-    )
-
-    df["text_chunk"] = (
-        df["full_text_md"]
-        .to_pandas()
-        .astype(object)
-        .swifter.apply(text_splitter.split_text)
+    logging.info(f"Fetched {questions.num_rows} questions.")
+
+    # Convert content to markdown and split it into chunks, batch by batch in a
+    # process pool, then load the chunk rows back into BigQuery
+    logging.info("Converting content to markdown and splitting into chunks...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chunks_path = os.path.join(tmp_dir, "chunks.parquet")
+        chunk_count = preprocessing.write_parquet(
+            preprocessing.preprocess_questions(
+                questions, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+            ),
+            chunks_path,
+            schema=preprocessing.chunk_schema(questions.schema),
+        )
+        df = bpd.read_parquet(chunks_path, engine="bigquery")
+    logging.info(f"Content split into {chunk_count} chunks.")
+
+    # Reuse stored embeddings for chunks whose content has not changed
+    logging.info("Looking up embeddings of unchanged chunks...")
+    existing_df = fetch_existing_embeddings(
+        project_id=project_id, dataset_id=destination_dataset, table_id=deduped_table
+    )
+    if existing_df is not None:
+        df = df.merge(existing_df, how="left", on="content_hash")
+        is_unchanged = df["has_embedding"].fillna(False)
+        unchanged_df = df[is_unchanged].drop(columns=["has_embedding"])
+        df = df[~is_unchanged].drop(
+            columns=[
+                "embedding",
+                "embedding_statistics",
+                "embedding_status",
+                "has_embedding",
+            ]
+        )
+    else:
+        unchanged_df = None
+    changed_count = len(df)
+    logging.info(
+        f"{changed_count} new or changed chunks, "
+        f"{len(unchanged_df) if unchanged_df is not None else 0} unchanged."
     )
-    logging.info("Text split into chunks.")
-
-    # Create chunk IDs and explode chunks into rows
-    logging.info("Creating chunk IDs and exploding chunks into rows...")
-    chunk_ids = [
-        str(idx) for text_chunk in df["text_chunk"] for idx in range(len(text_chunk))
-    ]
-    df = df.explode("text_chunk").reset_index(drop=True)
-    df["chunk_id"] = df["question_id"].astype("string") + "__" + chunk_ids
-    logging.info("Chunk IDs created and chunks exploded.")
 
     # Generate embeddings
-    logging.info("Generating embeddings...")
+    if changed_count or unchanged_df is None:
+        logging.info("Generating embeddings...")
 
-    # The first invocation in a new project might fail due to permission propagation.
-    @backoff.on_exception(
-        backoff.expo, google.api_core.exceptions.InvalidArgument, max_tries=10
-    )
-    def create_embedder() -> llm.TextEmbeddingGenerator:
-        return llm.TextEmbeddingGenerator(model_name="text-embedding-005")
+        # The first invocation in a new project might fail due to permission propagation.
+        @backoff.on_exception(
+            backoff.expo, google.api_core.exceptions.InvalidArgument, max_tries=10
+        )
+        def create_embedder() -> llm.TextEmbeddingGenerator:
+            return llm.TextEmbeddingGenerator(model_name="text-embedding-005")
 
-    embedder = create_embedder()
+        embedder = create_embedder()
 
-    embeddings_df = embedder.predict(df["text_chunk"])
-    logging.info("Embeddings generated.")
+        embeddings_df = embedder.predict(df["text_chunk"])
+        logging.info("Embeddings generated.")
 
-    df = df.assign(
-        embedding=embeddings_df["ml_generate_embedding_result"],
-        embedding_statistics=embeddings_df["ml_generate_embedding_statistics"],
-        embedding_status=embeddings_df["ml_generate_embedding_status"],
-        creation_timestamp=datetime.now(),
-    )
+        df = df.assign(
+            embedding=embeddings_df["ml_generate_embedding_result"],
+            embedding_statistics=embeddings_df["ml_generate_embedding_statistics"],
+            embedding_status=embeddings_df["ml_generate_embedding_status"],
+        )
+    if unchanged_df is not None:
+        df = bpd.concat([unchanged_df, df]) if changed_count else unchanged_df
+    df = df.reset_index(drop=True).assign(creation_timestamp=datetime.now())
 
     # Store results in BigQuery
     PARTITION_DATE_COLUMN = "creation_timestamp"
@@ -252,6 +278,11 @@ def process_data(
         table_id=destination_table,
         partition_column=PARTITION_DATE_COLUMN,
     )
+    if is_incremental:
+        # Appending rows with content_hash needs the column on older tables too
+        add_content_hash_column(
+            f"{project_id}.{destination_dataset}.{destination_table}"
+        )
 
     if_exists_mode = "append" if is_incremental else "replace"
     df.to_gbq(
@@ -308,24 +339,24 @@ def process_data(
         chunk_id IS NOT NULL
         AND embedding IS NOT NULL
     """
-    export_df_id = bpd.read_gbq(export_query).to_gbq()
+    # Stream the query results into JSONL shards instead of materializing them
+    # in a temporary table and running an extract job
+    export_rows = (
+        bq_client.query(export_query)
+        .result()
+        .to_arrow_iterable(bqstorage_client=bigquery_storage.BigQueryReadClient())
+    )
+    shards = datastore_export.export_batches(export_rows, output_files.uri)
 
     output_files.uri = output_files.uri + "*.jsonl"
-
-    job_config = bigquery.ExtractJobConfig()
-    job_config.destination_format = bigquery.DestinationFormat.NEWLINE_DELIMITED_JSON
-
-    extract_job = bq_client.extract_table(
-        export_df_id, output_files.uri, job_config=job_config
-    )
-    extract_job.result()
-    logging.info("Exported to JSONL.")
+    logging.info(f"Exported to {len(shards)} JSONL files.")
 {% elif cookiecutter.datastore_type == "vertex_ai_vector_search" %}
 from google_cloud_pipeline_components.types.artifact_types import BQTable
 
 
 @component(
     base_image="us-docker.pkg.dev/production-ai-template/starter-pack/data_processing:0.2",
+    embedded_artifact_path=HELPER_MODULES_DIR,
 )
 def process_data(
     project_id: str,
@@ -344,7 +375,7 @@ def process_data(
     1. Fetching data from BigQuery
     2. Converting HTML to markdown
     3. Splitting text into chunks
-    4. Generating embeddings
+    4. Generating embeddings for new or changed chunks
     5. Storing results in BigQuery
     6. Exporting to JSONL
 
@@ -360,20 +391,20 @@ def process_data(
         location: BigQuery location
     """
     import logging
+    import os
+    import tempfile
     from datetime import datetime, timedelta
 
     import backoff
     import bigframes.ml.llm as llm
     import bigframes.pandas as bpd
     import google.api_core.exceptions
-    import swifter
+    import preprocessing
+    import pyarrow as pa
     from google.cloud import bigquery
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from markdownify import markdownify
 
     # Initialize logging
     logging.basicConfig(level=logging.INFO)
-    logging.info(f"Using {swifter} for apply operations.")
 
     # Initialize clients
     logging.info("Initializing clients...")
@@ -405,11 +436,10 @@ def process_data(
 
     def fetch_stackoverflow_data(
         dataset_suffix: str, start_date: str, end_date: str
-    ) -> bpd.DataFrame:
-        """Fetch StackOverflow data from BigQuery."""
+    ) -> pa.Table:
+        """Fetch the latest version of each StackOverflow question from BigQuery."""
         query = f"""
             SELECT
-                creation_date,
                 last_edit_date,
                 question_id,
                 question_title,
@@ -418,23 +448,12 @@ def process_data(
             FROM `production-ai-template.stackoverflow_qa_{dataset_suffix}.stackoverflow_python_questions_and_answers`
             WHERE TRUE
                 {f'AND TIMESTAMP_TRUNC(creation_date, DAY) BETWEEN TIMESTAMP("{start_date}") AND TIMESTAMP("{end_date}")' if is_incremental else ""}
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY question_id ORDER BY last_edit_date DESC
+            ) = 1
         """
         logging.info("Fetching StackOverflow data from BigQuery...")
-        return bpd.read_gbq(query)
-
-    def convert_html_to_markdown(html: str) -> str:
-        """Convert HTML into Markdown for easier parsing and rendering after LLM response."""
-        return markdownify(html).strip()
-
-    def create_answers_markdown(answers: list) -> str:
-        """Convert each answer's HTML to markdown and concatenate into a single markdown text."""
-        answers_md = ""
-        for index, answer_record in enumerate(answers):
-            answers_md += (
-                f"\n\n## Answer {index + 1}:\n"  # Answer number is H2 heading size
-            )
-            answers_md += convert_html_to_markdown(answer_record["body"])
-        return answers_md
+        return bq_client.query(query).to_arrow()
 
     def create_table_if_not_exist(
         df: bpd.DataFrame,
@@ -458,87 +477,117 @@ def process_data(
         bq_client.create_dataset(dataset, exists_ok=True)
         bq_client.create_table(table=table, exists_ok=True)
 
+    def add_content_hash_column(table_ref: str) -> bool:
+        """Add content_hash to a table written before content hashing.
+
+        Returns True if the table exists and already had the column.
+        """
+        try:
+            table = bq_client.get_table(table_ref)
+        except google.api_core.exceptions.NotFound:
+            return False
+        if "content_hash" in {field.name for field in table.schema}:
+            return True
+        bq_client.query(
+            f"ALTER TABLE `{table_ref}` ADD COLUMN IF NOT EXISTS content_hash STRING"
+        ).result()
+        return False
+
+    def fetch_existing_embeddings(
+        project_id: str, dataset_id: str, table_id: str
+    ) -> bpd.DataFrame | None:
+        """Fetch stored embeddings keyed by chunk content hash, if any exist."""
+        table_ref = f"{project_id}.{dataset_id}.{table_id}"
+        if not add_content_hash_column(table_ref):
+            return None
+        return bpd.read_gbq(
+            f"""
+            SELECT
+                content_hash,
+                ANY_VALUE(embedding) AS embedding,
+                ANY_VALUE(embedding_statistics) AS embedding_statistics,
+                ANY_VALUE(embedding_status) AS embedding_status,
+                TRUE AS has_embedding
+            FROM `{table_ref}`
+            WHERE content_hash IS NOT NULL AND ARRAY_LENGTH(embedding) > 0
+            GROUP BY content_hash
+            """,
+            use_cache=False,
+        )
+
     # Fetch and preprocess data
     logging.info("Fetching and preprocessing data...")
-    df = fetch_stackoverflow_data(
+    questions = fetch_stackoverflow_data(
         start_date=START_DATE.strftime("%Y-%m-%d"),
         end_date=END_DATE.strftime("%Y-%m-%d"),
         dataset_suffix=location.lower().replace("-", "_"),
     )
-    df = (
-        df.sort_values("last_edit_date", ascending=False)
-        .drop_duplicates("question_id")
-        .reset_index(drop=True)
-    )
-    logging.info("Data fetched and preprocessed.")
-
-    # Convert content to markdown
-    logging.info("Converting content to markdown...")
-
-    # Create markdown fields efficiently
-    df["question_title_md"] = (
-        "# " + df["question_title"] + "\n"
-    )  # Title is H1 heading size
-    df["question_text_md"] = (
-        df["question_text"].to_pandas().swifter.apply(convert_html_to_markdown) + "\n"
-    )
-    df["answers_md"] = df["answers"].to_pandas().swifter.apply(create_answers_markdown)
-
-    # Create a column containing the whole markdown text
-    df["full_text_md"] = (
-        df["question_title_md"] + df["question_text_md"] + df["answers_md"]
-    )
-    logging.info("Content converted to markdown.")
-
-    # Keep only necessary columns
-    df = df[["last_edit_date", "question_id", "question_text", "full_text_md"]]
-
-    # Split text into chunks
-    logging.info("Splitting text into chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        length_function=len,
-    )
-
-    df["text_chunk"] = (
-        df["full_text_md"]
-        .to_pandas()
-        .astype(object)
-        .swifter.apply(text_splitter.split_text)
+    logging.info(f"Fetched {questions.num_rows} questions.")
+
+    # Convert content to markdown and split it into chunks, batch by batch in a
+    # process pool, then load the chunk rows back into BigQuery
+    logging.info("Converting content to markdown and splitting into chunks...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chunks_path = os.path.join(tmp_dir, "chunks.parquet")
+        chunk_count = preprocessing.write_parquet(
+            preprocessing.preprocess_questions(
+                questions, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+            ),
+            chunks_path,
+            schema=preprocessing.chunk_schema(questions.schema),
+        )
+        df = bpd.read_parquet(chunks_path, engine="bigquery")
+    logging.info(f"Content split into {chunk_count} chunks.")
+
+    # Reuse stored embeddings for chunks whose content has not changed
+    logging.info("Looking up embeddings of unchanged chunks...")
+    existing_df = fetch_existing_embeddings(
+        project_id=project_id, dataset_id=destination_dataset, table_id=deduped_table
+    )
+    if existing_df is not None:
+        df = df.merge(existing_df, how="left", on="content_hash")
+        is_unchanged = df["has_embedding"].fillna(False)
+        unchanged_df = df[is_unchanged].drop(columns=["has_embedding"])
+        df = df[~is_unchanged].drop(
+            columns=[
+                "embedding",
+                "embedding_statistics",
+                "embedding_status",
+                "has_embedding",
+            ]
+        )
+    else:
+        unchanged_df = None
+    changed_count = len(df)
+    logging.info(
+        f"{changed_count} new or changed chunks, "
+        f"{len(unchanged_df) if unchanged_df is not None else 0} unchanged."
     )
-    logging.info("Text split into chunks.")
-
-    # Create chunk IDs and explode chunks into rows
-    logging.info("Creating chunk IDs and exploding chunks into rows...")
-    chunk_ids = [
-        str(idx) for text_chunk in df["text_chunk"] for idx in range(len(text_chunk))
-    ]
-    df = df.explode("text_chunk").reset_index(drop=True)
-    df["chunk_id"] = df["question_id"].astype("string") + "__" + chunk_ids
-    logging.info("Chunk IDs created and chunks exploded.")
 
     # Generate embeddings
-    logging.info("Generating embeddings...")
+    if changed_count or unchanged_df is None:
+        logging.info("Generating embeddings...")
 
-    # The first invocation in a new project might fail due to permission propagation.
-    @backoff.on_exception(
-        backoff.expo, google.api_core.exceptions.InvalidArgument, max_tries=10
-    )
-    def create_embedder() -> llm.TextEmbeddingGenerator:
-        return llm.TextEmbeddingGenerator(model_name="text-embedding-005")
+        # The first invocation in a new project might fail due to permission propagation.
+        @backoff.on_exception(
+            backoff.expo, google.api_core.exceptions.InvalidArgument, max_tries=10
+        )
+        def create_embedder() -> llm.TextEmbeddingGenerator:
+            return llm.TextEmbeddingGenerator(model_name="text-embedding-005")
 
-    embedder = create_embedder()
+        embedder = create_embedder()
 
-    embeddings_df = embedder.predict(df["text_chunk"])
-    logging.info("Embeddings generated.")
+        embeddings_df = embedder.predict(df["text_chunk"])
+        logging.info("Embeddings generated.")
 
-    df = df.assign(
-        embedding=embeddings_df["ml_generate_embedding_result"],
-        embedding_statistics=embeddings_df["ml_generate_embedding_statistics"],
-        embedding_status=embeddings_df["ml_generate_embedding_status"],
-        creation_timestamp=datetime.now(),
-    )
+        df = df.assign(
+            embedding=embeddings_df["ml_generate_embedding_result"],
+            embedding_statistics=embeddings_df["ml_generate_embedding_statistics"],
+            embedding_status=embeddings_df["ml_generate_embedding_status"],
+        )
+    if unchanged_df is not None:
+        df = bpd.concat([unchanged_df, df]) if changed_count else unchanged_df
+    df = df.reset_index(drop=True).assign(creation_timestamp=datetime.now())
 
     # Store results in BigQuery
     PARTITION_DATE_COLUMN = "creation_timestamp"
@@ -552,6 +601,11 @@ def process_data(
         table_id=destination_table,
         partition_column=PARTITION_DATE_COLUMN,
     )
+    if is_incremental:
+        # Appending rows with content_hash needs the column on older tables too
+        add_content_hash_column(
+            f"{project_id}.{destination_dataset}.{destination_table}"
+        )
 
     if_exists_mode = "append" if is_incremental else "replace"
     df.to_gbq(
@@ -0,0 +1,231 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Readiness probing for documents imported into Vertex AI Search.
+
+After an import operation finishes, documents still take a while to become
+searchable. Instead of sleeping for a fixed time, the ingest_data component
+searches for a sample of the imported documents, using their own content as
+the query, with exponential backoff until all of them are returned or a
+deadline passes.
+"""
+
+import glob
+import json
+import logging
+import re
+import time
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+
+class SearchClient(Protocol):
+    def search(self, query: str, page_size: int) -> list[str]:
+        """Return the ids of the top ``page_size`` documents matching ``query``."""
+        ...
+
+
+@dataclass
+class ProbeDocument:
+    """An imported document and the query expected to return it."""
+
+    id: str
+    query: str
+
+
+@dataclass
+class Readiness:
+    """Outcome of waiting for documents to become searchable."""
+
+    ready: bool
+    found: int
+    total: int
+    attempts: int
+    elapsed: float
+
+
+def _iter_lines(uri_pattern: str) -> Iterator[str]:
+    if uri_pattern.startswith("gs://"):
+        from google.cloud import storage
+
+        bucket_name, _, blob_pattern = uri_pattern[5:].partition("/")
+        prefix, _, suffix = blob_pattern.partition("*")
+        bucket = storage.Client().bucket(bucket_name)
+        for blob in sorted(bucket.list_blobs(prefix=prefix), key=lambda b: b.name):
+            if blob.name.endswith(suffix):
+                with blob.open("r", encoding="utf-8") as f:
+                    yield from f
+        return
+    for path in sorted(glob.glob(uri_pattern)):
+        with open(path, encoding="utf-8") as f:
+            yield from f
+
+
+def sample_documents(
+    uri_pattern: str, sample_size: int = 5, query_words: int = 32
+) -> list[ProbeDocument]:
+    """Read probe documents from the head of the imported JSONL files.
+
+    Args:
+        uri_pattern: ``gs://`` or local path of the files, with one ``*`` wildcard
+        sample_size: Number of documents to probe
+        query_words: Words of each document's content used as its query
+
+    Returns:
+        list[ProbeDocument]: Up to ``sample_size`` documents
+    """
+    documents = []
+    for line in _iter_lines(uri_pattern):
+        if len(documents) >= sample_size:
+            break
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        data = record.get("json_data", record)
+        if isinstance(data, str):
+            data = json.loads(data)
+        content = data.get("content") or ""
+        query = " ".join(content.split()[:query_words])
+        if query:
+            documents.append(ProbeDocument(id=str(record["id"]), query=query))
+    return documents
+
+
+def wait_until_searchable(
+    client: SearchClient,
+    documents: Sequence[ProbeDocument],
+    *,
+    timeout: float = 900.0,
+    initial_delay: float = 5.0,
+    max_delay: float = 60.0,
+    multiplier: float = 2.0,
+    page_size: int = 10,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> Readiness:
+    """Probe until every document is returned by a search or ``timeout`` passes.
+
+    Documents are searched with their own query; once a document has been
+    returned it is not probed again. Between rounds the delay grows from
+    ``initial_delay`` by ``multiplier`` up to ``max_delay``.
+
+    Args:
+        client: Search client of the datastore
+        documents: Documents to probe
+        timeout: Seconds to wait before giving up
+        initial_delay: Seconds between the first two probe rounds
+        max_delay: Maximum seconds between probe rounds
+        multiplier: Backoff factor applied to the delay after each round
+        page_size: Search results inspected per probe
+        sleep: Sleep function, injectable for tests
+        clock: Monotonic clock, injectable for tests
+
+    Returns:
+        Readiness: Whether all documents became searchable in time
+    """
+    started = clock()
+    deadline = started + timeout
+    pending = {document.id: document for document in documents}
+    delay = initial_delay
+    attempts = 0
+    while True:
+        attempts += 1
+        for document_id, document in list(pending.items()):
+            try:
+                if document_id in client.search(document.query, page_size):
+                    del pending[document_id]
+            except Exception as e:
+                logging.warning(f"Probe search for {document_id!r} failed: {e!r}")
+        found = len(documents) - len(pending)
+        logging.info(
+            f"Readiness probe {attempts}: {found}/{len(documents)} documents searchable"
+        )
+        now = clock()
+        if not pending or now >= deadline:
+            return Readiness(
+                ready=not pending,
+                found=found,
+                total=len(documents),
+                attempts=attempts,
+                elapsed=now - started,
+            )
+        sleep(min(delay, deadline - now))
+        delay = min(delay * multiplier, max_delay)
+
+
+class DiscoveryEngineSearchClient:
+    """SearchClient backed by the default serving config of a Vertex AI Search datastore."""
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        data_store_id: str,
+        client_options: Optional[object] = None,
+    ) -> None:
+        from google.cloud import discoveryengine
+
+        self._discoveryengine = discoveryengine
+        self._client = discoveryengine.SearchServiceClient(
+            client_options=client_options
+        )
+        self._serving_config = (
+            f"projects/{project_id}/locations/{location}/collections/default_collection"
+            f"/dataStores/{data_store_id}/servingConfigs/default_config"
+        )
+
+    def search(self, query: str, page_size: int) -> list[str]:
+        request = self._discoveryengine.SearchRequest(
+            serving_config=self._serving_config, query=query, page_size=page_size
+        )
+        response = self._client.search(request=request)
+        return [result.id for result in response.results][:page_size]
+
+
+class InMemorySearchClient:
+    """Local stand-in SearchClient whose documents become visible after a delay.
+
+    Documents are ranked by the number of query terms they contain, and each
+    only shows up in results ``indexing_delay`` seconds after it was added.
+    """
+
+    def __init__(
+        self,
+        indexing_delay: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.indexing_delay = indexing_delay
+        self.clock = clock
+        self._documents: dict[str, tuple[set[str], float]] = {}
+        self.searches = 0
+
+    def add(self, document_id: str, content: str) -> None:
+        self._documents[document_id] = (
+            set(re.findall(r"\w+", content.lower())),
+            self.clock() + self.indexing_delay,
+        )
+
+    def search(self, query: str, page_size: int) -> list[str]:
+        self.searches += 1
+        terms = set(re.findall(r"\w+", query.lower()))
+        now = self.clock()
+        scored = [
+            (len(terms & words), document_id)
+            for document_id, (words, visible_at) in self._documents.items()
+            if visible_at <= now
+        ]
+        ranked = sorted((s for s in scored if s[0] > 0), key=lambda s: -s[0])
+        return [document_id for _, document_id in ranked[:page_size]]
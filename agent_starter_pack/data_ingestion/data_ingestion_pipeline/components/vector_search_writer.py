@@ -0,0 +1,291 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parallel, resumable batch upserts for the Vector Search branch of ingest_data.
+
+Rows are sliced into upsert batches once, from plain column lists. Several
+batches are kept in flight at a time, failed batches are retried individually,
+and completed batches are recorded in a checkpoint so a rerun after a failure
+only upserts what is left.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass
+class UpsertBatch:
+    """One slice of rows passed to a single upsert call."""
+
+    index: int
+    ids: list[str]
+    texts: list[str]
+    embeddings: list[list[float]]
+    metadatas: list[dict[str, Any]]
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash identifying the batch across runs."""
+        digest = hashlib.sha256()
+        for document_id, text in zip(self.ids, self.texts):
+            digest.update(document_id.encode("utf-8") + b"\0")
+            digest.update(text.encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+
+def make_batches(
+    columns: Mapping[str, Sequence[Any]],
+    *,
+    batch_size: int,
+    id_column: str,
+    text_column: str,
+    embedding_column: str,
+    metadata_columns: Sequence[str],
+) -> Iterator[UpsertBatch]:
+    """Slice column lists into upsert batches.
+
+    Args:
+        columns: Equal-length lists of values keyed by column name
+        batch_size: Rows per batch
+        id_column: Column holding the datapoint ids
+        text_column: Column holding the document texts
+        embedding_column: Column holding the embeddings
+        metadata_columns: Columns copied into each row's metadata
+
+    Yields:
+        UpsertBatch: Consecutive batches of at most ``batch_size`` rows
+    """
+    ids = [str(value) for value in columns[id_column]]
+    texts = list(columns[text_column])
+    embeddings = [list(value) for value in columns[embedding_column]]
+    metadata_values = [columns[name] for name in metadata_columns]
+    for index, start in enumerate(range(0, len(ids), batch_size)):
+        end = start + batch_size
+        yield UpsertBatch(
+            index=index,
+            ids=ids[start:end],
+            texts=texts[start:end],
+            embeddings=embeddings[start:end],
+            metadatas=[
+                dict(zip(metadata_columns, row))
+                for row in zip(*(values[start:end] for values in metadata_values))
+            ],
+        )
+
+
+class Checkpoint:
+    """Fingerprints of completed batches, persisted as JSON to ``gs://`` or a local file.
+
+    ``add`` only records a batch in memory; ``save`` writes the whole set, so
+    callers decide how often to pay for a write (GCS allows about one write
+    per second to the same object).
+    """
+
+    def __init__(self, uri: str) -> None:
+        self.uri = uri
+        self._lock = threading.Lock()
+        self.completed: set[str] = set(json.loads(self._read() or "[]"))
+        self.unsaved = 0
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self.completed
+
+    def add(self, fingerprint: str) -> None:
+        """Record a completed batch; it is persisted by the next ``save``."""
+        with self._lock:
+            self.completed.add(fingerprint)
+            self.unsaved += 1
+
+    def save(self) -> None:
+        """Persist the recorded batches if any were added since the last save."""
+        with self._lock:
+            if not self.unsaved:
+                return
+            self._write(json.dumps(sorted(self.completed)))
+            self.unsaved = 0
+
+    def clear(self) -> None:
+        """Delete the checkpoint once every batch has been written."""
+        with self._lock:
+            self.completed.clear()
+            self.unsaved = 0
+            if self.uri.startswith("gs://"):
+                blob = self._blob()
+                if blob.exists():
+                    blob.delete()
+            elif os.path.exists(self.uri):
+                os.remove(self.uri)
+
+    def _blob(self) -> Any:
+        from google.cloud import storage
+
+        bucket_name, _, blob_name = self.uri[5:].partition("/")
+        return storage.Client().bucket(bucket_name).blob(blob_name)
+
+    def _read(self) -> Optional[str]:
+        if self.uri.startswith("gs://"):
+            blob = self._blob()
+            return blob.download_as_text() if blob.exists() else None
+        if not os.path.exists(self.uri):
+            return None
+        with open(self.uri, encoding="utf-8") as f:
+            return f.read()
+
+    def _write(self, data: str) -> None:
+        if self.uri.startswith("gs://"):
+            self._blob().upload_from_string(data, content_type="application/json")
+            return
+        os.makedirs(os.path.dirname(self.uri) or ".", exist_ok=True)
+        tmp_path = f"{self.uri}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.uri)
+
+
+@dataclass
+class WriteResult:
+    """Outcome of writing all batches."""
+
+    written: int = 0
+    skipped: int = 0
+    failed: list[int] = field(default_factory=list)
+
+
+class ParallelUpsertWriter:
+    """Runs upsert calls for several batches concurrently, with retries.
+
+    At most ``max_in_flight`` batches are in flight at once; the next batch is
+    only pulled from the input once one completes, so memory stays bounded for
+    lazily produced batches. Each batch is retried up to ``max_attempts`` times
+    with exponential backoff. Batches already recorded in ``checkpoint`` are
+    skipped. Completed batches are saved to the checkpoint from the calling
+    thread at most every ``checkpoint_interval`` seconds, or sooner once
+    ``checkpoint_batches`` are unsaved, and once more before ``write`` returns;
+    a failed checkpoint write is raised to the caller.
+    """
+
+    def __init__(
+        self,
+        upsert: Callable[[UpsertBatch], None],
+        *,
+        max_in_flight: int = 4,
+        max_attempts: int = 3,
+        initial_backoff: float = 1.0,
+        checkpoint: Optional[Checkpoint] = None,
+        checkpoint_interval: float = 5.0,
+        checkpoint_batches: int = 100,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            upsert: Writes one batch to the index
+            max_in_flight: Maximum concurrent upsert calls
+            max_attempts: Attempts per batch, including the first
+            initial_backoff: Seconds before the first retry, doubled for each retry
+            checkpoint: Completed batches to skip and to record progress in
+            checkpoint_interval: Minimum seconds between checkpoint saves
+            checkpoint_batches: Unsaved completed batches that force a save
+            sleep: Sleep function, injectable for tests
+            clock: Monotonic clock, injectable for tests
+        """
+        self.upsert = upsert
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_batches = checkpoint_batches
+        self.sleep = sleep
+        self.clock = clock
+
+    def write(self, batches: Iterable[UpsertBatch]) -> WriteResult:
+        """Upsert every batch not recorded in the checkpoint.
+
+        Args:
+            batches: Batches to write
+
+        Returns:
+            WriteResult: Written, skipped and failed batch counts
+        """
+        result = WriteResult()
+        in_flight: dict[Future, UpsertBatch] = {}
+        last_save = self.clock()
+
+        def settle(done: Iterable[Future]) -> None:
+            nonlocal last_save
+            for future in done:
+                batch = in_flight.pop(future)
+                if future.exception() is not None:
+                    logging.error(
+                        f"Batch {batch.index} failed after {self.max_attempts} "
+                        f"attempts: {future.exception()!r}"
+                    )
+                    result.failed.append(batch.index)
+                    continue
+                result.written += 1
+                if self.checkpoint is not None:
+                    self.checkpoint.add(batch.fingerprint)
+            if self.checkpoint is not None and (
+                self.checkpoint.unsaved >= self.checkpoint_batches
+                or self.clock() - last_save >= self.checkpoint_interval
+            ):
+                self.checkpoint.save()
+                last_save = self.clock()
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            try:
+                for batch in batches:
+                    if (
+                        self.checkpoint is not None
+                        and batch.fingerprint in self.checkpoint
+                    ):
+                        result.skipped += 1
+                        continue
+                    if len(in_flight) >= self.max_in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        settle(done)
+                    in_flight[executor.submit(self._upsert_with_retries, batch)] = batch
+                settle(wait(in_flight).done)
+            finally:
+                # Keep the progress made so far even when the loop is interrupted
+                if self.checkpoint is not None:
+                    self.checkpoint.save()
+        result.failed.sort()
+        return result
+
+    def _upsert_with_retries(self, batch: UpsertBatch) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.upsert(batch)
+                return
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    raise
+                delay = self.initial_backoff * 2 ** (attempt - 1)
+                logging.warning(
+                    f"Batch {batch.index} attempt {attempt} failed, "
+                    f"retrying in {delay:.1f}s: {e!r}"
+                )
+                self.sleep(delay)
@@ -37,6 +37,7 @@ def pipeline(
     vector_search_data_bucket_name: str = "",
     ingestion_batch_size: int = 1000,
 {%- endif %}
+    datastore_version_uri: str = "",
 ) -> None:
     """Processes data and ingests it into a datastore for RAG Retrieval"""
 
@@ -63,6 +64,7 @@ def pipeline(
         input_files=processed_data.output,
         data_store_id=data_store_id,
         embedding_column="embedding",
+        version_marker_uri=datastore_version_uri,
     ).set_retry(num_retries=2)
 {% elif cookiecutter.datastore_type == "vertex_ai_vector_search" %}
     # Ingest the processed data into Vertex AI Vector Search
@@ -77,5 +79,6 @@ def pipeline(
         is_incremental=False,
         look_back_days=look_back_days,
         ingestion_batch_size=ingestion_batch_size,
+        version_marker_uri=datastore_version_uri,
     ).set_retry(num_retries=2)
 {% endif %}
\ No newline at end of file
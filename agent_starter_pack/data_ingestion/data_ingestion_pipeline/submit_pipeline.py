@@ -67,6 +67,11 @@ def parse_args() -> argparse.Namespace:
         help="Vector Search Data Bucket Name",
     )
 {%- endif %}
+    parser.add_argument(
+        "--datastore-version-uri",
+        default=os.getenv("DATASTORE_VERSION_URI", ""),
+        help="gs:// object the pipeline updates after each ingestion",
+    )
     parser.add_argument(
         "--service-account",
         default=os.getenv("SERVICE_ACCOUNT"),
@@ -198,6 +203,10 @@ if __name__ == "__main__":
         args.vector_search_data_bucket_name
     )
 {%- endif %}
+    if args.datastore_version_uri:
+        pipeline_job_params["parameter_values"]["datastore_version_uri"] = (
+            args.datastore_version_uri
+        )
 
     if not args.schedule_only:
         logging.info("Running pipeline and waiting for completion...")
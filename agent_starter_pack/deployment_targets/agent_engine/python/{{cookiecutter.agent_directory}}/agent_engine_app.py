@@ -33,12 +33,10 @@ from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
 from google.adk.a2a.utils.agent_card_builder import AgentCardBuilder
 from google.adk.apps import App
 {%- endif %}
-from google.adk.artifacts import GcsArtifactService, InMemoryArtifactService
 {%- if cookiecutter.is_a2a %}
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 {%- endif %}
-from google.cloud import logging as google_cloud_logging
 {%- if cookiecutter.is_adk_live %}
 from vertexai.agent_engines.templates.adk import AdkApp
 from vertexai.preview.reasoning_engines import AdkApp as PreviewAdkApp
@@ -53,6 +51,8 @@ from {{cookiecutter.agent_directory}}.agent import app as adk_app
 {%- else %}
 
 {%- endif %}
+from {{cookiecutter.agent_directory}}.app_utils.artifact_service import create_artifact_service
+from {{cookiecutter.agent_directory}}.app_utils.log_sink import create_log_sink
 from {{cookiecutter.agent_directory}}.app_utils.telemetry import setup_telemetry
 from {{cookiecutter.agent_directory}}.app_utils.typing import Feedback
 
@@ -124,13 +124,15 @@ class AgentEngineApp(AdkApp):
         setup_telemetry()
         super().set_up()
         logging.basicConfig(level=logging.INFO)
-        logging_client = google_cloud_logging.Client()
-        self.logger = logging_client.logger(__name__)
+        self.logger = create_log_sink(__name__)
         if gemini_location:
             os.environ["GOOGLE_CLOUD_LOCATION"] = gemini_location
 
     def register_feedback(self, feedback: dict[str, Any]) -> None:
-        """Collect and log feedback."""
+        """Collect and log feedback.
+
+        The record is queued and written to Cloud Logging in the background.
+        """
         feedback_obj = Feedback.model_validate(feedback)
         self.logger.log_struct(feedback_obj.model_dump(), severity="INFO")
 
@@ -162,19 +164,13 @@ logs_bucket_name = os.environ.get("LOGS_BUCKET_NAME")
 {%- if cookiecutter.is_a2a %}
 agent_engine = AgentEngineApp.create(
     app=adk_app,
-    artifact_service=(
-        GcsArtifactService(bucket_name=logs_bucket_name)
-        if logs_bucket_name
-        else InMemoryArtifactService()
-    ),
+    artifact_service=create_artifact_service(logs_bucket_name),
     session_service=InMemorySessionService(),
 )
 {%- else %}
 agent_engine = AgentEngineApp(
     app=adk_app,
-    artifact_service_builder=lambda: GcsArtifactService(bucket_name=logs_bucket_name)
-    if logs_bucket_name
-    else InMemoryArtifactService(),
+    artifact_service_builder=lambda: create_artifact_service(logs_bucket_name),
 )
 {%- endif -%}
 {% else %}
@@ -188,13 +184,13 @@ import nest_asyncio
 import vertexai
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill, TransportProtocol
 from dotenv import load_dotenv
-from google.cloud import logging as google_cloud_logging
 from vertexai.preview.reasoning_engines import A2aAgent
 
 from {{cookiecutter.agent_directory}}.agent import root_agent
 from {{cookiecutter.agent_directory}}.app_utils.executor.a2a_agent_executor import (
     LangGraphAgentExecutor,
 )
+from {{cookiecutter.agent_directory}}.app_utils.log_sink import create_log_sink
 from {{cookiecutter.agent_directory}}.app_utils.telemetry import setup_telemetry
 from {{cookiecutter.agent_directory}}.app_utils.typing import Feedback
 
@@ -262,14 +258,16 @@ class AgentEngineApp(A2aAgent):
         setup_telemetry()
         super().set_up()
         logging.basicConfig(level=logging.INFO)
-        logging_client = google_cloud_logging.Client()
-        self.logger = logging_client.logger(__name__)
+        self.logger = create_log_sink(__name__)
         # Restore the original location after set_up() may have changed it
         if gemini_location:
             os.environ["GOOGLE_CLOUD_LOCATION"] = gemini_location
 
     def register_feedback(self, feedback: dict[str, Any]) -> None:
-        """Collect and log feedback."""
+        """Collect and log feedback.
+
+        The record is queued and written to Cloud Logging in the background.
+        """
         feedback_obj = Feedback.model_validate(feedback)
         self.logger.log_struct(feedback_obj.model_dump(), severity="INFO")
 
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import asyncio
+import functools
+import importlib
 import json
 import logging
 import uuid
@@ -27,10 +29,11 @@ from fastapi import FastAPI, HTTPException, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
-from google.cloud import logging as google_cloud_logging
 from pydantic import BaseModel, Field
 from websockets.exceptions import ConnectionClosedError
 
+from .log_sink import create_log_sink
+
 app = FastAPI()
 app.add_middleware(
     CORSMiddleware,
@@ -50,8 +53,7 @@ if frontend_build_dir.exists():
         StaticFiles(directory=str(frontend_build_dir / "assets")),
         name="assets",
     )
-logging_client = google_cloud_logging.Client()
-logger = logging_client.logger(__name__)
+logger = create_log_sink(__name__)
 logging.basicConfig(level=logging.INFO)
 
 # Initialize default configuration
@@ -192,10 +194,7 @@ class WebSocketToQueueAdapter:
         self, project_id: str, location: str, remote_agent_engine_id: str
     ) -> None:
         """Run the remote agent engine connection."""
-        client = vertexai.Client(
-            project=project_id,
-            location=location,
-        )
+        client = _get_remote_client(project_id, location)
 
         async with client.aio.live.agent_engines.connect(
             agent_engine=remote_agent_engine_id,
@@ -245,17 +244,32 @@ class WebSocketToQueueAdapter:
             )
 
 
+@functools.cache
+def _get_remote_client(project_id: str, location: str) -> vertexai.Client:
+    """Return the shared Vertex AI client for a project and location.
+
+    Created on first use and reused by every WebSocket session and retry, so
+    credentials and the underlying HTTP transport are set up only once.
+    """
+    return vertexai.Client(
+        project=project_id,
+        location=location,
+    )
+
+
+@functools.cache
 def _dynamic_import(path: str) -> Any:
     """Dynamically import an object from a given path.
 
+    The result is memoized, so the agent engine object is resolved once and
+    shared by every WebSocket connection and reconnect attempt.
+
     Args:
         path: Python import path (e.g., '..agent.root_agent')
 
     Returns:
         The imported object
     """
-    import importlib
-
     module_path, object_name = path.rsplit(".", 1)
     module = importlib.import_module(module_path, package=__package__)
     return getattr(module, object_name)
@@ -345,6 +359,7 @@ def collect_feedback(feedback: Feedback) -> dict[str, str]:
     Returns:
         Success message
     """
+    # Queued for a background batch write so feedback bursts don't block workers
     logger.log_struct(feedback.model_dump(), severity="INFO")
     return {"status": "success"}
 
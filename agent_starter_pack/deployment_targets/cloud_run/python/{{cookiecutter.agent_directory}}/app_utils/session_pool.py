@@ -0,0 +1,159 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlparse
+
+from google.adk.sessions import BaseSessionService
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+try:
+    from google.adk.cli.service_registry import get_service_registry
+except ImportError:  # google-adk < 1.17 has no service registry
+    get_service_registry = None
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ("true", "1", "yes")
+
+
+@dataclass(frozen=True)
+class SessionPoolConfig:
+    """Connection pool settings for the Cloud SQL session database.
+
+    Attributes:
+        min_size: Connections kept open and pre-opened at startup
+        max_size: Upper bound on concurrent connections (min_size + overflow)
+        pre_ping: Test connections for liveness before handing them out
+        recycle: Seconds after which a pooled connection is replaced
+    """
+
+    min_size: int = 2
+    max_size: int = 10
+    pre_ping: bool = True
+    recycle: int = 1800
+
+    @classmethod
+    def from_env(cls) -> "SessionPoolConfig":
+        """Build the pool configuration from SESSION_POOL_* environment variables."""
+        min_size = int(os.environ.get("SESSION_POOL_MIN_SIZE", cls.min_size))
+        max_size = int(os.environ.get("SESSION_POOL_MAX_SIZE", cls.max_size))
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(
+                "Invalid session pool size: SESSION_POOL_MIN_SIZE must be between "
+                f"0 and SESSION_POOL_MAX_SIZE (got min={min_size}, max={max_size})"
+            )
+        return cls(
+            min_size=min_size,
+            max_size=max_size,
+            pre_ping=_env_bool("SESSION_POOL_PRE_PING", cls.pre_ping),
+            recycle=int(os.environ.get("SESSION_POOL_RECYCLE_SECONDS", cls.recycle)),
+        )
+
+    def engine_kwargs(self) -> dict[str, Any]:
+        """Return the engine keyword arguments ``DatabaseSessionService`` accepts."""
+        return {
+            "pool_size": self.min_size,
+            "max_overflow": self.max_size - self.min_size,
+            "pool_pre_ping": self.pre_ping,
+            "pool_recycle": self.recycle,
+        }
+
+
+def service_registry_available() -> bool:
+    """Whether the installed ADK lets ``register_session_service`` take effect."""
+    return get_service_registry is not None
+
+
+def register_session_service(
+    session_service_uri: str, session_service: BaseSessionService
+) -> None:
+    """Make ``get_fast_api_app`` use a pre-built session service for this URI.
+
+    ``get_fast_api_app`` only accepts a session service URI, so the instance is
+    shared through ADK's service registry. This keeps a handle on the exact
+    service and pool the app uses, which the startup hook can then warm.
+    Check ``service_registry_available`` first: older ADK versions have no
+    registry and build the service from the URI themselves.
+
+    Args:
+        session_service_uri: Session service URI passed to ``get_fast_api_app``
+        session_service: Service to return for that URI's scheme
+
+    Raises:
+        RuntimeError: If the installed ADK has no service registry
+    """
+    if get_service_registry is None:
+        raise RuntimeError(
+            "Registering a session service requires google-adk>=1.17.0"
+        )
+    scheme = urlparse(session_service_uri).scheme
+    get_service_registry().register_session_service(
+        scheme, lambda _uri, **_kwargs: session_service
+    )
+
+
+async def warm_session_pool(engine: AsyncEngine | Engine, min_size: int) -> None:
+    """Open ``min_size`` pooled connections so the first requests skip the handshake.
+
+    All connections are held at the same time so the pool establishes distinct
+    connections, then returned to the pool where they stay open. ADK releases
+    before 1.19 back ``DatabaseSessionService`` with a synchronous engine,
+    which is warmed on a worker thread.
+
+    Args:
+        engine: Engine whose pool should be warmed
+        min_size: Number of connections to pre-open
+    """
+    if min_size <= 0:
+        return
+    if isinstance(engine, AsyncEngine):
+        connections = await asyncio.gather(
+            *(engine.connect() for _ in range(min_size))
+        )
+        try:
+            await asyncio.gather(
+                *(conn.execute(text("SELECT 1")) for conn in connections)
+            )
+        finally:
+            await asyncio.gather(*(conn.close() for conn in connections))
+    else:
+        await asyncio.to_thread(_warm_sync_pool, engine, min_size)
+    logging.info(f"Session database pool warmed with {min_size} connection(s)")
+
+
+def _warm_sync_pool(engine: Engine, min_size: int) -> None:
+    connections = [engine.connect() for _ in range(min_size)]
+    try:
+        for conn in connections:
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+async def dispose_session_engine(engine: AsyncEngine | Engine) -> None:
+    """Close every pooled connection of a synchronous or async engine."""
+    if isinstance(engine, AsyncEngine):
+        await engine.dispose()
+    else:
+        engine.dispose()
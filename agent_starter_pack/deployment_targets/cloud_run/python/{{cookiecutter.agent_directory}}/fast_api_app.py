@@ -26,15 +26,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from google.adk.agents.live_request_queue import LiveRequest, LiveRequestQueue
-from google.adk.artifacts import GcsArtifactService, InMemoryArtifactService
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.runners import Runner
 from google.adk.sessions.in_memory_session_service import InMemorySessionService
-from google.cloud import logging as google_cloud_logging
 from vertexai.agent_engines import _utils
 from websockets.exceptions import ConnectionClosedError
 
 from .agent import app as adk_app
+from .app_utils.artifact_service import create_artifact_service
+from .app_utils.log_sink import create_log_sink
 from .app_utils.telemetry import setup_telemetry
 from .app_utils.typing import Feedback
 
@@ -57,8 +57,7 @@ if frontend_build_dir.exists():
         StaticFiles(directory=str(frontend_build_dir / "assets")),
         name="assets",
     )
-logging_client = google_cloud_logging.Client()
-logger = logging_client.logger(__name__)
+logger = create_log_sink(__name__)
 logging.basicConfig(level=logging.INFO)
 
 setup_telemetry()
@@ -68,11 +67,7 @@ _, project_id = google.auth.default()
 # Initialize ADK services
 session_service = InMemorySessionService()
 logs_bucket_name = os.environ.get("LOGS_BUCKET_NAME")
-artifact_service = (
-    GcsArtifactService(bucket_name=logs_bucket_name)
-    if logs_bucket_name
-    else InMemoryArtifactService()
-)
+artifact_service = create_artifact_service(logs_bucket_name)
 memory_service = InMemoryMemoryService()
 
 # Initialize ADK runner
@@ -295,7 +290,7 @@ async def serve_frontend_spa(full_path: str) -> FileResponse | dict:
     return {"status": "ok", "message": "Backend running. Frontend not built."}
 {% elif cookiecutter.is_adk %}
 import os
-{%- if cookiecutter.is_a2a %}
+{%- if cookiecutter.is_a2a or cookiecutter.session_type == "cloud_sql" %}
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 {%- endif %}
@@ -318,27 +313,44 @@ from fastapi import FastAPI
 {%- if cookiecutter.is_a2a %}
 from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
 from google.adk.a2a.utils.agent_card_builder import AgentCardBuilder
-from google.adk.artifacts import GcsArtifactService, InMemoryArtifactService
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 {%- else %}
 from google.adk.cli.fast_api import get_fast_api_app
 {%- endif %}
-from google.cloud import logging as google_cloud_logging
+{%- if cookiecutter.session_type == "cloud_sql" %}
+from google.adk.sessions import BaseSessionService, DatabaseSessionService
+{%- endif %}
 {% if cookiecutter.session_type == "agent_engine" -%}
 from vertexai import agent_engines
 {% endif %}
 
 {%- if cookiecutter.is_a2a %}
 from {{cookiecutter.agent_directory}}.agent import app as adk_app
+from {{cookiecutter.agent_directory}}.app_utils.artifact_service import create_artifact_service
+{%- else %}
+from {{cookiecutter.agent_directory}}.app_utils.artifact_service import (
+    create_artifact_service,
+    register_artifact_service,
+)
+{%- endif %}
+from {{cookiecutter.agent_directory}}.app_utils.log_sink import create_log_sink
+{%- if cookiecutter.session_type == "cloud_sql" %}
+from {{cookiecutter.agent_directory}}.app_utils.session_cache import CachedSessionService
+from {{cookiecutter.agent_directory}}.app_utils.session_pool import (
+    SessionPoolConfig,
+    dispose_session_engine,
+    register_session_service,
+    service_registry_available,
+    warm_session_pool,
+)
 {%- endif %}
 from {{cookiecutter.agent_directory}}.app_utils.telemetry import setup_telemetry
 from {{cookiecutter.agent_directory}}.app_utils.typing import Feedback
 
 setup_telemetry()
 _, project_id = google.auth.default()
-logging_client = google_cloud_logging.Client()
-logger = logging_client.logger(__name__)
+logger = create_log_sink(__name__)
 {%- if not cookiecutter.is_a2a %}
 allow_origins = (
     os.getenv("ALLOW_ORIGINS", "").split(",") if os.getenv("ALLOW_ORIGINS") else None
@@ -348,11 +360,7 @@ allow_origins = (
 # Artifact bucket for ADK (created by Terraform, passed via env var)
 logs_bucket_name = os.environ.get("LOGS_BUCKET_NAME")
 {%- if cookiecutter.is_a2a %}
-artifact_service = (
-    GcsArtifactService(bucket_name=logs_bucket_name)
-    if logs_bucket_name
-    else InMemoryArtifactService()
-)
+artifact_service = create_artifact_service(logs_bucket_name)
 
 runner = Runner(
     app=adk_app,
@@ -408,7 +416,14 @@ db_name = os.environ.get("DB_NAME", "postgres")
 db_pass = os.environ.get("DB_PASS")
 instance_connection_name = os.environ.get("INSTANCE_CONNECTION_NAME")
 
+# Pool sizing is configurable via SESSION_POOL_MIN_SIZE, SESSION_POOL_MAX_SIZE,
+# SESSION_POOL_PRE_PING and SESSION_POOL_RECYCLE_SECONDS
+session_pool_config = SessionPoolConfig.from_env()
+
 session_service_uri = None
+session_db_kwargs = None
+session_engine = None
+session_service: BaseSessionService | None = None
 if instance_connection_name and db_pass:
     # Use Unix socket for Cloud SQL
     # URL-encode username and password to handle special characters (e.g., '[', '?', '#', '$')
@@ -423,6 +438,20 @@ if instance_connection_name and db_pass:
         f"/{db_name}"
         f"?host=/cloudsql/{encoded_instance}"
     )
+    if service_registry_available():
+        session_service = DatabaseSessionService(
+            db_url=session_service_uri, **session_pool_config.engine_kwargs()
+        )
+        session_engine = session_service.db_engine
+        # Opt in to the write-behind session cache with SESSION_CACHE_ENABLED=true
+        if os.environ.get("SESSION_CACHE_ENABLED", "").lower() in ("true", "1", "yes"):
+            session_service = CachedSessionService.from_env(session_service)
+        register_session_service(session_service_uri, session_service)
+    else:
+        # Without a service registry (google-adk < 1.17) get_fast_api_app builds
+        # the session service itself; it still gets the pool settings, but no
+        # startup warm-up or write-behind cache
+        session_db_kwargs = session_pool_config.engine_kwargs()
 {%- elif cookiecutter.session_type == "agent_engine" %}
 # Agent Engine session configuration
 # Check if we should use in-memory session for testing (set USE_IN_MEMORY_SESSION=true for E2E tests)
@@ -457,7 +486,25 @@ session_service_uri = None
 {%- endif %}
 
 artifact_service_uri = f"gs://{logs_bucket_name}" if logs_bucket_name else None
+if artifact_service_uri:
+    # Streams artifact transfers on a dedicated thread pool with a small-artifact cache
+    register_artifact_service(
+        artifact_service_uri, create_artifact_service(logs_bucket_name)
+    )
+{% if cookiecutter.session_type == "cloud_sql" %}
 
+@asynccontextmanager
+async def lifespan(app_instance: FastAPI) -> AsyncIterator[None]:
+    """Pre-open the session pool before the instance starts serving /health."""
+    if session_engine is not None:
+        await warm_session_pool(session_engine, session_pool_config.min_size)
+    yield
+    if isinstance(session_service, CachedSessionService):
+        await session_service.close()
+    if session_engine is not None:
+        await dispose_session_engine(session_engine)
+
+{% endif %}
 app: FastAPI = get_fast_api_app(
     agents_dir=AGENT_DIR,
     web=True,
@@ -465,6 +512,10 @@ app: FastAPI = get_fast_api_app(
     allow_origins=allow_origins,
     session_service_uri=session_service_uri,
     otel_to_cloud=True,
+{%- if cookiecutter.session_type == "cloud_sql" %}
+    session_db_kwargs=session_db_kwargs,
+    lifespan=lifespan,
+{%- endif %}
 )
 app.title = "{{cookiecutter.project_name}}"
 app.description = "API for interacting with the Agent {{cookiecutter.project_name}}"
@@ -483,12 +534,12 @@ from a2a.utils.constants import (
     EXTENDED_AGENT_CARD_PATH,
 )
 from fastapi import FastAPI
-from google.cloud import logging as google_cloud_logging
 
 from {{cookiecutter.agent_directory}}.agent import root_agent
 from {{cookiecutter.agent_directory}}.app_utils.executor.a2a_agent_executor import (
     LangGraphAgentExecutor,
 )
+from {{cookiecutter.agent_directory}}.app_utils.log_sink import create_log_sink
 from {{cookiecutter.agent_directory}}.app_utils.telemetry import setup_telemetry
 from {{cookiecutter.agent_directory}}.app_utils.typing import Feedback
 
@@ -544,8 +595,7 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-logging_client = google_cloud_logging.Client()
-logger = logging_client.logger(__name__)
+logger = create_log_sink(__name__)
 {% endif %}
 
 @app.post("/feedback")
@@ -558,6 +608,7 @@ def collect_feedback(feedback: Feedback) -> dict[str, str]:
     Returns:
         Success message
     """
+    # Queued for a background batch write so feedback bursts don't block workers
     logger.log_struct(feedback.model_dump(), severity="INFO")
     return {"status": "success"}
 
@@ -1,14 +1,25 @@
 import hashlib
-import json
-from typing import Any, Dict, Mapping
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from agent_starter_pack.utils.canonical_json import canonicalize
+from agent_starter_pack.utils.merkle import MerkleAccumulator
 
 
 def sha256_hex(data: str) -> str:
     return hashlib.sha256(data.encode("utf-8")).hexdigest()
 
 
-def execute_fossilization(input_data: Mapping[str, Any]) -> Dict[str, str]:
-    """Canonicalize and fossilize a customer inquiry (CIE-V1 Domain Swap Protocol)."""
+def execute_fossilization(
+    input_data: Mapping[str, Any],
+    accumulator: Optional[MerkleAccumulator] = None,
+) -> Dict[str, Any]:
+    """Canonicalize and fossilize a customer inquiry (CIE-V1 Domain Swap Protocol).
+
+    Without an accumulator the inquiry forms a tree of its own, whose root is
+    the leaf digest. With one, it is appended as a batch of one.
+    """
+    if accumulator is not None:
+        return fossilize_batch([input_data], accumulator)[0]
     customer_id = input_data.get("customer_id")
     inquiry_type = input_data.get("inquiry_type")
     message = input_data.get("message")
@@ -25,7 +36,7 @@ def execute_fossilization(input_data: Mapping[str, Any]) -> Dict[str, str]:
         "timestamp": timestamp,
     }
 
-    canonical_json = json.dumps(preimage, sort_keys=True, separators=(",", ":"))
+    canonical_json = canonicalize(preimage)
     leaf_digest = sha256_hex(canonical_json)
 
     if header_event_id:
@@ -46,5 +57,29 @@ def execute_fossilization(input_data: Mapping[str, Any]) -> Dict[str, str]:
     }
 
 
+def fossilize_batch(
+    inputs: Iterable[Mapping[str, Any]], accumulator: MerkleAccumulator
+) -> List[Dict[str, Any]]:
+    """Fossilize inquiries as one batch appended to ``accumulator``.
+
+    Every record gets the tree root after the batch, its leaf index and an
+    inclusion proof against that root. The batch is committed, so the
+    accumulator checkpoint can be saved once the records are stored.
+    """
+    records = [execute_fossilization(input_data) for input_data in inputs]
+    if not records:
+        return records
+    start = accumulator.extend(record["leaf_digest"] for record in records)
+    proofs = [accumulator.inclusion_proof(start + i) for i in range(len(records))]
+    commitment = accumulator.commit()
+    for i, (record, proof) in enumerate(zip(records, proofs)):
+        record["merkle_root"] = commitment.root
+        record["batch_root"] = commitment.batch_root
+        record["leaf_index"] = start + i
+        record["tree_size"] = commitment.tree_size
+        record["inclusion_proof"] = proof
+    return records
+
+
 # Zapier Entry Point:
 # output = execute_fossilization(input_data)
@@ -1,25 +1,209 @@
+import argparse
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 import hashlib
 import json
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 import yaml
 
+from agent_starter_pack.utils.canonical_json import canonicalize
+
+# libyaml's parser is an order of magnitude faster when PyYAML was built with it
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+FOSSIL_SUFFIXES = (".yaml", ".yml")
+
 
 def canonicalize_jcs(data: dict) -> str:
     """Implements JSON Canonicalization Scheme (RFC 8785) for YAML objects."""
-    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return canonicalize(data)
+
+
+def _fossil_digests(text: str) -> Tuple[Any, str]:
+    """Return the (provided, computed) digests of a fossil document."""
+    artifact = yaml.load(text, Loader=_SafeLoader)
+    provided_digest = artifact.pop("digest")
+    computed_digest = hashlib.sha256(canonicalize_jcs(artifact).encode()).hexdigest()
+    return provided_digest, computed_digest
 
 
 def verify_fossil(path_to_yaml: str) -> bool:
     """Verifies the integrity of a fossil artifact against its digest."""
     with open(path_to_yaml, "r", encoding="utf-8") as f:
-        artifact = yaml.safe_load(f)
-
-    provided_digest = artifact.pop("digest")
-    computed_digest = hashlib.sha256(canonicalize_jcs(artifact).encode()).hexdigest()
+        provided_digest, computed_digest = _fossil_digests(f.read())
 
     return provided_digest == computed_digest
 
 
+@dataclass(frozen=True)
+class FossilResult:
+    """Outcome of verifying one fossil file."""
+
+    path: str
+    file_sha256: str
+    verified: bool
+    provided_digest: Optional[str] = None
+    computed_digest: Optional[str] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+
+def _verify_fossil_group(group: List[Tuple[str, str, bytes]]) -> List[FossilResult]:
+    """Verify (path, file hash, contents) triples; runs in a worker process."""
+    results = []
+    for path, file_sha256, data in group:
+        try:
+            provided, computed = _fossil_digests(data.decode("utf-8"))
+        except Exception as e:
+            results.append(
+                FossilResult(
+                    path, file_sha256, verified=False, error=f"{type(e).__name__}: {e}"
+                )
+            )
+            continue
+        results.append(
+            FossilResult(
+                path,
+                file_sha256,
+                verified=provided == computed,
+                provided_digest=str(provided),
+                computed_digest=computed,
+            )
+        )
+    return results
+
+
+def iter_fossil_paths(directory: str) -> Iterator[str]:
+    """Yield the fossil files under ``directory`` in a stable order."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(FOSSIL_SUFFIXES):
+                yield os.path.join(root, name)
+
+
+def _load_cache(cache_path: Optional[str]) -> Set[str]:
+    if not cache_path or not os.path.exists(cache_path):
+        return set()
+    with open(cache_path, encoding="utf-8") as f:
+        return set(json.load(f).get("verified", []))
+
+
+def _save_cache(cache_path: str, verified: Set[str]) -> None:
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"verified": sorted(verified)}, f)
+    os.replace(tmp_path, cache_path)
+
+
+def verify_fossil_directory(
+    directory: str,
+    *,
+    cache_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    group_size: int = 64,
+) -> Iterator[FossilResult]:
+    """Verify every fossil under ``directory``, yielding a result per file.
+
+    Files whose content hash is recorded in ``cache_path`` as verified are
+    reported right away with ``cached=True``, without being parsed. The rest
+    are parsed and re-hashed in a process pool, ``group_size`` files per
+    task (or in this process when ``max_workers`` is 1), and reported as
+    their groups finish. Once the walk completes, the cache is rewritten
+    with the hashes of every file that verified, so files that changed or
+    disappeared drop out of it.
+    """
+    cached = _load_cache(cache_path)
+    verified: Set[str] = set()
+    workers = max_workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # Groups handed to the pool but not yet reported; bounding them bounds
+    # the file contents held in memory
+    pending: List[Union[Future, List[FossilResult]]] = []
+
+    def report(limit: int) -> Iterator[FossilResult]:
+        while len(pending) > limit:
+            group_results = pending.pop(0)
+            if isinstance(group_results, Future):
+                group_results = group_results.result()
+            for result in group_results:
+                if result.verified:
+                    verified.add(result.file_sha256)
+                yield result
+
+    def dispatch(group: List[Tuple[str, str, bytes]]) -> None:
+        if executor is None:
+            pending.append(_verify_fossil_group(group))
+        else:
+            pending.append(executor.submit(_verify_fossil_group, group))
+
+    try:
+        group: List[Tuple[str, str, bytes]] = []
+        for path in iter_fossil_paths(directory):
+            with open(path, "rb") as f:
+                data = f.read()
+            file_sha256 = hashlib.sha256(data).hexdigest()
+            if file_sha256 in cached:
+                verified.add(file_sha256)
+                yield FossilResult(path, file_sha256, verified=True, cached=True)
+                continue
+            group.append((path, file_sha256, data))
+            if len(group) == group_size:
+                dispatch(group)
+                group = []
+                yield from report(2 * workers)
+        if group:
+            dispatch(group)
+        yield from report(0)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    if cache_path:
+        _save_cache(cache_path, verified)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Verify every fossil artifact in a directory against its digest."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--cache", help="JSON file of already verified file hashes")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    counts: Dict[str, int] = {"verified": 0, "cached": 0, "failed": 0}
+    for result in verify_fossil_directory(
+        args.directory, cache_path=args.cache, max_workers=args.workers
+    ):
+        if result.cached:
+            counts["cached"] += 1
+        elif result.verified:
+            counts["verified"] += 1
+        else:
+            counts["failed"] += 1
+            detail = result.error or (
+                f"provided {result.provided_digest}, computed {result.computed_digest}"
+            )
+            print(f"MISMATCH {result.path}: {detail}", flush=True)
+    print(
+        f"{counts['verified']} verified, {counts['cached']} unchanged since last "
+        f"run, {counts['failed']} failed"
+    )
+    return 1 if counts["failed"] else 0
+
+
 # Kernel usage:
 # if verify_fossil("validation/fossils/AgentProposalReceipt.v1.yaml"):
 #     engage_replay_court()
+#
+# Directory audit (reruns only parse files that changed):
+# python -m agent_starter_pack.resources.cie_v1.sovereign.replay_court_reconstruction \
+#     validation/fossils --cache .fossil_cache.json
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Protocol, Sequence
+
+from agent_starter_pack.runtime.kinetic_resolver import AuditLedger, TaskOntology
+
+
+@dataclass(frozen=True)
+class AuditRecord:
+    timestamp: float
+    intent: str
+    required_capabilities: list[str]
+    energy_budget: float
+    verdict: str
+    energy_cost: float | None
+    expert_id: str | None = None
+
+
+class AuditSink(Protocol):
+    def write_batch(self, records: Sequence[AuditRecord]) -> None:
+        """Persist ``records`` in one operation."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class JsonlAuditSink:
+    """Append-only JSONL file; each batch is one write followed by one fsync."""
+
+    def __init__(self, path: str, *, fsync: bool = True) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write_batch(self, records: Sequence[AuditRecord]) -> None:
+        self._file.write(
+            "".join(json.dumps(asdict(record)) + "\n" for record in records)
+        )
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SQLiteAuditSink:
+    """SQLite table in WAL mode; each batch is one transaction."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # Only the flusher thread writes after construction
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS audit_log ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, "
+            "intent TEXT NOT NULL, required_capabilities TEXT NOT NULL, "
+            "energy_budget REAL NOT NULL, verdict TEXT NOT NULL, energy_cost REAL, "
+            "expert_id TEXT)"
+        )
+        columns = {
+            row[1] for row in self._connection.execute("PRAGMA table_info(audit_log)")
+        }
+        if "expert_id" not in columns:
+            # Ledgers created before expert ids were recorded
+            self._connection.execute("ALTER TABLE audit_log ADD COLUMN expert_id TEXT")
+        self._connection.commit()
+
+    def write_batch(self, records: Sequence[AuditRecord]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO audit_log (timestamp, intent, required_capabilities, "
+                "energy_budget, verdict, energy_cost, expert_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        record.timestamp,
+                        record.intent,
+                        json.dumps(record.required_capabilities),
+                        record.energy_budget,
+                        record.verdict,
+                        record.energy_cost,
+                        record.expert_id,
+                    )
+                    for record in records
+                ],
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class RingBufferAuditSink:
+    """Keeps only the most recent ``capacity`` records in memory."""
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        self._records: deque[AuditRecord] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def write_batch(self, records: Sequence[AuditRecord]) -> None:
+        with self._lock:
+            self._records.extend(records)
+
+    def records(self) -> list[AuditRecord]:
+        with self._lock:
+            return list(self._records)
+
+    def close(self) -> None:
+        pass
+
+
+_SHUTDOWN = object()
+
+
+class BufferedAuditLedger(AuditLedger):
+    """AuditLedger that hands records to a background thread for persistence.
+
+    ``record`` only enqueues, so routing never waits on I/O. The flusher
+    thread drains up to ``max_batch`` records at a time and writes them to
+    ``sink`` as one batch, at least every ``flush_interval`` seconds while
+    records are pending. The queue holds at most ``max_pending`` records;
+    when it is full, new records are dropped and counted in ``dropped``
+    rather than blocking the caller. Call ``close`` (or use the ledger as a
+    context manager) to flush everything pending before shutdown.
+    """
+
+    def __init__(
+        self,
+        sink: AuditSink,
+        *,
+        max_pending: int = 10_000,
+        max_batch: int = 512,
+        flush_interval: float = 0.05,
+    ) -> None:
+        self.sink = sink
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.failed = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="audit-ledger-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def record(
+        self,
+        task: TaskOntology,
+        verdict: str,
+        energy_cost: float | None,
+        expert_id: str | None = None,
+    ) -> None:
+        if self._closed:
+            raise RuntimeError("Audit ledger is closed")
+        record = AuditRecord(
+            timestamp=time.time(),
+            intent=task.intent,
+            required_capabilities=list(task.required_capabilities),
+            energy_budget=task.energy_budget,
+            verdict=verdict,
+            energy_cost=energy_cost,
+            expert_id=expert_id,
+        )
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until every record enqueued so far has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending records, stop the flusher and close the sink."""
+        if self._closed:
+            return
+        self._closed = True
+        # The sentinel must get in even when the queue is full
+        self._queue.put(_SHUTDOWN)
+        self._thread.join()
+        self.sink.close()
+
+    def __enter__(self) -> BufferedAuditLedger:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: list[AuditRecord] = []
+            shutdown = item is _SHUTDOWN
+            if not shutdown:
+                batch.append(item)
+            deadline = time.monotonic() + self.flush_interval
+            while not shutdown and len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _SHUTDOWN:
+                    shutdown = True
+                else:
+                    batch.append(item)
+            if shutdown:
+                # Drain whatever was enqueued before close()
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            for start in range(0, len(batch), self.max_batch):
+                self._write(batch[start : start + self.max_batch])
+            for _ in range(len(batch) + shutdown):
+                self._queue.task_done()
+            if shutdown:
+                return
+
+    def _write(self, batch: list[AuditRecord]) -> None:
+        try:
+            self.sink.write_batch(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logging.error(f"Failed to persist {len(batch)} audit records: {e!r}")
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+
+def projected_drifts(
+    weights: np.ndarray, squared_weights: np.ndarray, state: np.ndarray
+) -> np.ndarray:
+    """Return the Lyapunov drift of projecting ``state`` through each weight row.
+
+    Each row projects the state by elementwise multiplication; the drift is one
+    minus the cosine similarity between the current and projected states, or
+    1.0 when either is zero-length. With projected = weights * state, both the
+    dot product and the squared norm of the projection are matrix-vector
+    products with state**2.
+    """
+    squared_state = state * state
+    norm_start = float(np.sqrt(squared_state.sum()))
+    dots = weights @ squared_state
+    norms_end = np.sqrt(squared_weights @ squared_state)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drifts = 1.0 - dots / (norm_start * norms_end)
+    drifts[(norms_end == 0.0) | (norm_start == 0.0)] = 1.0
+    return drifts
+
+
+class IVFExpertIndex:
+    """Inverted-file index over expert weight profiles.
+
+    Drift does not change when a weight profile is scaled, so profiles are
+    clustered by direction with spherical k-means. A query estimates the
+    expected drift of each cluster from the mean of its unit profiles and the
+    mean of their squares, then shortlists the members of the lowest-drift
+    clusters for exact scoring. Using the mean of the squares rather than the
+    square of the mean keeps the spread of a cluster from being averaged away.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        *,
+        n_lists: int | None = None,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> None:
+        n_experts = len(weights)
+        n_lists = min(n_experts, n_lists or max(1, round(4 * np.sqrt(n_experts))))
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        units = np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+
+        rng = np.random.default_rng(seed)
+        centroids = units[rng.choice(n_experts, size=n_lists, replace=False)].copy()
+        assignments = np.zeros(n_experts, dtype=np.int64)
+        for _ in range(iterations):
+            assignments = np.argmax(units @ centroids.T, axis=1)
+            for list_id in range(n_lists):
+                members = units[assignments == list_id]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[list_id] = centroid / norm if norm else centroid
+
+        self.centroids = centroids
+        self._mean_units = np.zeros_like(centroids)
+        self._mean_squared_units = np.zeros_like(centroids)
+        for list_id in range(n_lists):
+            members = units[assignments == list_id]
+            if len(members):
+                self._mean_units[list_id] = members.mean(axis=0)
+                self._mean_squared_units[list_id] = (members * members).mean(axis=0)
+        self._order = np.argsort(assignments, kind="stable")
+        self._offsets = np.searchsorted(
+            assignments[self._order], np.arange(n_lists + 1)
+        )
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def shortlist(self, state: np.ndarray, k: int) -> np.ndarray:
+        """Return the rows of at least ``k`` experts from the lowest-drift clusters.
+
+        Rows are returned in ascending order, so ties still resolve to the
+        earliest registered expert.
+        """
+        centroid_drifts = projected_drifts(
+            self._mean_units, self._mean_squared_units, state
+        )
+        rows = []
+        count = 0
+        for list_id in np.argsort(centroid_drifts, kind="stable"):
+            members = self._order[self._offsets[list_id] : self._offsets[list_id + 1]]
+            rows.append(members)
+            count += len(members)
+            if count >= k:
+                break
+        return np.sort(np.concatenate(rows))
+
+
+def _clustered_profiles(
+    n_experts: int, dimension: int, n_families: int, rng: np.random.Generator
+) -> np.ndarray:
+    # Experts come in families that share a specialization around a base profile
+    families = rng.normal(1.0, 0.5, size=(n_families, dimension))
+    members = families[rng.integers(0, n_families, size=n_experts)]
+    return members + rng.normal(0.0, 0.1, size=(n_experts, dimension))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Routing latency vs. recall of the IVF expert pre-filter"
+    )
+    parser.add_argument("--experts", type=int, default=5000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--families", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--candidates", type=int, nargs="+", default=[32, 64, 128, 256, 512]
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    weights = _clustered_profiles(args.experts, args.dimension, args.families, rng)
+    squared_weights = weights * weights
+    states = rng.random((args.queries, args.dimension))
+
+    started = time.perf_counter()
+    index = IVFExpertIndex(weights)
+    print(
+        f"{args.experts} experts x {args.dimension} dims, {index.n_lists} lists, "
+        f"built in {time.perf_counter() - started:.2f}s"
+    )
+
+    started = time.perf_counter()
+    exact = [
+        int(np.argmin(projected_drifts(weights, squared_weights, state)))
+        for state in states
+    ]
+    exhaustive_ms = (time.perf_counter() - started) / args.queries * 1000
+    print(f"exhaustive: {exhaustive_ms:.3f} ms/query")
+
+    for k in args.candidates:
+        hits = 0
+        started = time.perf_counter()
+        for state, expected in zip(states, exact, strict=True):
+            rows = index.shortlist(state, k)
+            drifts = projected_drifts(weights[rows], squared_weights[rows], state)
+            hits += int(rows[np.argmin(drifts)]) == expected
+        ann_ms = (time.perf_counter() - started) / args.queries * 1000
+        print(
+            f"ivf k={k:<5} {ann_ms:.3f} ms/query  recall@1={hits / args.queries:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Callable, Iterable, Mapping, Sequence
+from typing import Awaitable, Callable, Iterable, Mapping, NoReturn, Sequence
+
+import numpy as np
+
+from agent_starter_pack.runtime.expert_index import IVFExpertIndex, projected_drifts
 
 
 @dataclass(frozen=True)
@@ -17,63 +26,281 @@ class KineticResolver:
         vector_store: "VectorStore",
         audit_ledger: "AuditLedger",
         experts: Mapping[str, "ExpertFn"] | None = None,
+        *,
+        ann_min_experts: int | None = None,
+        ann_candidates: int = 128,
+        ann_audit_interval: int = 50,
+        ann_audit_window: int = 20,
+        ann_min_recall: float = 0.95,
     ) -> None:
+        """Create a resolver.
+
+        With ``ann_min_experts`` set, pools of at least that many experts are
+        routed through an IVF pre-filter that shortlists about
+        ``ann_candidates`` experts for exact scoring. Every
+        ``ann_audit_interval``-th routed task is also scored exhaustively; if
+        the pre-filter picked the exhaustive winner in fewer than
+        ``ann_min_recall`` of the last ``ann_audit_window`` audits, it is turned
+        off until the next expert is registered.
+        """
         self.memory = vector_store
         self.ledger = audit_ledger
+        self._ledger_takes_expert_id = _accepts_expert_id(audit_ledger)
         self.experts: dict[str, ExpertFn] = dict(experts or {})
+        self.ann_min_experts = ann_min_experts
+        self.ann_candidates = ann_candidates
+        self.ann_audit_interval = ann_audit_interval
+        self.ann_min_recall = ann_min_recall
+        # (state dimension, expert ids, weight matrix, squared weight matrix)
+        self._expert_matrix_cache: (
+            tuple[int, list[str], np.ndarray, np.ndarray] | None
+        ) = None
+        self._expert_index: IVFExpertIndex | None = None
+        self._ann_audits: deque[bool] = deque(maxlen=ann_audit_window)
+        self._ann_routed = 0
+        self._ann_disabled = False
 
     def register_expert(self, expert_id: str, execute_fn: "ExpertFn") -> None:
         self.experts[expert_id] = execute_fn
+        self._expert_matrix_cache = None
+        self._expert_index = None
+        self._ann_audits.clear()
+        self._ann_routed = 0
+        self._ann_disabled = False
 
     def resolve_and_execute(
         self,
         task: TaskOntology,
         current_state: Sequence[float],
     ) -> dict:
-        decision = "HALT"
-        selected_expert: ExpertFn | None = None
-        selected_energy_cost: float | None = None
-
-        for expert_id, execute_fn in self.experts.items():
-            projected_state = self._simulate_outcome(expert_id, current_state)
-            energy_cost = self._calculate_lyapunov_drift(current_state, projected_state)
-
-            if energy_cost <= task.energy_budget and (
-                selected_energy_cost is None or energy_cost < selected_energy_cost
-            ):
-                decision = "EXECUTE"
-                selected_expert = execute_fn
-                selected_energy_cost = energy_cost
-
-        if decision == "EXECUTE" and selected_expert:
-            result = selected_expert(task)
-            self.ledger.record(task, "SUCCESS", selected_energy_cost)
-            return result
-
-        self.ledger.record(task, "BLOCKED", selected_energy_cost)
+        state = np.asarray(current_state, dtype=np.float64)
+        ranked = self._rank_candidates(state, task.energy_budget, limit=1)
+        if not ranked:
+            self._block(task)
+
+        selected_id, selected_energy_cost = ranked[0]
+        result = self.experts[selected_id](task)
+        self._record(task, "SUCCESS", selected_energy_cost, selected_id)
+        return result
+
+    async def aresolve_and_execute(
+        self,
+        task: TaskOntology,
+        current_state: Sequence[float],
+        *,
+        candidates: int = 1,
+        timeout: float | None = None,
+    ) -> dict:
+        """Race the ``candidates`` lowest-drift in-budget experts concurrently.
+
+        Async experts are awaited directly; synchronous ones run in a worker
+        thread and cannot be interrupted once started. The first expert to
+        return within ``timeout`` seconds wins and the others are cancelled,
+        so latency is bounded by the fastest healthy candidate. Every candidate
+        is recorded in the ledger:
+        the winner as SUCCESS, the rest as FAILED, CANCELLED or TIMEOUT.
+        Raises TimeoutError when no expert succeeds before the deadline and
+        RuntimeError when every candidate fails.
+        """
+        state = np.asarray(current_state, dtype=np.float64)
+        ranked = self._rank_candidates(state, task.energy_budget, limit=candidates)
+        if not ranked:
+            self._block(task)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        running = {
+            asyncio.ensure_future(self._run_expert(expert_id, task)): (expert_id, cost)
+            for expert_id, cost in ranked
+        }
+        ranking = list(running)
+        pending = set(running)
+        winner: asyncio.Future | None = None
+        timed_out = False
+        errors: list[BaseException] = []
+        try:
+            while pending and winner is None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    timed_out = True
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Settle in ranking order so simultaneous finishers prefer lower drift
+                for future in sorted(done, key=ranking.index):
+                    expert_id, cost = running[future]
+                    if future.exception() is not None:
+                        errors.append(future.exception())
+                        verdict = "FAILED"
+                    elif winner is None:
+                        winner = future
+                        verdict = "SUCCESS"
+                    else:
+                        verdict = "CANCELLED"
+                    self._record(task, verdict, cost, expert_id)
+        finally:
+            for future in pending:
+                future.cancel()
+            for future in ranking:
+                if future in pending:
+                    expert_id, cost = running[future]
+                    verdict = "TIMEOUT" if timed_out else "CANCELLED"
+                    self._record(task, verdict, cost, expert_id)
+
+        if winner is not None:
+            return winner.result()
+        if timed_out:
+            raise TimeoutError(
+                f"No expert for {task.intent!r} succeeded within {timeout}s"
+            )
+        raise RuntimeError(
+            f"All {len(running)} candidate experts for {task.intent!r} failed"
+        ) from errors[-1]
+
+    def score_experts(self, current_state: Sequence[float]) -> tuple[list[str], np.ndarray]:
+        """Return the Lyapunov drift of every registered expert in one vectorized pass.
+
+        Each expert projects the state by elementwise multiplication with its
+        weight profile; the drift is one minus the cosine similarity between the
+        current and projected states, or 1.0 when either is zero-length.
+        """
+        state = np.asarray(current_state, dtype=np.float64)
+        expert_ids, weights, squared_weights = self._expert_matrix(state.shape[0])
+        return expert_ids, projected_drifts(weights, squared_weights, state)
+
+    async def _run_expert(self, expert_id: str, task: TaskOntology) -> dict:
+        execute_fn = self.experts[expert_id]
+        if inspect.iscoroutinefunction(execute_fn):
+            return await execute_fn(task)
+        return await asyncio.to_thread(execute_fn, task)
+
+    def _record(
+        self,
+        task: TaskOntology,
+        verdict: str,
+        energy_cost: float | None,
+        expert_id: str,
+    ) -> None:
+        if self._ledger_takes_expert_id:
+            self.ledger.record(task, verdict, energy_cost, expert_id=expert_id)
+        else:
+            self.ledger.record(task, verdict, energy_cost)
+
+    def _block(self, task: TaskOntology) -> NoReturn:
+        self.ledger.record(task, "BLOCKED", None)
         raise RuntimeError(
             "Invariant violation: no expert met energy budget "
             f"{task.energy_budget}"
         )
 
-    def _simulate_outcome(self, expert_id: str, current_state: Sequence[float]) -> list[float]:
-        expert_profile = self.memory.get_expert_profile(expert_id)
-        weights = expert_profile.weights
-        if len(weights) != len(current_state):
-            return list(current_state)
-        return [value * weight for value, weight in zip(current_state, weights)]
-
-    @staticmethod
-    def _calculate_lyapunov_drift(start: Sequence[float], end: Sequence[float]) -> float:
-        if len(start) != len(end) or not start:
-            return 1.0
-        dot = sum(a * b for a, b in zip(start, end))
-        norm_start = sum(a * a for a in start) ** 0.5
-        norm_end = sum(b * b for b in end) ** 0.5
-        if norm_start == 0.0 or norm_end == 0.0:
-            return 1.0
-        cosine_similarity = dot / (norm_start * norm_end)
-        return 1.0 - cosine_similarity
+    def _rank_candidates(
+        self, state: np.ndarray, energy_budget: float, limit: int
+    ) -> list[tuple[str, float]]:
+        """Return up to ``limit`` in-budget experts and drifts, lowest drift first."""
+        ranked: list[tuple[str, float]] = []
+        if self._ann_enabled():
+            ranked = self._rank_shortlisted(state, energy_budget, limit)
+        if not ranked:
+            expert_ids, drifts = self.score_experts(state)
+            ranked = _rank_within_budget(
+                expert_ids, drifts, np.arange(len(expert_ids)), energy_budget, limit
+            )
+        return ranked
+
+    def _ann_enabled(self) -> bool:
+        return (
+            self.ann_min_experts is not None
+            and len(self.experts) >= self.ann_min_experts
+            and not self._ann_disabled
+        )
+
+    def _rank_shortlisted(
+        self, state: np.ndarray, energy_budget: float, limit: int
+    ) -> list[tuple[str, float]]:
+        """Rank the in-budget experts among the IVF shortlist.
+
+        Returns an empty list when no shortlisted expert is within budget, so
+        the caller falls back to the exhaustive scan.
+        """
+        expert_ids, weights, squared_weights = self._expert_matrix(state.shape[0])
+        if self._expert_index is None:
+            self._expert_index = IVFExpertIndex(weights)
+        rows = self._expert_index.shortlist(state, self.ann_candidates)
+        drifts = projected_drifts(weights[rows], squared_weights[rows], state)
+        ranked = _rank_within_budget(expert_ids, drifts, rows, energy_budget, limit)
+
+        self._ann_routed += 1
+        if self._ann_routed % self.ann_audit_interval == 0:
+            exact = _rank_within_budget(
+                expert_ids,
+                projected_drifts(weights, squared_weights, state),
+                np.arange(len(expert_ids)),
+                energy_budget,
+                limit,
+            )
+            selected_id = ranked[0][0] if ranked else None
+            self._record_ann_audit(selected_id == (exact[0][0] if exact else None))
+            return exact
+        return ranked
+
+    def _record_ann_audit(self, hit: bool) -> None:
+        self._ann_audits.append(hit)
+        if len(self._ann_audits) < (self._ann_audits.maxlen or 0):
+            return
+        recall = sum(self._ann_audits) / len(self._ann_audits)
+        if recall < self.ann_min_recall:
+            logging.warning(
+                f"Expert pre-filter recall {recall:.2f} fell below "
+                f"{self.ann_min_recall:.2f}; falling back to exhaustive scoring"
+            )
+            self._ann_disabled = True
+
+    def _expert_matrix(self, dimension: int) -> tuple[list[str], np.ndarray, np.ndarray]:
+        cached = self._expert_matrix_cache
+        if cached is None or cached[0] != dimension:
+            expert_ids = list(self.experts)
+            # Profiles that do not match the state dimension leave it unchanged
+            weights = np.ones((len(expert_ids), dimension))
+            for row, expert_id in enumerate(expert_ids):
+                profile_weights = self.memory.get_expert_profile(expert_id).weights
+                if len(profile_weights) == dimension:
+                    weights[row] = profile_weights
+            cached = (dimension, expert_ids, weights, weights * weights)
+            self._expert_matrix_cache = cached
+            # The IVF index is built over the rows of this matrix
+            self._expert_index = None
+        return cached[1], cached[2], cached[3]
+
+
+def _accepts_expert_id(ledger: AuditLedger) -> bool:
+    """Whether ``ledger.record`` takes ``expert_id``; older ledgers only take three."""
+    try:
+        parameters = inspect.signature(ledger.record).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(
+        parameter.name == "expert_id" or parameter.kind is parameter.VAR_KEYWORD
+        for parameter in parameters
+    )
+
+
+def _rank_within_budget(
+    expert_ids: list[str],
+    drifts: np.ndarray,
+    rows: np.ndarray,
+    energy_budget: float,
+    limit: int,
+) -> list[tuple[str, float]]:
+    """Return ids and drifts of the ``limit`` lowest-drift in-budget experts in ``rows``."""
+    within_budget = np.flatnonzero(drifts <= energy_budget)
+    if limit == 1 and within_budget.size:
+        # rows are ascending, so argmin keeps the earliest registered expert on ties
+        selected = within_budget[[np.argmin(drifts[within_budget])]]
+    else:
+        selected = within_budget[
+            np.argsort(drifts[within_budget], kind="stable")[:limit]
+        ]
+    return [(expert_ids[rows[i]], float(drifts[i])) for i in selected]
 
 
 @dataclass(frozen=True)
@@ -94,8 +321,14 @@ class VectorStore:
 
 
 class AuditLedger:
-    def record(self, task: TaskOntology, verdict: str, energy_cost: float | None) -> None:
+    def record(
+        self,
+        task: TaskOntology,
+        verdict: str,
+        energy_cost: float | None,
+        expert_id: str | None = None,
+    ) -> None:
         raise NotImplementedError
 
 
-ExpertFn = Callable[[TaskOntology], dict]
+ExpertFn = Callable[[TaskOntology], dict] | Callable[[TaskOntology], Awaitable[dict]]
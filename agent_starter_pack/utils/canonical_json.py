@@ -0,0 +1,354 @@
+"""JSON Canonicalization Scheme (RFC 8785) encoder.
+
+Objects are serialized with members sorted by the UTF-16 code units of their
+names, strings are escaped as by ECMAScript ``JSON.stringify``, and numbers
+use the ECMAScript ``Number.prototype.toString`` format (``1e+21``, ``1e-7``,
+``2`` for ``2.0``). ``canonicalize`` returns the canonical text in one piece;
+``iter_canonical`` yields it in chunks for streaming into a hash.
+
+Most payloads contain only string member names, safe integers and floats that
+Python and ECMAScript format identically, so they are encoded by the C JSON
+encoder first and the text is screened once: characters from U+E000 up (where
+code point and UTF-16 order may differ), member names that look like numbers
+(which may come from non-string keys) and number tokens that need reformatting.
+Payloads the C encoder rejects or the screen cannot vouch for go through the
+pure-Python encoder, which caches the member order per object shape.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+import json
+from json.encoder import encode_basestring
+import math
+import re
+from typing import Any, Iterator
+
+# Integers beyond +/-2**53 are not exactly representable as IEEE doubles
+_MAX_SAFE_INTEGER = 2**53
+# Containers with more entries than this are streamed entry by entry
+_INLINE_ITEMS = 64
+# Maximum list entries encoded together in one streamed piece
+_RUN_ITEMS = 256
+
+# Number tokens whose Python repr differs from ECMAScript, or may: exponents,
+# integral floats and integers that may exceed 2**53
+_BAD_NUMBER_TOKEN = r"-?(?:\d+(?:\.\d+)?e[+-]\d+|\d+\.0|\d{16,})(?=[,\]}])"
+_BAD_NUMBER = re.compile(_BAD_NUMBER_TOKEN)
+# Where integral floats end and exponents start; matches inside strings are
+# harmless false positives. Unlike a search for whole tokens (or one pattern
+# for both), each starts with a literal the regex engine can skip to quickly
+_BAD_NUMBER_MARKS = (re.compile(r"\.0(?=[,\]}])"), re.compile(r"e[+-]\d"))
+# Longest text from a token's delimiter to its mark
+_MARK_REACH = 32
+# Integers that may exceed 2**53, searched for only when _LONG_RUNS are found
+_LONG_INTEGER = re.compile(r"[\[:,](-?\d{16,})(?=[,\]}])")
+# Consumes strings and everything else up to the next real candidate, so the
+# replacement callback only runs once per number that needs reformatting
+_NEXT_BAD_NUMBER = re.compile(
+    r'((?:"[^"\\]*(?:\\.[^"\\]*)*"|[^"\[:,]+|[\[:,](?!'
+    + _BAD_NUMBER_TOKEN
+    + r"))*)(?:([\[:,])("
+    + _BAD_NUMBER_TOKEN
+    + r")|\Z)"
+)
+
+# Member names the C encoder may have made from int or float keys, which it
+# sorts numerically; string keys that look like numbers are false positives
+_NUMBER_KEY = re.compile(r'"-?\d[\d.e+-]*":')
+
+# bytes.translate turns digits into "0" and commas and minus signs into "[", so
+# bytes.find can screen the encoded text for number-like member names and long
+# integers much faster than a regex search
+_SHAPES = bytes.maketrans(b"123456789,-", b"000000000[[")
+_NUMBER_KEY_END = b'0":'
+_LONG_RUNS = (b"[" + b"0" * 16, b":" + b"0" * 16)
+
+# Code point and UTF-16 order only differ between U+E000..U+FFFF and the
+# supplementary planes, so member names without these sort the same either way
+_UTF16_ORDER_RISK = re.compile("[\ue000-\U0010ffff]")
+
+_c_dumps = json.JSONEncoder(
+    ensure_ascii=False, sort_keys=True, separators=(",", ":"), allow_nan=False
+).encode
+
+
+def canonicalize(value: Any) -> str:
+    """Return the RFC 8785 canonical JSON text of ``value``.
+
+    Raises:
+        TypeError: If ``value`` contains a type JSON cannot represent.
+        ValueError: If it contains NaN, an infinity, an integer too large
+            for a double, or a circular reference.
+    """
+    if isinstance(value, (dict, list, tuple)):
+        text = _fast_dumps(value)
+        if text is not None:
+            return text
+    return "".join(_iter_jcs(value, set()))
+
+
+def iter_canonical(value: Any) -> Iterator[str]:
+    """Yield the canonical JSON text of ``value`` in pieces.
+
+    Large containers are walked entry by entry, so the whole text is never
+    held in memory; the concatenated pieces equal ``canonicalize(value)``.
+    """
+    return _iter_jcs(value, set())
+
+
+def format_number(value: int | float) -> str:
+    """Format a number as ECMAScript ``Number.prototype.toString`` does."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        if -_MAX_SAFE_INTEGER < value < _MAX_SAFE_INTEGER:
+            return int.__repr__(value)
+        try:
+            value = float(value)
+        except OverflowError as exc:
+            msg = f"integer {value} is too large for a JSON number"
+            raise ValueError(msg) from exc
+    if not math.isfinite(value):
+        msg = f"{value!r} is not a valid JSON number"
+        raise ValueError(msg)
+    if value == 0:
+        return "0"
+    sign = "-" if value < 0 else ""
+    # repr gives the shortest digits that round-trip, which ECMAScript requires
+    mantissa, _, exponent = float.__repr__(abs(value)).partition("e")
+    integral, _, fraction = mantissa.partition(".")
+    if integral == "0":
+        digits = fraction.lstrip("0")
+        point = len(digits) - len(fraction)
+    else:
+        digits = integral + fraction
+        point = len(integral)
+    point += int(exponent or 0)
+    digits = digits.rstrip("0")
+    count = len(digits)
+    if count <= point <= 21:
+        return sign + digits + "0" * (point - count)
+    if 0 < point <= 21:
+        return sign + digits[:point] + "." + digits[point:]
+    if -6 < point <= 0:
+        return sign + "0." + "0" * -point + digits
+    power = point - 1
+    return (
+        sign
+        + digits[0]
+        + ("." + digits[1:] if count > 1 else "")
+        + ("e+" if power >= 0 else "e-")
+        + str(abs(power))
+    )
+
+
+def _is_small(value: Any, depth: int = 2) -> bool:
+    """Whether ``value`` is small enough to be encoded as one streamed piece.
+
+    Containers nested deeper than ``depth`` or with more than
+    ``_INLINE_ITEMS`` entries are not.
+    """
+    if isinstance(value, dict):
+        items = value.values()
+    elif isinstance(value, (list, tuple)):
+        items = value
+    else:
+        return True
+    if depth == 0 or len(items) > _INLINE_ITEMS:
+        return False
+    return all(
+        _is_small(item, depth - 1)
+        for item in items
+        if isinstance(item, (dict, list, tuple))
+    )
+
+
+def _format_token(token: str) -> str:
+    return format_number(float(token) if "." in token or "e" in token else int(token))
+
+
+def _fix_number(match: re.Match[str]) -> str:
+    skipped, delimiter, token = match.groups()
+    if token is None:
+        return skipped
+    return skipped + delimiter + _format_token(token)
+
+
+def _fix_numbers(text: str, long_integers: bool) -> str:
+    """Reformat the number tokens of ``text`` that ``_BAD_NUMBER`` matches."""
+    if "\\" in text:
+        # Escaped quotes would throw off the quote counting below
+        return _NEXT_BAD_NUMBER.sub(_fix_number, text)
+    tokens: dict[int, int] = {}
+    marks = (mark for pattern in _BAD_NUMBER_MARKS for mark in pattern.finditer(text))
+    for mark in marks:
+        reach = max(0, mark.start() - _MARK_REACH)
+        start = max(text.rfind(delimiter, reach, mark.start()) for delimiter in "[:,")
+        match = _BAD_NUMBER.match(text, start + 1) if start >= 0 else None
+        if match:
+            tokens[match.start()] = match.end()
+    if long_integers:
+        for match in _LONG_INTEGER.finditer(text):
+            tokens[match.start(1)] = match.end(1)
+    pieces = []
+    copied = counted = quotes = 0
+    for start in sorted(tokens):
+        quotes += text.count('"', counted, start)
+        counted = start
+        # An odd number of quotes before the token means it is inside a string
+        if not quotes % 2:
+            pieces += (text[copied:start], _format_token(text[start : tokens[start]]))
+            copied = tokens[start]
+    pieces.append(text[copied:])
+    return "".join(pieces)
+
+
+def _fast_dumps(value: Any) -> str | None:
+    """Encode ``value`` with the C encoder and fix up its numbers.
+
+    Returns None when the C encoder rejects ``value`` or its text may not be
+    canonical; the Python encoder then handles it and reports any error.
+    """
+    try:
+        text = _c_dumps(value)
+    except (TypeError, ValueError, RecursionError):
+        return None
+    if not text.isascii() and _UTF16_ORDER_RISK.search(text):
+        return None
+    shapes = text.encode().translate(_SHAPES)
+    if _NUMBER_KEY_END in shapes and _NUMBER_KEY.search(text):
+        return None
+    long_integers = any(run in shapes for run in _LONG_RUNS)
+    if long_integers or any(mark.search(text) for mark in _BAD_NUMBER_MARKS):
+        text = _fix_numbers(text, long_integers)
+    return text
+
+
+def _key_to_str(key: Any) -> str:
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, (int, float)):
+        return format_number(key)
+    msg = f"keys must be str, int, float, bool or None, not {type(key).__name__}"
+    raise TypeError(msg)
+
+
+def _utf16_order(key: str) -> bytes:
+    return key.encode("utf-16-be", "surrogatepass")
+
+
+@lru_cache(maxsize=1024)
+def _member_prefixes(keys: tuple[str, ...]) -> tuple[tuple[int, str], ...]:
+    """Return (position, '"name":' prefix) pairs in canonical member order."""
+    order = sorted(range(len(keys)), key=lambda i: _utf16_order(keys[i]))
+    return tuple(
+        (position, ("," if index else "") + encode_basestring(keys[position]) + ":")
+        for index, position in enumerate(order)
+    )
+
+
+def _iter_jcs(value: Any, active: set[int]) -> Iterator[str]:
+    if value is None or value is True or value is False:
+        yield _c_dumps(value)
+        return
+    if isinstance(value, str):
+        yield encode_basestring(value)
+        return
+    if isinstance(value, (int, float)):
+        yield format_number(value)
+        return
+    if not isinstance(value, (dict, list, tuple)):
+        msg = f"Object of type {type(value).__name__} is not JSON serializable"
+        raise TypeError(msg)
+    if _is_small(value):
+        text = _fast_dumps(value)
+        if text is not None:
+            yield text
+            return
+
+    if id(value) in active:
+        msg = "Circular reference detected"
+        raise ValueError(msg)
+    active.add(id(value))
+    if isinstance(value, dict):
+        keys = tuple(_key_to_str(key) for key in value)
+        items = list(value.values())
+        yield "{"
+        for position, prefix in _member_prefixes(keys):
+            yield prefix
+            yield from _iter_jcs(items[position], active)
+        yield "}"
+    else:
+        yield "["
+        start = 0
+        while start < len(value):
+            if start:
+                yield ","
+            end = start
+            while (
+                end < len(value) and end - start < _RUN_ITEMS and _is_small(value[end])
+            ):
+                end += 1
+            text = _fast_dumps(list(value[start:end])) if end > start else None
+            if text is not None:
+                yield text[1:-1]
+                start = end
+            else:
+                yield from _iter_jcs(value[start], active)
+                start += 1
+        yield "]"
+    active.discard(id(value))
+
+
+def _benchmark() -> None:
+    import random
+    import time
+
+    rng = random.Random(0)
+    shapes = {
+        "records (C fast path)": [
+            {"id": i, "name": f"record-{i}", "tags": ["a", "b"], "score": i / 7}
+            for i in range(20_000)
+        ],
+        "integral floats": [
+            {"id": i, "price": float(rng.randrange(1000)), "qty": 1e21 * i}
+            for i in range(20_000)
+        ],
+        "non-ASCII keys": [
+            {"clé": i, "名前": f"record-{i}", "€": [1, 2, 3]} for i in range(20_000)
+        ],
+        "deep small objects": {
+            "events": [
+                {"header": {"id": i, "ts": 1.5e9 + i}, "body": {"text": "x" * 40}}
+                for i in range(20_000)
+            ]
+        },
+    }
+
+    def timed(fn: Any, repeat: int = 3) -> float:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - started) / repeat * 1000
+
+    print(f"{'shape':<24} {'json.dumps':>11} {'canonicalize':>13} {'streamed':>9}")
+    for name, payload in shapes.items():
+        baseline = timed(
+            lambda payload=payload: json.dumps(
+                payload, sort_keys=True, separators=(",", ":")
+            )
+        )
+        canonical = timed(lambda payload=payload: canonicalize(payload))
+        streamed = timed(lambda payload=payload: "".join(iter_canonical(payload)))
+        print(
+            f"{name:<24} {baseline:9.1f}ms {canonical:11.1f}ms {streamed:7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    _benchmark()
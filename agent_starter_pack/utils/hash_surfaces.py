@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import codecs
 import hashlib
-import json
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
+
+from agent_starter_pack.utils.canonical_json import canonicalize, iter_canonical
+
+# Size of the chunks fed to the hash
+_CHUNK_CHARS = 1 << 16
 
 
 def _normalize_preimage(preimage: Any) -> str:
@@ -17,26 +23,157 @@ def _normalize_preimage(preimage: Any) -> str:
     if isinstance(preimage, str):
         return preimage
     try:
-        return json.dumps(preimage, sort_keys=True, separators=(",", ":"))
+        return canonicalize(preimage)
+    except (TypeError, ValueError) as exc:
+        msg = "preimage must be JSON-serializable, bytes, or str"
+        raise ValueError(msg) from exc
+
+
+def _iter_preimage(preimage: Any) -> Iterator[str]:
+    if isinstance(preimage, (bytes, bytearray, memoryview)):
+        data = memoryview(preimage).cast("B")
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            for start in range(0, len(data), _CHUNK_CHARS):
+                yield decoder.decode(data[start : start + _CHUNK_CHARS])
+            yield decoder.decode(b"", final=True)
+        except UnicodeDecodeError as exc:
+            msg = "preimage bytes must be valid UTF-8"
+            raise ValueError(msg) from exc
+        return
+    if isinstance(preimage, str):
+        for start in range(0, len(preimage), _CHUNK_CHARS):
+            yield preimage[start : start + _CHUNK_CHARS]
+        return
+    try:
+        yield from iter_canonical(preimage)
     except (TypeError, ValueError) as exc:
         msg = "preimage must be JSON-serializable, bytes, or str"
         raise ValueError(msg) from exc
 
 
+def _sha256(pieces: Iterable[str]) -> str:
+    """Hash string pieces as UTF-8, encoding them in chunks of about _CHUNK_CHARS."""
+    digest = hashlib.sha256()
+    pending: list[str] = []
+    pending_chars = 0
+    for piece in pieces:
+        pending.append(piece)
+        pending_chars += len(piece)
+        if pending_chars >= _CHUNK_CHARS:
+            digest.update("".join(pending).encode("utf-8"))
+            pending, pending_chars = [], 0
+    digest.update("".join(pending).encode("utf-8"))
+    return digest.hexdigest()
+
+
 @dataclass(frozen=True)
 class HashSurfaces:
     """Deterministic payload preimage surfaces for hashing."""
 
-    preimage: str
+    preimage: str | None
     sha256: str
 
     @classmethod
-    def from_payload(cls, preimage: Any) -> "HashSurfaces":
-        """Create a HashSurfaces instance from a payload preimage."""
-        canonical = _normalize_preimage(preimage)
-        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
-        return cls(preimage=canonical, sha256=digest)
+    def from_payload(
+        cls, preimage: Any, *, retain_preimage: bool = True
+    ) -> "HashSurfaces":
+        """Create a HashSurfaces instance from a payload preimage.
+
+        The canonical preimage is encoded and fed to the hash in chunks, so
+        no full-size byte copy is made. With ``retain_preimage=False`` the
+        payload is also serialized incrementally, the canonical string is never
+        held in memory as a whole, and ``preimage`` is None.
+        """
+        if retain_preimage:
+            canonical = _normalize_preimage(preimage)
+            return cls(preimage=canonical, sha256=_sha256(_iter_preimage(canonical)))
+        return cls(preimage=None, sha256=_sha256(_iter_preimage(preimage)))
+
+    @classmethod
+    def from_payloads(
+        cls,
+        preimages: Iterable[Any],
+        *,
+        retain_preimage: bool = False,
+        max_workers: int | None = None,
+        group_size: int = 64,
+    ) -> list["HashSurfaces"]:
+        """Hash many payloads in a thread pool, preserving input order.
+
+        Payloads are handed to the workers in groups of ``group_size`` to keep
+        scheduling overhead low for small payloads. Serialization holds the
+        GIL, so the pool pays off mainly for large payloads, whose hashing
+        runs outside it.
+        """
+        preimages = list(preimages)
+        groups = [
+            preimages[start : start + group_size]
+            for start in range(0, len(preimages), group_size)
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda group: [
+                    cls.from_payload(preimage, retain_preimage=retain_preimage)
+                    for preimage in group
+                ],
+                groups,
+            )
+            return [surfaces for group in results for surfaces in group]
 
     def as_dict(self) -> dict[str, str]:
         """Serialize the hash surfaces to a plain dictionary."""
+        if self.preimage is None:
+            return {"sha256": self.sha256}
         return {"preimage": self.preimage, "sha256": self.sha256}
+
+
+def _benchmark() -> None:
+    import time
+    import tracemalloc
+
+    payload = {
+        "records": [
+            {"id": i, "name": f"record-{i}", "tags": ["a", "b"], "score": i / 7}
+            for i in range(50_000)
+        ],
+        "meta": {"source": "benchmark", "version": 1},
+    }
+
+    def measure(label: str, fn: Callable[[], Any], repeat: int = 5) -> None:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed = (time.perf_counter() - started) / repeat
+        # Memory is traced in a separate run, as tracing slows everything down
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:<36} {elapsed * 1000:8.1f} ms  peak {peak / 2**20:6.1f} MiB")
+
+    size = len(canonicalize(payload))
+    print(f"payload: {size / 2**20:.1f} MiB canonical JSON")
+    measure(
+        "materialized canonicalize + sha256",
+        lambda: hashlib.sha256(canonicalize(payload).encode("utf-8")).hexdigest(),
+    )
+    measure("from_payload (retained)", lambda: HashSurfaces.from_payload(payload))
+    measure(
+        "from_payload (streamed)",
+        lambda: HashSurfaces.from_payload(payload, retain_preimage=False),
+    )
+
+    small = [{"id": i, "values": list(range(20))} for i in range(20_000)]
+    measure(
+        "sequential from_payload x20000",
+        lambda: [HashSurfaces.from_payload(p, retain_preimage=False) for p in small],
+        repeat=1,
+    )
+    measure(
+        "from_payloads x20000", lambda: HashSurfaces.from_payloads(small), repeat=1
+    )
+
+
+if __name__ == "__main__":
+    _benchmark()
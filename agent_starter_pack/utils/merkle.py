@@ -0,0 +1,278 @@
+"""Append-only Merkle accumulator with inclusion proofs.
+
+Trees have the shape of RFC 9162 (Certificate Transparency v2): a tree of
+``n`` leaves is split into a complete left subtree of the largest power of
+two below ``n`` and the remaining right subtree. Leaves are SHA-256 hex
+digests used as they are, and interior nodes are
+``sha256(0x01 || left || right)``. Leaf digests of canonical JSON objects
+can never collide with that interior-node encoding, and the root of a
+single-leaf tree is the leaf digest itself.
+
+``MerkleAccumulator`` only keeps the roots of the complete subtrees, one per
+set bit of the tree size, plus the leaves of the batch being ingested, so
+memory stays constant however many leaves are appended.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from typing import Any, Iterable, Sequence
+
+_NODE_PREFIX = b"\x01"
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+def _split(size: int) -> int:
+    """Largest power of two strictly below ``size`` (for ``size`` > 1)."""
+    return 1 << ((size - 1).bit_length() - 1)
+
+
+def _leaf_bytes(leaf: str) -> bytes:
+    digest = bytes.fromhex(leaf.removeprefix("sha256:"))
+    if len(digest) != 32:
+        msg = f"leaf must be a SHA-256 hex digest, got {leaf!r}"
+        raise ValueError(msg)
+    return digest
+
+
+def _tree_root(leaves: Sequence[bytes]) -> bytes:
+    if len(leaves) == 1:
+        return leaves[0]
+    k = _split(len(leaves))
+    return _node(_tree_root(leaves[:k]), _tree_root(leaves[k:]))
+
+
+def merkle_root(leaves: Sequence[str]) -> str:
+    """Return the root of the tree over ``leaves`` (hex digests)."""
+    if not leaves:
+        msg = "cannot compute the Merkle root of an empty tree"
+        raise ValueError(msg)
+    return _tree_root([_leaf_bytes(leaf) for leaf in leaves]).hex()
+
+
+def verify_inclusion(
+    leaf: str, index: int, tree_size: int, proof: Sequence[str], root: str
+) -> bool:
+    """Check an inclusion proof as described in RFC 9162, section 2.1.3.2."""
+    if not 0 <= index < tree_size:
+        return False
+    fn, sn = index, tree_size - 1
+    node = _leaf_bytes(leaf)
+    for sibling_hex in proof:
+        if sn == 0:
+            return False
+        sibling = bytes.fromhex(sibling_hex)
+        if fn & 1 or fn == sn:
+            node = _node(sibling, node)
+            while not fn & 1 and fn:
+                fn >>= 1
+                sn >>= 1
+        else:
+            node = _node(node, sibling)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and node.hex() == root
+
+
+@dataclass(frozen=True)
+class MerkleCheckpoint:
+    """Committed accumulator state: the tree size and its complete subtrees."""
+
+    tree_size: int
+    root: str | None
+    frontier: tuple[str | None, ...]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "tree_size": self.tree_size,
+            "root": self.root,
+            "frontier": list(self.frontier),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MerkleCheckpoint:
+        return cls(
+            tree_size=int(data["tree_size"]),
+            root=data["root"],
+            frontier=tuple(data["frontier"]),
+        )
+
+    def save(self, path: str) -> None:
+        """Write the checkpoint atomically, replacing any previous one."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> MerkleCheckpoint | None:
+        """Read a checkpoint written by ``save``, or None if there is none."""
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+@dataclass(frozen=True)
+class BatchCommitment:
+    """Roots emitted when a batch of leaves is committed."""
+
+    start: int
+    tree_size: int
+    batch_root: str
+    root: str
+
+
+class MerkleAccumulator:
+    """Append-only Merkle tree that keeps O(log n) state.
+
+    Leaves are ingested with ``extend`` and sealed with ``commit``, which
+    returns the root of the batch and of the whole tree. Until then,
+    ``inclusion_proof`` can prove any leaf of the pending batch against
+    ``root()``; proofs for earlier batches must be taken before they are
+    committed. ``checkpoint`` captures the committed state, which can be
+    saved and passed back to the constructor to resume after a restart.
+    """
+
+    def __init__(self, checkpoint: MerkleCheckpoint | None = None) -> None:
+        if checkpoint is None:
+            checkpoint = MerkleCheckpoint(tree_size=0, root=None, frontier=())
+        frontier = [
+            None if node is None else bytes.fromhex(node)
+            for node in checkpoint.frontier
+        ]
+        if checkpoint.tree_size >> len(frontier) or any(
+            (node is not None) != bool(checkpoint.tree_size >> level & 1)
+            for level, node in enumerate(frontier)
+        ):
+            msg = f"frontier does not match tree size {checkpoint.tree_size}"
+            raise ValueError(msg)
+        # _frontier[level] is the root of a complete subtree of 2**level leaves
+        self._frontier: list[bytes | None] = frontier
+        self._size = checkpoint.tree_size
+        self._committed = checkpoint
+        if self.root() != checkpoint.root:
+            msg = "checkpoint root does not match its frontier"
+            raise ValueError(msg)
+        self._pending: list[bytes] = []
+        self._range_roots: dict[tuple[int, int], bytes] = {}
+
+    @property
+    def size(self) -> int:
+        """Number of leaves appended, including the pending batch."""
+        return self._size
+
+    @property
+    def committed_size(self) -> int:
+        return self._committed.tree_size
+
+    def extend(self, leaves: Iterable[str]) -> int:
+        """Append leaf digests to the pending batch; return the first index."""
+        start = self._size
+        frontier = self._frontier
+        for leaf in leaves:
+            node = _leaf_bytes(leaf)
+            self._pending.append(node)
+            level = 0
+            # Adding one leaf is a binary increment: carries merge subtrees
+            while level < len(frontier) and frontier[level] is not None:
+                node = _node(frontier[level], node)
+                frontier[level] = None
+                level += 1
+            if level == len(frontier):
+                frontier.append(node)
+            else:
+                frontier[level] = node
+            self._size += 1
+        self._range_roots.clear()
+        return start
+
+    def root(self) -> str | None:
+        """Root of the tree over every appended leaf, or None if it is empty."""
+        root = None
+        # Fold the subtrees from the smallest (rightmost) to the largest
+        for node in self._frontier:
+            if node is not None:
+                root = node if root is None else _node(node, root)
+        return None if root is None else root.hex()
+
+    def inclusion_proof(self, index: int) -> list[str]:
+        """Audit path for leaf ``index`` of the pending batch against ``root()``."""
+        if not self.committed_size <= index < self._size:
+            msg = (
+                f"leaf {index} is not in the pending batch "
+                f"[{self.committed_size}, {self._size})"
+            )
+            raise IndexError(msg)
+        proof: list[str] = []
+        lo, hi = 0, self._size
+        while hi - lo > 1:
+            k = _split(hi - lo)
+            if index < lo + k:
+                proof.append(self._range_root(lo + k, hi).hex())
+                hi = lo + k
+            else:
+                proof.append(self._range_root(lo, lo + k).hex())
+                lo += k
+        proof.reverse()
+        return proof
+
+    def commit(self) -> BatchCommitment:
+        """Seal the pending batch and return its roots."""
+        start = self.committed_size
+        if self._size == start:
+            msg = "no pending leaves to commit"
+            raise ValueError(msg)
+        root = self.root()
+        commitment = BatchCommitment(
+            start=start,
+            tree_size=self._size,
+            batch_root=_tree_root(self._pending).hex(),
+            root=root,
+        )
+        self._committed = MerkleCheckpoint(
+            tree_size=self._size,
+            root=root,
+            frontier=tuple(
+                None if node is None else node.hex() for node in self._frontier
+            ),
+        )
+        self._pending = []
+        self._range_roots.clear()
+        return commitment
+
+    def checkpoint(self) -> MerkleCheckpoint:
+        """State as of the last commit; pending leaves are not included."""
+        return self._committed
+
+    def _range_root(self, lo: int, hi: int) -> bytes:
+        """Root of the subtree over leaves [lo, hi) of the current tree."""
+        cached = self._range_roots.get((lo, hi))
+        if cached is not None:
+            return cached
+        start = self.committed_size
+        if lo >= start:
+            root = _tree_root(self._pending[lo - start : hi - start])
+        elif hi <= start:
+            # Subtrees left of the pending batch that show up in audit paths
+            # are exactly the complete subtrees of the committed frontier
+            level = (hi - lo).bit_length() - 1
+            node = self._committed.frontier[level]
+            if hi - lo != 1 << level or node is None or start >> level << level != hi:
+                msg = f"leaves [{lo}, {hi}) are not available"
+                raise IndexError(msg)
+            root = bytes.fromhex(node)
+        else:
+            k = _split(hi - lo)
+            root = _node(self._range_root(lo, lo + k), self._range_root(lo + k, hi))
+        self._range_roots[(lo, hi)] = root
+        return root
@@ -1,6 +1,8 @@
+import os
 import time
+import uuid
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 import numpy as np
 from pydantic import BaseModel
@@ -26,13 +28,178 @@ class MemoryEvent:
     energy: float
 
 
+class MemoryBus:
+    """Fixed-capacity columnar ring buffer of routed tasks.
+
+    Task intents, outcome codes and energies live in preallocated arrays, so
+    memory stays flat however many tasks are routed. The buffer is split into
+    segments of ``segment_size`` events, the last one shorter when
+    ``segment_size`` does not divide ``capacity``; when the oldest segment is
+    about to be overwritten it is evicted as a whole and written to
+    ``spill_dir`` as ``.npz`` (or dropped when no spill directory is set), so
+    spilled and retained events never overlap. Spill files are named after a
+    per-instance ``run_id`` that sorts by start time, so a restarted router
+    sharing the directory appends to earlier runs instead of overwriting them.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        segment_size: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        segment_size = segment_size or max(1, capacity // 8)
+        if not 0 < segment_size <= capacity:
+            raise ValueError(
+                f"segment_size {segment_size} must be between 1 and capacity {capacity}"
+            )
+        self.capacity = capacity
+        self.segment_size = segment_size
+        self.spill_dir = spill_dir
+        self.run_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        self.total = 0
+        self._first_retained = 0
+        self._tasks = np.empty(capacity, dtype=object)
+        self._outcomes = np.zeros(capacity, dtype=np.int16)
+        self._energies = np.zeros(capacity, dtype=np.float64)
+        self._outcome_names: List[str] = []
+        self._outcome_codes: Dict[str, int] = {}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return self.total - self._first_retained
+
+    def append(self, event: MemoryEvent) -> None:
+        self.extend([event.task], [event.outcome], [event.energy])
+
+    def extend(
+        self,
+        tasks: Sequence[str],
+        outcomes: Sequence[str],
+        energies: Sequence[float],
+    ) -> None:
+        outcome_codes = np.array([self._code(outcome) for outcome in outcomes], dtype=np.int16)
+        energies = np.asarray(energies, dtype=np.float64)
+        written = 0
+        while written < len(outcome_codes):
+            position = self.total % self.capacity
+            if position % self.segment_size == 0 and self.total >= self.capacity:
+                self._evict(position)
+            take = min(
+                len(outcome_codes) - written,
+                self.segment_size - position % self.segment_size,
+                self.capacity - position,
+            )
+            end = position + take
+            self._tasks[position:end] = tasks[written : written + take]
+            self._outcomes[position:end] = outcome_codes[written : written + take]
+            self._energies[position:end] = energies[written : written + take]
+            self.total += take
+            written += take
+
+    def events(self, last_n: Optional[int] = None) -> List[MemoryEvent]:
+        """Return the retained events, oldest first, optionally only the last ``last_n``."""
+        rows = self._window(last_n)
+        return [
+            MemoryEvent(task=task, outcome=self._outcome_names[code], energy=float(energy))
+            for task, code, energy in zip(
+                self._tasks[rows], self._outcomes[rows], self._energies[rows]
+            )
+        ]
+
+    def outcome_counts(self, last_n: Optional[int] = None) -> Dict[str, int]:
+        counts = np.bincount(
+            self._outcomes[self._window(last_n)], minlength=len(self._outcome_names)
+        )
+        return {name: int(count) for name, count in zip(self._outcome_names, counts) if count}
+
+    def mean_energy_by_outcome(self, last_n: Optional[int] = None) -> Dict[str, float]:
+        """Mean energy per expert over the last ``last_n`` events (all retained by default)."""
+        rows = self._window(last_n)
+        codes = self._outcomes[rows]
+        sums = np.bincount(
+            codes, weights=self._energies[rows], minlength=len(self._outcome_names)
+        )
+        counts = np.bincount(codes, minlength=len(self._outcome_names))
+        return {
+            name: float(sums[code] / counts[code])
+            for code, name in enumerate(self._outcome_names)
+            if counts[code]
+        }
+
+    def spilled_events(self) -> Iterator[MemoryEvent]:
+        """Yield the events spilled to disk, oldest first."""
+        if not self.spill_dir:
+            return
+        for name in sorted(os.listdir(self.spill_dir)):
+            if not name.endswith(".npz"):
+                continue
+            with np.load(os.path.join(self.spill_dir, name)) as segment:
+                for task, outcome, energy in zip(
+                    segment["tasks"], segment["outcomes"], segment["energies"]
+                ):
+                    yield MemoryEvent(task=str(task), outcome=str(outcome), energy=float(energy))
+
+    def _code(self, outcome: str) -> int:
+        code = self._outcome_codes.get(outcome)
+        if code is None:
+            code = self._outcome_codes[outcome] = len(self._outcome_names)
+            self._outcome_names.append(outcome)
+        return code
+
+    def _window(self, last_n: Optional[int]) -> np.ndarray:
+        count = len(self) if last_n is None else min(last_n, len(self))
+        return np.arange(self.total - count, self.total) % self.capacity
+
+    def _evict(self, position: int) -> None:
+        first_seq = self.total - self.capacity
+        length = min(self.segment_size, self.capacity - position)
+        self._first_retained = first_seq + length
+        if not self.spill_dir:
+            return
+        rows = slice(position, position + length)
+        names = np.array(self._outcome_names)
+        path = os.path.join(self.spill_dir, f"segment_{self.run_id}_{first_seq:012d}.npz")
+        # Exclusive create: never replace a segment spilled by another run
+        with open(path, "xb") as f:
+            np.savez(
+                f,
+                tasks=self._tasks[rows].astype(str),
+                outcomes=names[self._outcomes[rows]],
+                energies=self._energies[rows],
+            )
+
+
 # --- 2. THE MUSCLE (Runtime Resolver) ---
+# Candidate experts perturb the current state with Gaussian noise of the given
+# scale, or scale it (Expert_C) when the noise scale is None
+EXPERT_NOISE: Dict[str, Optional[float]] = {
+    "Expert_A (Visual)": 0.1,
+    "Expert_B (Motion)": 0.5,
+    "Expert_C (Physics)": None,
+}
+
+
 class KineticTaskRouter:
-    def __init__(self, kct: KernelControlToken) -> None:
+    def __init__(
+        self,
+        kct: KernelControlToken,
+        seed: Optional[int] = None,
+        verbose: bool = True,
+        memory_capacity: int = 100_000,
+        spill_dir: Optional[str] = None,
+    ) -> None:
         self.kct = kct
-        self.memory_bus: List[MemoryEvent] = []
-        print(f"⚡ [KERNEL] Physics Engine Online. Session: {kct.session_id}")
-        print(f"⚡ [KERNEL] Global Invariant: ΔEnergy <= {kct.entropy_budget}")
+        self.memory_bus = MemoryBus(capacity=memory_capacity, spill_dir=spill_dir)
+        self.rng = np.random.default_rng(seed)
+        self.verbose = verbose
+        self._log(f"⚡ [KERNEL] Physics Engine Online. Session: {kct.session_id}")
+        self._log(f"⚡ [KERNEL] Global Invariant: ΔEnergy <= {kct.entropy_budget}")
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(message)
 
     def _calculate_drift(self, current_state: np.ndarray, proposed_state: np.ndarray) -> float:
         dot_product = np.dot(current_state, proposed_state)
@@ -49,41 +216,102 @@ class KineticTaskRouter:
         cosine = np.clip(cosine, -1.0, 1.0)
         return float(1 - cosine)
 
-    def resolve_and_execute(
-        self, task: TaskOntology, current_vector: np.ndarray
-    ) -> bool:
-        print(f"\n🎯 [CORTEX] Received Task: {task.intent}")
-        time.sleep(0.1)
+    def _candidate_states(self, states: np.ndarray) -> np.ndarray:
+        """Return the proposed states of every expert, shaped (experts, tasks, dim)."""
+        candidates = np.empty((len(EXPERT_NOISE), *states.shape))
+        for index, scale in enumerate(EXPERT_NOISE.values()):
+            if scale is None:
+                np.multiply(states, 0.99, out=candidates[index])
+            else:
+                candidates[index] = self.rng.normal(0, scale, states.shape)
+                candidates[index] += states
+        return candidates
 
-        candidates: Dict[str, np.ndarray] = {
-            "Expert_A (Visual)": np.random.normal(0, 0.1, 768) + current_vector,
-            "Expert_B (Motion)": np.random.normal(0, 0.5, 768) + current_vector,
-            "Expert_C (Physics)": current_vector * 0.99,
-        }
+    @staticmethod
+    def _batch_drift(states: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Vectorized _calculate_drift between each state and each expert's proposal."""
+        dots = np.einsum("etd,td->et", candidates, states)
+        norms_a = np.linalg.norm(states, axis=1)
+        norms_b = np.linalg.norm(candidates, axis=2)
+        tiny = np.finfo(float).tiny
+        degenerate = (norms_a <= tiny) | (norms_b <= tiny)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cosine = np.clip(dots / (norms_a * norms_b), -1.0, 1.0)
+        return np.where(degenerate, 1.0, 1 - cosine)
 
-        print("   ... Simulating outcomes across Eigen-manifold ...")
+    def resolve_batch(
+        self,
+        tasks: Sequence[TaskOntology],
+        states: np.ndarray,
+        chunk_size: int = 1024,
+    ) -> np.ndarray:
+        """Route every task against its row of ``states``.
 
-        best_fit = None
-        lowest_energy = float("inf")
+        Drifts of all experts for a chunk of tasks are computed in one
+        vectorized pass; ``chunk_size`` bounds the memory held by the
+        candidate states. Accepted tasks are appended to the memory bus.
 
-        for expert_id, vector in candidates.items():
-            drift = self._calculate_drift(current_vector, vector)
-            print(f"   > {expert_id}: Drift = {drift:.4f} (Budget: {task.energy_budget})")
+        Returns:
+            Boolean array, True where an expert met the task's energy budget.
+        """
+        states = np.asarray(states, dtype=float)
+        if states.ndim != 2 or len(states) != len(tasks):
+            raise ValueError(
+                f"Expected a ({len(tasks)}, dim) state matrix, got {states.shape}"
+            )
+        expert_ids = list(EXPERT_NOISE)
+        budgets = np.array([task.energy_budget for task in tasks], dtype=float)
+        accepted = np.zeros(len(tasks), dtype=bool)
 
-            if drift <= task.energy_budget and drift < lowest_energy:
-                lowest_energy = drift
-                best_fit = expert_id
+        for start in range(0, len(tasks), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            drifts = self._batch_drift(states[chunk], self._candidate_states(states[chunk]))
+            within_budget = np.where(drifts <= budgets[chunk], drifts, np.inf)
+            # argmin keeps the first expert on ties, like the strict < of the scalar loop
+            best = np.argmin(within_budget, axis=0)
+            lowest = within_budget[best, np.arange(len(best))]
+            accepted[chunk] = np.isfinite(lowest)
 
-        if best_fit:
-            print(f"✅ [ACTUATOR] COMMITTING to {best_fit}")
-            print(f"   Physics Validated. Energy Cost: {lowest_energy:.4f}")
-            self.memory_bus.append(
-                MemoryEvent(task=task.intent, outcome=best_fit, energy=lowest_energy)
+            if self.verbose:
+                for offset, task in enumerate(tasks[chunk]):
+                    self._trace(
+                        task,
+                        expert_ids,
+                        drifts[:, offset],
+                        expert_ids[best[offset]],
+                        float(lowest[offset]),
+                    )
+            hits = np.flatnonzero(accepted[chunk])
+            self.memory_bus.extend(
+                [tasks[start + offset].intent for offset in hits],
+                [expert_ids[code] for code in best[hits]],
+                lowest[hits],
             )
-            return True
 
-        print("🛑 [KERNEL] REJECTION. All paths violate Lyapunov constraints.")
-        return False
+        return accepted
+
+    def _trace(
+        self,
+        task: TaskOntology,
+        expert_ids: List[str],
+        drifts: np.ndarray,
+        best_fit: str,
+        energy: float,
+    ) -> None:
+        print(f"\n🎯 [CORTEX] Received Task: {task.intent}")
+        print("   ... Simulating outcomes across Eigen-manifold ...")
+        for expert_id, drift in zip(expert_ids, drifts):
+            print(f"   > {expert_id}: Drift = {drift:.4f} (Budget: {task.energy_budget})")
+        if np.isfinite(energy):
+            print(f"✅ [ACTUATOR] COMMITTING to {best_fit}")
+            print(f"   Physics Validated. Energy Cost: {energy:.4f}")
+        else:
+            print("🛑 [KERNEL] REJECTION. All paths violate Lyapunov constraints.")
+
+    def resolve_and_execute(
+        self, task: TaskOntology, current_vector: np.ndarray
+    ) -> bool:
+        return bool(self.resolve_batch([task], np.asarray(current_vector)[np.newaxis])[0])
 
 
 # --- 3. THE IGNITION (Main Loop) ---
@@ -96,7 +324,7 @@ def ignite_runtime() -> None:
 
     engine = KineticTaskRouter(genesis_kct)
 
-    current_eigenstate = np.random.rand(768)
+    current_eigenstate = engine.rng.random(768)
 
     mission_1 = TaskOntology(
         intent="Generate visual overlay for Sector 7",
@@ -17,6 +17,7 @@ import pathlib
 import pytest
 
 from agent_starter_pack.cli.utils.template import (
+    apply_conditional_files,
     copy_flat_structure_agent_files,
     validate_agent_directory_name,
 )
@@ -223,5 +224,55 @@ class TestCopyFlatStructureAgentFiles:
         assert (dst / "new_agent" / "agent.py").exists()
 
 
+class TestApplyConditionalFiles:
+    """Tests for the apply_conditional_files function."""
+
+    def _make_session_pool(self, tmp_path: pathlib.Path) -> pathlib.Path:
+        app_utils = tmp_path / "app" / "app_utils"
+        app_utils.mkdir(parents=True)
+        session_pool = app_utils / "session_pool.py"
+        session_pool.write_text("# pool", encoding="utf-8")
+        return session_pool
+
+    def test_session_pool_kept_for_cloud_sql(self, tmp_path: pathlib.Path) -> None:
+        """Test that session_pool.py is kept for ADK apps with Cloud SQL sessions."""
+        session_pool = self._make_session_pool(tmp_path)
+        apply_conditional_files(
+            tmp_path, {"session_type": "cloud_sql", "is_adk": True}, "app"
+        )
+        assert session_pool.exists()
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            {"session_type": "in_memory", "is_adk": True},
+            {"session_type": "cloud_sql", "is_adk": True, "is_a2a": True},
+            {"session_type": "", "is_adk": True},
+        ],
+    )
+    def test_session_pool_removed_otherwise(
+        self, tmp_path: pathlib.Path, config: dict
+    ) -> None:
+        """Test that session_pool.py is renamed for non-Cloud SQL sessions."""
+        session_pool = self._make_session_pool(tmp_path)
+        apply_conditional_files(tmp_path, config, "app")
+        assert not session_pool.exists()
+        assert (session_pool.parent / "unused_session_pool.py").exists()
+
+    def test_session_cache_removed_for_non_adk(self, tmp_path: pathlib.Path) -> None:
+        """Test that the ADK session cache and its tests are dropped for LangGraph."""
+        app_utils = tmp_path / "app" / "app_utils"
+        app_utils.mkdir(parents=True)
+        (app_utils / "session_cache.py").write_text("# cache", encoding="utf-8")
+        tests_dir = tmp_path / "tests" / "unit"
+        tests_dir.mkdir(parents=True)
+        (tests_dir / "test_session_cache.py").write_text("# test", encoding="utf-8")
+
+        apply_conditional_files(tmp_path, {"agent_name": "langgraph"}, "app")
+
+        assert not (app_utils / "session_cache.py").exists()
+        assert not (tests_dir / "test_session_cache.py").exists()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Sequence
+
+import pytest
+
+from agent_starter_pack.runtime.audit_ledgers import (
+    AuditRecord,
+    BufferedAuditLedger,
+    JsonlAuditSink,
+    RingBufferAuditSink,
+    SQLiteAuditSink,
+)
+from agent_starter_pack.runtime.kinetic_resolver import TaskOntology
+
+TASK = TaskOntology(intent="route", required_capabilities=["search"], energy_budget=0.5)
+
+
+class BatchRecordingSink(JsonlAuditSink):
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.batch_sizes: list[int] = []
+
+    def write_batch(self, records: Sequence[AuditRecord]) -> None:
+        self.batch_sizes.append(len(records))
+        super().write_batch(records)
+
+
+def test_jsonl_ledger_group_commits_and_flushes_on_close(tmp_path) -> None:
+    path = tmp_path / "audit" / "ledger.jsonl"
+    sink = BatchRecordingSink(str(path))
+
+    with BufferedAuditLedger(sink, max_batch=64, flush_interval=0.5) as ledger:
+        for i in range(200):
+            ledger.record(TASK, "SUCCESS", i / 1000)
+        ledger.record(TASK, "BLOCKED", None)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 201
+    assert [line["energy_cost"] for line in lines[:3]] == pytest.approx(
+        [0.0, 0.001, 0.002]
+    )
+    assert lines[-1]["verdict"] == "BLOCKED"
+    assert lines[-1]["energy_cost"] is None
+    assert sum(sink.batch_sizes) == 201
+    assert max(sink.batch_sizes) <= 64
+    assert len(sink.batch_sizes) < 201
+
+
+def test_sqlite_ledger_writes_rows_in_wal_mode(tmp_path) -> None:
+    path = str(tmp_path / "ledger.db")
+    ledger = BufferedAuditLedger(SQLiteAuditSink(path))
+    for _ in range(10):
+        ledger.record(TASK, "SUCCESS", 0.25)
+    ledger.flush()
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        rows = connection.execute(
+            "SELECT intent, required_capabilities, verdict, energy_cost FROM audit_log"
+        ).fetchall()
+    ledger.close()
+
+    assert rows == [("route", '["search"]', "SUCCESS", 0.25)] * 10
+
+
+def test_sqlite_sink_adds_expert_id_to_existing_ledgers(tmp_path) -> None:
+    path = str(tmp_path / "ledger.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE audit_log ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, "
+            "intent TEXT NOT NULL, required_capabilities TEXT NOT NULL, "
+            "energy_budget REAL NOT NULL, verdict TEXT NOT NULL, energy_cost REAL)"
+        )
+    connection.close()
+
+    with BufferedAuditLedger(SQLiteAuditSink(path)) as ledger:
+        ledger.record(TASK, "SUCCESS", 0.25, expert_id="expert_a")
+
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute("SELECT verdict, expert_id FROM audit_log").fetchall()
+    connection.close()
+
+    assert rows == [("SUCCESS", "expert_a")]
+
+
+def test_ring_buffer_keeps_most_recent_records() -> None:
+    sink = RingBufferAuditSink(capacity=5)
+
+    with BufferedAuditLedger(sink) as ledger:
+        for i in range(12):
+            ledger.record(TASK, "SUCCESS", float(i))
+
+    assert [record.energy_cost for record in sink.records()] == [
+        7.0,
+        8.0,
+        9.0,
+        10.0,
+        11.0,
+    ]
+
+
+def test_record_drops_instead_of_blocking_when_queue_is_full() -> None:
+    release = threading.Event()
+
+    class BlockedSink(RingBufferAuditSink):
+        def write_batch(self, records: Sequence[AuditRecord]) -> None:
+            release.wait(5)
+            super().write_batch(records)
+
+    sink = BlockedSink()
+    ledger = BufferedAuditLedger(sink, max_pending=4, max_batch=1, flush_interval=0)
+    for i in range(20):
+        ledger.record(TASK, "SUCCESS", float(i))
+    assert ledger.dropped > 0
+
+    release.set()
+    ledger.close()
+    assert len(sink.records()) + ledger.dropped == 20
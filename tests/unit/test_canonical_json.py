@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import random
+
+import pytest
+
+from agent_starter_pack.utils.canonical_json import (
+    canonicalize,
+    format_number,
+    iter_canonical,
+)
+
+# Input and output of the example in RFC 8785, section 3.2.2
+RFC_INPUT = r"""{
+  "numbers": [333333333.33333329, 1E30, 4.50, 2e-3, 0.000000000000000000000000001],
+  "string": "\u20ac$\u000F\u000aA'\u0042\u0022\u005c\\\"\/",
+  "literals": [null, true, false]
+}"""
+RFC_OUTPUT = (
+    '{"literals":[null,true,false],'
+    '"numbers":[333333333.3333333,1e+30,4.5,0.002,1e-27],'
+    '"string":"€$\\u000f\\nA\'B\\"\\\\\\\\\\"/"}'
+)
+
+
+def test_rfc_8785_example() -> None:
+    payload = json.loads(RFC_INPUT)
+
+    assert canonicalize(payload) == RFC_OUTPUT
+    assert "".join(iter_canonical(payload)) == RFC_OUTPUT
+
+
+def test_members_are_sorted_by_utf16_code_units() -> None:
+    # RFC 8785, section 3.2.3
+    payload = {
+        "\u20ac": "Euro Sign",
+        "\r": "Carriage Return",
+        "\ufb33": "Hebrew Letter Dalet With Dagesh",
+        "1": "One",
+        "\U0001f600": "Emoji: Grinning Face",
+        "\u0080": "Control",
+        "\u00f6": "Latin Small Letter O With Diaeresis",
+    }
+
+    keys = list(json.loads(canonicalize(payload)))
+
+    assert keys == ["\r", "1", "\u0080", "\u00f6", "\u20ac", "\U0001f600", "\ufb33"]
+    assert "".join(iter_canonical([payload] * 300)) == canonicalize([payload] * 300)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (0.0, "0"),
+        (-0.0, "0"),
+        (2.0, "2"),
+        (-1.5, "-1.5"),
+        (1e21, "1e+21"),
+        (1e20, "100000000000000000000"),
+        (1e-6, "0.000001"),
+        (1e-7, "1e-7"),
+        (1.5e-7, "1.5e-7"),
+        (123456789012345680000.0, "123456789012345680000"),
+        (5e-324, "5e-324"),
+        (1.7976931348623157e308, "1.7976931348623157e+308"),
+        (2**53 - 1, "9007199254740991"),
+        (2**60, "1152921504606847000"),
+        (True, "true"),
+    ],
+)
+def test_numbers_use_ecmascript_formatting(value: float, expected: str) -> None:
+    if isinstance(value, bool):
+        assert canonicalize(value) == expected
+        return
+    assert format_number(value) == expected
+    assert canonicalize([value]) == f"[{expected}]"
+    assert canonicalize({"n": value}) == f'{{"n":{expected}}}'
+
+
+def test_number_fixups_skip_look_alikes_inside_strings() -> None:
+    payload = {"a:1e+16,": "x,2.0]", "b": [1e16, "1.0", 3.0], "c": 10**17}
+
+    assert canonicalize(payload) == (
+        '{"a:1e+16,":"x,2.0]","b":[10000000000000000,"1.0",3],"c":100000000000000000}'
+    )
+
+
+@pytest.mark.parametrize(
+    ("payload", "expected"),
+    [
+        (
+            {"q": 'say "1.0"', "n": [1.0, 2**60]},
+            '{"n":[1,1152921504606847000],"q":"say \\"1.0\\""}',
+        ),
+        ({"10": 1.5e-7, "9": "-1e+30,"}, '{"10":1.5e-7,"9":"-1e+30,"}'),
+        ({10: "a", 9: "b", -1: "c"}, '{"-1":"c","10":"a","9":"b"}'),
+        (
+            {"id": 10**20, "x": ",1234567890123456789]"},
+            '{"id":100000000000000000000,"x":",1234567890123456789]"}',
+        ),
+    ],
+)
+def test_fast_path_screens_its_text(payload: object, expected: str) -> None:
+    assert canonicalize(payload) == expected
+    assert "".join(iter_canonical(payload)) == expected
+
+
+def test_streamed_pieces_match_canonicalize() -> None:
+    rng = random.Random(0)
+    scalars = [None, True, 1, 2.0, 0.1, 1e-9, -(2**60), "é", "\U0001f600"]
+    payload = {
+        "rows": [
+            {"id": i, "value": rng.choice(scalars), "tags": rng.sample(scalars, 3)}
+            for i in range(2_000)
+        ],
+        1: {str(i): rng.choice(scalars) for i in range(200)},
+        "nested": [[[rng.choice(scalars)] * 80] * 3] * 3,
+    }
+
+    assert "".join(iter_canonical(payload)) == canonicalize(payload)
+
+
+@pytest.mark.parametrize(
+    ("payload", "error"),
+    [
+        ([float("nan")], ValueError),
+        ({"a": float("inf")}, ValueError),
+        ([2**1100], ValueError),
+        ({"a": object()}, TypeError),
+        ({(1, 2): 1}, TypeError),
+    ],
+)
+def test_invalid_payloads_raise(payload: object, error: type[Exception]) -> None:
+    with pytest.raises(error):
+        canonicalize(payload)
+    with pytest.raises(error):
+        "".join(iter_canonical(payload))
+
+
+def test_circular_references_raise_value_error() -> None:
+    circular: dict[str, object] = {"a": 1}
+    circular["self"] = circular
+
+    with pytest.raises(ValueError, match="Circular"):
+        canonicalize(circular)
@@ -0,0 +1,79 @@
+"""Tests for the sharded datastore export used by the data ingestion pipeline."""
+
+import gzip
+import json
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def export_batches() -> Callable[..., list[str]]:
+    from agent_starter_pack.data_ingestion.data_ingestion_pipeline.components import (
+        datastore_export,
+    )
+
+    return datastore_export.export_batches
+
+
+def _batches(rows: int, batch_size: int) -> list[Any]:
+    table = pa.table(
+        {
+            "id": [f"q{i}__0" for i in range(rows)],
+            "json_data": [json.dumps({"id": f"q{i}__0"}) for i in range(rows)],
+        }
+    )
+    return table.to_batches(max_chunksize=batch_size)
+
+
+def test_jsonl_export_splits_rows_into_shards(tmp_path, export_batches) -> None:
+    prefix = f"file://{tmp_path}/export/output_files"
+    shards = export_batches(_batches(25, 7), prefix, max_rows_per_shard=10)
+
+    assert [shard.rsplit("/", 1)[1] for shard in shards] == [
+        "output_files000000000000.jsonl",
+        "output_files000000000001.jsonl",
+        "output_files000000000002.jsonl",
+    ]
+    lines = [
+        json.loads(line)
+        for shard in shards
+        for line in (tmp_path / "export" / shard.rsplit("/", 1)[1])
+        .read_text(encoding="utf-8")
+        .splitlines()
+    ]
+    assert [line["id"] for line in lines] == [f"q{i}__0" for i in range(25)]
+    assert json.loads(lines[3]["json_data"]) == {"id": "q3__0"}
+
+
+def test_compressed_jsonl_and_parquet_exports(tmp_path, export_batches) -> None:
+    import pyarrow.parquet as pq
+
+    gz_shards = export_batches(
+        _batches(5, 2), str(tmp_path / "gz" / "part-"), compression="gzip"
+    )
+    assert gz_shards == [str(tmp_path / "gz" / "part-000000000000.jsonl.gz")]
+    with gzip.open(gz_shards[0], "rt", encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 5
+
+    parquet_shards = export_batches(
+        _batches(5, 2),
+        str(tmp_path / "pq" / "part-"),
+        file_format="parquet",
+        compression="zstd",
+        max_rows_per_shard=3,
+    )
+    assert len(parquet_shards) == 2
+    assert sum(pq.read_table(shard).num_rows for shard in parquet_shards) == 5
+
+
+def test_empty_export_still_writes_one_shard(tmp_path, export_batches) -> None:
+    shards = export_batches([], str(tmp_path / "empty-"))
+
+    assert shards == [str(tmp_path / "empty-000000000000.jsonl")]
+    assert (tmp_path / "empty-000000000000.jsonl").read_text(encoding="utf-8") == ""
+    with pytest.raises(ValueError):
+        export_batches([], str(tmp_path / "bad-"), file_format="csv")
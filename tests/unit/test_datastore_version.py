@@ -0,0 +1,19 @@
+"""Tests for the datastore version marker published by ingest_data."""
+
+from datetime import datetime
+
+from agent_starter_pack.data_ingestion.data_ingestion_pipeline.components.datastore_version import (
+    publish_datastore_version,
+)
+
+
+def test_publishes_a_new_version_to_a_local_file(tmp_path) -> None:
+    marker = tmp_path / "datastore_version"
+
+    first = publish_datastore_version(str(marker))
+    assert marker.read_text(encoding="utf-8") == first
+    assert datetime.fromisoformat(first).tzinfo is not None
+
+    second = publish_datastore_version(str(marker))
+    assert marker.read_text(encoding="utf-8") == second
+    assert second >= first
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import yaml
+
+from agent_starter_pack.resources.cie_v1.sovereign.replay_court_reconstruction import (
+    main,
+    verify_fossil,
+    verify_fossil_directory,
+)
+from agent_starter_pack.utils.canonical_json import canonicalize
+
+
+def _write_fossil(path: Path, artifact: dict, *, tamper: bool = False) -> None:
+    digest = hashlib.sha256(canonicalize(artifact).encode()).hexdigest()
+    if tamper:
+        artifact = {**artifact, "verdict": "TAMPERED"}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump({**artifact, "digest": digest}), encoding="utf-8")
+
+
+def _build_fossils(directory: Path) -> None:
+    for i in range(10):
+        _write_fossil(
+            directory / f"batch{i % 2}" / f"fossil{i}.yaml",
+            {"id": i, "verdict": "PASS", "score": i / 4, "note": "clé"},
+        )
+    _write_fossil(directory / "tampered.yml", {"id": 99}, tamper=True)
+    (directory / "no_digest.yaml").write_text("id: 1\n", encoding="utf-8")
+    (directory / "broken.yaml").write_text("id: [1, 2\n", encoding="utf-8")
+    (directory / "README.md").write_text("not a fossil\n", encoding="utf-8")
+
+
+def _failures(results) -> set[str]:
+    return {Path(r.path).name for r in results if not r.verified}
+
+
+def test_directory_verification_reports_failures_and_caches(tmp_path) -> None:
+    fossils = tmp_path / "fossils"
+    cache = str(tmp_path / "cache" / "verified.json")
+    _build_fossils(fossils)
+
+    first = list(verify_fossil_directory(str(fossils), cache_path=cache, max_workers=1))
+
+    assert len(first) == 13
+    assert _failures(first) == {"tampered.yml", "no_digest.yaml", "broken.yaml"}
+    assert not any(r.cached for r in first)
+    tampered = next(r for r in first if r.path.endswith("tampered.yml"))
+    assert tampered.provided_digest != tampered.computed_digest
+    assert verify_fossil(str(fossils / "batch0" / "fossil0.yaml"))
+    assert not verify_fossil(tampered.path)
+
+    # Only the edited file and the failures are parsed again
+    _write_fossil(fossils / "batch1" / "fossil1.yaml", {"id": 1}, tamper=True)
+    second = list(
+        verify_fossil_directory(str(fossils), cache_path=cache, max_workers=1)
+    )
+
+    assert sum(r.cached for r in second) == 9
+    assert _failures(second) == _failures(first) | {"fossil1.yaml"}
+
+
+def test_process_pool_matches_inline_verification(tmp_path, capsys) -> None:
+    _build_fossils(tmp_path)
+
+    inline = list(verify_fossil_directory(str(tmp_path), max_workers=1))
+    pooled = list(verify_fossil_directory(str(tmp_path), max_workers=2, group_size=3))
+
+    assert pooled == inline
+    assert main([str(tmp_path), "--workers", "1"]) == 1
+    output = capsys.readouterr().out
+    assert output.count("MISMATCH") == 3
+    assert "10 verified, 0 unchanged since last run, 3 failed" in output
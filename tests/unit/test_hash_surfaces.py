@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import random
+
+import pytest
+
+from agent_starter_pack.utils.canonical_json import canonicalize
+from agent_starter_pack.utils.hash_surfaces import HashSurfaces
+
+
+def _expected(payload: object) -> tuple[str, str]:
+    canonical = payload if isinstance(payload, str) else canonicalize(payload)
+    return canonical, hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _random_payload(rng: random.Random, depth: int = 0) -> object:
+    # Sizes straddle the streaming threshold at every level, with at most
+    # 200 * 70 * 70 scalars in total
+    size = rng.choice([0, 3, 200] if depth == 0 else [1, 5, 70])
+    kind = rng.random()
+    if depth < 3 and kind < 0.3:
+        keys = rng.choices(["a", "b", "ключ", "z"], k=size)
+        return {
+            f"{key}{i}": _random_payload(rng, depth + 1) for i, key in enumerate(keys)
+        }
+    if depth < 3 and kind < 0.6:
+        return [_random_payload(rng, depth + 1) for _ in range(size)]
+    return rng.choice([None, True, 1.5, -7, "text é \U0001f600", 10**30])
+
+
+def test_streamed_hash_matches_canonical_json() -> None:
+    rng = random.Random(0)
+    payloads = [_random_payload(rng) for _ in range(20)]
+    # Non-string keys are coerced to strings before they are sorted
+    payloads.append({i: [()] for i in range(100, 0, -1)})
+    payloads.append({i / 4: None for i in range(100)})
+    payloads.append({True: 1, False: 0})
+    payloads.append({"rows": [{"id": i, "tags": ["x"] * 3} for i in range(20_000)]})
+
+    for payload in payloads:
+        canonical, digest = _expected(payload)
+        streamed = HashSurfaces.from_payload(payload, retain_preimage=False)
+        retained = HashSurfaces.from_payload(payload)
+
+        assert streamed.sha256 == retained.sha256 == digest
+        assert streamed.preimage is None
+        assert retained.preimage == canonical
+        assert streamed.as_dict() == {"sha256": digest}
+
+
+def test_str_and_bytes_preimages() -> None:
+    text = "é" * 100_000
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    assert HashSurfaces.from_payload(text).as_dict() == {
+        "preimage": text,
+        "sha256": digest,
+    }
+    assert (
+        HashSurfaces.from_payload(text.encode("utf-8"), retain_preimage=False).sha256
+        == digest
+    )
+    with pytest.raises(ValueError, match="valid UTF-8"):
+        HashSurfaces.from_payload(b"\xff" * 10, retain_preimage=False)
+
+
+def test_unserializable_and_circular_payloads_raise_value_error() -> None:
+    circular: list[object] = list(range(100))
+    circular.append(circular)
+
+    for payload in ({"a": object()}, circular):
+        for retain_preimage in (True, False):
+            with pytest.raises(ValueError):
+                HashSurfaces.from_payload(payload, retain_preimage=retain_preimage)
+
+
+def test_from_payloads_preserves_order() -> None:
+    payloads = [{"n": i} for i in range(300)]
+
+    surfaces = HashSurfaces.from_payloads(payloads, max_workers=4, group_size=7)
+
+    assert [s.sha256 for s in surfaces] == [_expected(p)[1] for p in payloads]
+    assert all(s.preimage is None for s in surfaces)
@@ -1,17 +1,25 @@
 import math
 
 import numpy as np
+import pytest
 
-from init_runtime import KernelControlToken, KineticTaskRouter
+from init_runtime import (
+    KernelControlToken,
+    KineticTaskRouter,
+    MemoryBus,
+    MemoryEvent,
+    TaskOntology,
+)
 
 
-def _build_router() -> KineticTaskRouter:
+def _build_router(**kwargs) -> KineticTaskRouter:
     return KineticTaskRouter(
         KernelControlToken(
             session_id="TEST_SESSION",
             entropy_budget=0.05,
             physics_tags={"gravity": 1.0},
-        )
+        ),
+        **kwargs,
     )
 
 
@@ -42,3 +50,138 @@ def test_calculate_drift_remains_finite_for_tiny_nonzero_vectors() -> None:
 
     assert math.isfinite(drift)
     assert 0.0 <= drift <= 2.0
+
+
+def test_batch_drift_matches_scalar_drift() -> None:
+    router = _build_router(seed=0, verbose=False)
+    states = router.rng.normal(size=(5, 16))
+    states[0] = 0.0
+    candidates = router._candidate_states(states)
+
+    drifts = router._batch_drift(states, candidates)
+
+    for expert in range(candidates.shape[0]):
+        for task in range(len(states)):
+            assert drifts[expert, task] == pytest.approx(
+                router._calculate_drift(states[task], candidates[expert, task])
+            )
+
+
+def test_resolve_batch_is_reproducible_and_quiet(capsys) -> None:
+    tasks = [
+        TaskOntology(intent=f"task {i}", required_capabilities=[], energy_budget=budget)
+        for i, budget in enumerate([0.04, 0.01, -1.0, 0.5] * 250)
+    ]
+    states = np.random.default_rng(1).random((len(tasks), 768))
+
+    first = _build_router(seed=42, verbose=False)
+    second = _build_router(seed=42, verbose=False)
+    accepted = first.resolve_batch(tasks, states, chunk_size=128)
+
+    assert np.array_equal(accepted, second.resolve_batch(tasks, states, chunk_size=128))
+    assert first.memory_bus.events() == second.memory_bus.events()
+    assert capsys.readouterr().out == ""
+    # Drift is never negative, so only the negative budget rejects
+    assert accepted.tolist() == [True, True, False, True] * 250
+    assert len(first.memory_bus) == 750
+
+
+def test_resolve_batch_rejects_mismatched_states() -> None:
+    router = _build_router(verbose=False)
+    task = TaskOntology(intent="t", required_capabilities=[], energy_budget=0.1)
+
+    with pytest.raises(ValueError):
+        router.resolve_batch([task, task], np.ones((3, 4)))
+
+
+def test_memory_bus_is_bounded_and_spills_old_segments(tmp_path) -> None:
+    bus = MemoryBus(capacity=8, segment_size=4, spill_dir=str(tmp_path))
+    events = [
+        MemoryEvent(task=f"task {i}", outcome=f"expert {i % 2}", energy=float(i))
+        for i in range(14)
+    ]
+    bus.extend(
+        [e.task for e in events[:5]],
+        [e.outcome for e in events[:5]],
+        [e.energy for e in events[:5]],
+    )
+    for event in events[5:]:
+        bus.append(event)
+
+    # Writing events 8 and 12 evicted the two oldest segments to disk
+    assert len(bus) == 6
+    assert bus.total == 14
+    assert bus.events() == events[8:]
+    assert bus.events(last_n=3) == events[11:]
+    assert list(bus.spilled_events()) == events[:8]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"segment_{bus.run_id}_000000000000.npz",
+        f"segment_{bus.run_id}_000000000004.npz",
+    ]
+
+
+def test_memory_bus_allows_a_shorter_last_segment(tmp_path) -> None:
+    bus = MemoryBus(capacity=10, segment_size=4, spill_dir=str(tmp_path))
+    events = [
+        MemoryEvent(task=f"task {i}", outcome="expert", energy=float(i))
+        for i in range(23)
+    ]
+    bus.extend(
+        [e.task for e in events],
+        [e.outcome for e in events],
+        [e.energy for e in events],
+    )
+
+    # Segments cover rows [0, 4), [4, 8) and the two-row tail [8, 10)
+    assert bus.events() == events[14:]
+    assert list(bus.spilled_events()) == events[:14]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"segment_{bus.run_id}_{first_seq:012d}.npz" for first_seq in (0, 4, 8, 10)
+    ]
+
+
+def test_restarted_bus_keeps_earlier_spilled_segments(tmp_path) -> None:
+    runs = [
+        [
+            MemoryEvent(task=f"run {run} task {i}", outcome="expert", energy=float(i))
+            for i in range(8)
+        ]
+        for run in range(2)
+    ]
+    for events in runs:
+        bus = MemoryBus(capacity=4, segment_size=2, spill_dir=str(tmp_path))
+        bus.extend(
+            [e.task for e in events],
+            [e.outcome for e in events],
+            [e.energy for e in events],
+        )
+
+    # Each run spilled its first four events; the restart overwrote nothing
+    assert list(bus.spilled_events()) == runs[0][:4] + runs[1][:4]
+
+
+def test_router_accepts_capacity_not_divisible_by_default_segments() -> None:
+    router = _build_router(seed=0, verbose=False, memory_capacity=100)
+    tasks = [
+        TaskOntology(intent=f"task {i}", required_capabilities=[], energy_budget=1.0)
+        for i in range(250)
+    ]
+
+    router.resolve_batch(tasks, np.random.default_rng(2).random((len(tasks), 8)))
+
+    assert router.memory_bus.segment_size == 12
+    assert len(router.memory_bus) > 88
+    assert router.memory_bus.events()[-1].task == "task 249"
+
+
+def test_memory_bus_windowed_aggregates() -> None:
+    bus = MemoryBus(capacity=4, segment_size=2)
+    bus.extend(
+        ["a", "b", "c", "d", "e", "f"],
+        ["x", "y", "x", "x", "y", "x"],
+        [100.0, 1.0, 2.0, 4.0, 3.0, 6.0],
+    )
+
+    assert bus.outcome_counts() == {"x": 3, "y": 1}
+    assert bus.mean_energy_by_outcome() == pytest.approx({"x": 4.0, "y": 3.0})
+    assert bus.mean_energy_by_outcome(last_n=2) == pytest.approx({"x": 6.0, "y": 3.0})
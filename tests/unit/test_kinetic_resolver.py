@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
 from collections.abc import Sequence
 
+import numpy as np
 import pytest
 
 from agent_starter_pack.runtime.kinetic_resolver import (
@@ -21,6 +25,22 @@ class RecordingLedger(AuditLedger):
         self.entries.append((task, verdict, energy_cost))
 
 
+class ExpertRecordingLedger(RecordingLedger):
+    def __init__(self) -> None:
+        super().__init__()
+        self.expert_ids: list[str | None] = []
+
+    def record(
+        self,
+        task: TaskOntology,
+        verdict: str,
+        energy_cost: float | None,
+        expert_id: str | None = None,
+    ) -> None:
+        super().record(task, verdict, energy_cost)
+        self.expert_ids.append(expert_id)
+
+
 @pytest.mark.parametrize(
     "registration_order",
     [
@@ -63,3 +83,221 @@ def test_resolve_and_execute_selects_lowest_drift_within_budget(
     assert called == ["low_drift"]
     assert ledger.entries[-1][1] == "SUCCESS"
     assert ledger.entries[-1][2] == pytest.approx(0.0)
+
+
+def _reference_drift(state: Sequence[float], weights: Sequence[float]) -> float:
+    projected = (
+        [a * w for a, w in zip(state, weights, strict=True)]
+        if len(weights) == len(state)
+        else list(state)
+    )
+    dot = sum(a * b for a, b in zip(state, projected, strict=True))
+    norm_start = sum(a * a for a in state) ** 0.5
+    norm_end = sum(b * b for b in projected) ** 0.5
+    if not norm_start or not norm_end:
+        return 1.0
+    return 1.0 - dot / (norm_start * norm_end)
+
+
+def test_score_experts_matches_per_expert_drift() -> None:
+    profiles = [
+        ExpertProfile(expert_id="scaled", weights=[2.0, 2.0, 2.0, 2.0]),
+        ExpertProfile(expert_id="mixed", weights=[0.5, -1.0, 3.0, 0.0]),
+        ExpertProfile(expert_id="zero", weights=[0.0, 0.0, 0.0, 0.0]),
+        ExpertProfile(expert_id="wrong_dim", weights=[1.0, -1.0]),
+    ]
+    resolver = KineticResolver(VectorStore(profiles), RecordingLedger())
+    for expert_id in ["scaled", "mixed", "zero", "wrong_dim", "unknown"]:
+        resolver.register_expert(expert_id, lambda _task: {})
+
+    for state in ([1.0, -2.0, 0.5, 4.0], [0.0, 0.0, 0.0, 0.0]):
+        expert_ids, drifts = resolver.score_experts(state)
+        expected = [
+            _reference_drift(state, resolver.memory.get_expert_profile(e).weights)
+            for e in expert_ids
+        ]
+        assert expert_ids == ["scaled", "mixed", "zero", "wrong_dim", "unknown"]
+        assert list(drifts) == pytest.approx(expected)
+
+
+def test_expert_matrix_is_rebuilt_after_registration() -> None:
+    task = TaskOntology(intent="route", required_capabilities=[], energy_budget=0.5)
+    ledger = RecordingLedger()
+    resolver = KineticResolver(
+        vector_store=VectorStore(
+            [
+                ExpertProfile(expert_id="opposed", weights=[-1.0, -1.0]),
+                ExpertProfile(expert_id="aligned", weights=[1.0, 1.0]),
+            ]
+        ),
+        audit_ledger=ledger,
+    )
+    resolver.register_expert("opposed", lambda _task: {"selected": "opposed"})
+
+    with pytest.raises(RuntimeError):
+        resolver.resolve_and_execute(task, [1.0, 2.0])
+    assert ledger.entries[-1][1:] == ("BLOCKED", None)
+
+    resolver.register_expert("aligned", lambda _task: {"selected": "aligned"})
+
+    assert resolver.resolve_and_execute(task, [1.0, 2.0]) == {"selected": "aligned"}
+
+
+def _clustered_resolver(
+    n_experts: int, ledger: AuditLedger, **ann_options: float
+) -> KineticResolver:
+    rng = np.random.default_rng(7)
+    families = rng.normal(1.0, 0.5, size=(20, 16))
+    weights = families[rng.integers(0, 20, size=n_experts)]
+    weights = weights + rng.normal(0.0, 0.1, size=weights.shape)
+    resolver = KineticResolver(
+        VectorStore(
+            ExpertProfile(expert_id=f"expert_{i}", weights=list(row))
+            for i, row in enumerate(weights)
+        ),
+        ledger,
+        **ann_options,
+    )
+    for i in range(n_experts):
+        resolver.register_expert(f"expert_{i}", lambda _task, i=i: {"selected": i})
+    return resolver
+
+
+def test_ann_prefilter_routes_like_exhaustive_scan() -> None:
+    task = TaskOntology(intent="route", required_capabilities=[], energy_budget=1.0)
+    exhaustive = _clustered_resolver(400, RecordingLedger())
+    ledger = RecordingLedger()
+    prefiltered = _clustered_resolver(
+        400, ledger, ann_min_experts=100, ann_candidates=64
+    )
+    states = np.random.default_rng(8).random((20, 16))
+
+    for state in states:
+        assert prefiltered.resolve_and_execute(task, state) == (
+            exhaustive.resolve_and_execute(task, state)
+        )
+    assert prefiltered._expert_index is not None
+    assert [entry[1] for entry in ledger.entries] == ["SUCCESS"] * 20
+
+
+def test_ann_prefilter_falls_back_when_recall_drops(caplog) -> None:
+    task = TaskOntology(intent="route", required_capabilities=[], energy_budget=1.0)
+    exhaustive = _clustered_resolver(400, RecordingLedger())
+    prefiltered = _clustered_resolver(
+        400,
+        RecordingLedger(),
+        ann_min_experts=100,
+        ann_candidates=1,
+        ann_audit_interval=1,
+        ann_audit_window=5,
+        ann_min_recall=1.0,
+    )
+    states = np.random.default_rng(9).random((20, 16))
+
+    with caplog.at_level(logging.WARNING):
+        for state in states:
+            # Audited tasks return the exhaustive pick, so routing stays exact
+            assert prefiltered.resolve_and_execute(task, state) == (
+                exhaustive.resolve_and_execute(task, state)
+            )
+
+    assert "falling back to exhaustive scoring" in caplog.text
+    assert not prefiltered._ann_enabled()
+
+
+def test_ann_prefilter_follows_state_dimension_changes() -> None:
+    task = TaskOntology(intent="route", required_capabilities=[], energy_budget=1.0)
+    exhaustive = _clustered_resolver(50, RecordingLedger())
+    prefiltered = _clustered_resolver(50, RecordingLedger(), ann_min_experts=10)
+
+    for state in ([0.5] * 8, [0.5] * 4, np.linspace(0.1, 1.6, 16)):
+        assert prefiltered.resolve_and_execute(task, state) == (
+            exhaustive.resolve_and_execute(task, state)
+        )
+
+
+def _racing_resolver(ledger: AuditLedger) -> KineticResolver:
+    return KineticResolver(
+        VectorStore(
+            [
+                ExpertProfile(expert_id="best", weights=[1.0, 1.0]),
+                ExpertProfile(expert_id="second", weights=[1.0, 0.9]),
+                ExpertProfile(expert_id="third", weights=[1.0, 0.5]),
+                ExpertProfile(expert_id="over_budget", weights=[-1.0, -1.0]),
+            ]
+        ),
+        ledger,
+    )
+
+
+def test_aresolve_takes_first_success_and_cancels_the_rest() -> None:
+    task = TaskOntology(intent="route", required_capabilities=[], energy_budget=0.5)
+    ledger = ExpertRecordingLedger()
+    resolver = _racing_resolver(ledger)
+    cancelled: list[str] = []
+
+    def build_expert(expert_id: str, delay: float, fail: bool = False):
+        async def _expert(_task: TaskOntology) -> dict:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(expert_id)
+                raise
+            if fail:
+                raise ConnectionError(expert_id)
+            return {"selected": expert_id}
+
+        return _expert
+
+    resolver.register_expert("best", build_expert("best", 0.0, fail=True))
+    resolver.register_expert("second", build_expert("second", 0.05))
+    resolver.register_expert("third", build_expert("third", 10.0))
+    resolver.register_expert("over_budget", build_expert("over_budget", 0.0))
+
+    result = asyncio.run(resolver.aresolve_and_execute(task, [1.0, 2.0], candidates=3))
+
+    assert result == {"selected": "second"}
+    assert cancelled == ["third"]
+    assert dict(
+        zip(ledger.expert_ids, (e[1] for e in ledger.entries), strict=True)
+    ) == {
+        "best": "FAILED",
+        "second": "SUCCESS",
+        "third": "CANCELLED",
+    }
+
+
+def test_aresolve_times_out_and_runs_sync_experts_in_threads() -> None:
+    task = TaskOntology(intent="route", required_capabilities=[], energy_budget=0.5)
+    ledger = ExpertRecordingLedger()
+    resolver = _racing_resolver(ledger)
+
+    async def slow(_task: TaskOntology) -> dict:
+        await asyncio.sleep(10)
+        return {}
+
+    resolver.register_expert("best", slow)
+    resolver.register_expert("second", lambda _task: time.sleep(0.5) or {})
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(
+            resolver.aresolve_and_execute(task, [1.0, 2.0], candidates=2, timeout=0.05)
+        )
+
+    assert time.monotonic() - started < 5
+    assert [e[1] for e in ledger.entries] == ["TIMEOUT", "TIMEOUT"]
+    assert ledger.expert_ids == ["best", "second"]
+
+
+def test_ledgers_without_expert_id_keep_working() -> None:
+    task = TaskOntology(intent="route", required_capabilities=[], energy_budget=0.5)
+    ledger = RecordingLedger()
+    resolver = _racing_resolver(ledger)
+    resolver.register_expert("best", lambda _task: {"selected": "best"})
+
+    assert resolver.resolve_and_execute(task, [1.0, 2.0]) == {"selected": "best"}
+    assert asyncio.run(resolver.aresolve_and_execute(task, [1.0, 2.0])) == {
+        "selected": "best"
+    }
+    assert [e[1] for e in ledger.entries] == ["SUCCESS", "SUCCESS"]
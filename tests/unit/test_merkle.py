@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import random
+
+import pytest
+
+from agent_starter_pack.resources.cie_v1.domain_swap_protocol import (
+    execute_fossilization,
+    fossilize_batch,
+)
+from agent_starter_pack.utils.merkle import (
+    MerkleAccumulator,
+    MerkleCheckpoint,
+    merkle_root,
+    verify_inclusion,
+)
+
+LEAVES = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(300)]
+
+
+def _node(left: str, right: str) -> str:
+    return hashlib.sha256(b"\x01" + bytes.fromhex(left + right)).hexdigest()
+
+
+def _split(size: int) -> int:
+    k = 1
+    while k * 2 < size:
+        k *= 2
+    return k
+
+
+def _reference_root(leaves: list[str]) -> str:
+    if len(leaves) == 1:
+        return leaves[0]
+    k = _split(len(leaves))
+    return _node(_reference_root(leaves[:k]), _reference_root(leaves[k:]))
+
+
+def _reference_path(index: int, leaves: list[str]) -> list[str]:
+    # PATH(m, D[n]) from RFC 9162, section 2.1.3.1
+    if len(leaves) == 1:
+        return []
+    k = _split(len(leaves))
+    if index < k:
+        return [*_reference_path(index, leaves[:k]), _reference_root(leaves[k:])]
+    return [*_reference_path(index - k, leaves[k:]), _reference_root(leaves[:k])]
+
+
+def test_batches_match_reference_roots_and_proofs(tmp_path) -> None:
+    rng = random.Random(0)
+    checkpoint_path = str(tmp_path / "merkle" / "checkpoint.json")
+    accumulator = MerkleAccumulator()
+    size = 0
+
+    while size < len(LEAVES):
+        batch = LEAVES[size : size + rng.randint(1, 23)]
+        start = accumulator.extend(batch)
+        size = accumulator.size
+        tree = LEAVES[:size]
+        root = _reference_root(tree)
+
+        assert start == size - len(batch)
+        assert accumulator.root() == root
+        for index in range(start, size):
+            proof = accumulator.inclusion_proof(index)
+            assert proof == _reference_path(index, tree)
+            assert verify_inclusion(tree[index], index, size, proof, root)
+
+        commitment = accumulator.commit()
+        assert commitment.root == root
+        assert commitment.batch_root == merkle_root(batch)
+        assert (commitment.start, commitment.tree_size) == (start, size)
+
+        # Resume from a saved checkpoint every few batches
+        if rng.random() < 0.3:
+            accumulator.checkpoint().save(checkpoint_path)
+            accumulator = MerkleAccumulator(MerkleCheckpoint.load(checkpoint_path))
+
+    assert len(accumulator.checkpoint().frontier) == size.bit_length()
+
+
+def test_proofs_and_checkpoints_reject_tampering() -> None:
+    accumulator = MerkleAccumulator()
+    accumulator.extend(LEAVES[:6])
+    proof = accumulator.inclusion_proof(2)
+    root = accumulator.root()
+    assert root is not None
+
+    assert verify_inclusion(LEAVES[2], 2, 6, proof, root)
+    assert not verify_inclusion(LEAVES[3], 2, 6, proof, root)
+    assert not verify_inclusion(LEAVES[2], 3, 6, proof, root)
+    assert not verify_inclusion(LEAVES[2], 2, 6, proof[:-1], root)
+    assert not verify_inclusion(LEAVES[2], 6, 6, proof, root)
+
+    accumulator.commit()
+    with pytest.raises(IndexError):
+        accumulator.inclusion_proof(2)
+    with pytest.raises(ValueError, match="no pending"):
+        accumulator.commit()
+
+    checkpoint = accumulator.checkpoint().as_dict()
+    with pytest.raises(ValueError, match="root"):
+        MerkleAccumulator(MerkleCheckpoint.from_dict({**checkpoint, "root": LEAVES[0]}))
+    with pytest.raises(ValueError, match="tree size"):
+        MerkleAccumulator(MerkleCheckpoint.from_dict({**checkpoint, "tree_size": 7}))
+
+
+def test_fossilize_batch_attaches_verifiable_proofs() -> None:
+    accumulator = MerkleAccumulator()
+    inquiries = [
+        {"customer_id": f"c-{i}", "message": "où est ma commande", "timestamp": i}
+        for i in range(5)
+    ]
+
+    first = fossilize_batch(inquiries[:3], accumulator)
+    second = fossilize_batch(inquiries[3:], accumulator)
+
+    assert [record["leaf_index"] for record in first + second] == [0, 1, 2, 3, 4]
+    assert second[0]["merkle_root"] == accumulator.root()
+    for record in first + second:
+        assert verify_inclusion(
+            record["leaf_digest"],
+            record["leaf_index"],
+            record["tree_size"],
+            record["inclusion_proof"],
+            record["merkle_root"],
+        )
+
+    single = execute_fossilization(inquiries[0])
+    assert single["merkle_root"] == single["leaf_digest"].removeprefix("sha256:")
+    assert execute_fossilization(inquiries[0], accumulator)["leaf_index"] == 5
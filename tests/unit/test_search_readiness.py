@@ -0,0 +1,91 @@
+"""Tests for the Vertex AI Search readiness probing used by ingest_data."""
+
+import json
+
+from agent_starter_pack.data_ingestion.data_ingestion_pipeline.components.search_readiness import (
+    InMemorySearchClient,
+    ProbeDocument,
+    sample_documents,
+    wait_until_searchable,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _client(clock: FakeClock, indexing_delay: float) -> InMemorySearchClient:
+    client = InMemorySearchClient(indexing_delay=indexing_delay, clock=clock)
+    client.add("q1__0", "how to sort a dict by value in python")
+    client.add("q2__0", "reading a csv file with pandas")
+    client.add("q3__0", "asyncio event loop is closed error")
+    return client
+
+
+PROBES = [
+    ProbeDocument(id="q1__0", query="sort a dict by value"),
+    ProbeDocument(id="q2__0", query="reading a csv file with pandas"),
+]
+
+
+def test_returns_once_documents_are_searchable_with_backoff() -> None:
+    clock = FakeClock()
+    client = _client(clock, indexing_delay=20)
+
+    readiness = wait_until_searchable(
+        client, PROBES, initial_delay=5, multiplier=2, sleep=clock.sleep, clock=clock
+    )
+
+    assert readiness.ready
+    assert readiness.found == readiness.total == 2
+    assert clock.sleeps == [5, 10, 20]
+    assert readiness.elapsed == 35
+
+
+def test_gives_up_at_the_deadline() -> None:
+    clock = FakeClock()
+    client = _client(clock, indexing_delay=1000)
+
+    readiness = wait_until_searchable(
+        client, PROBES, timeout=30, initial_delay=10, sleep=clock.sleep, clock=clock
+    )
+
+    assert not readiness.ready
+    assert readiness.found == 0
+    assert readiness.elapsed == 30
+    assert clock.sleeps == [10, 20]
+
+
+def test_sample_documents_reads_exported_jsonl(tmp_path) -> None:
+    for shard, ids in enumerate([["q1__0", "q2__0"], ["q3__0"]]):
+        lines = [
+            json.dumps(
+                {
+                    "id": doc_id,
+                    "json_data": json.dumps(
+                        {"id": doc_id, "content": f"text {doc_id}"}
+                    ),
+                }
+            )
+            for doc_id in ids
+        ]
+        (tmp_path / f"out{shard:012d}.jsonl").write_text(
+            "\n".join(lines) + "\n", encoding="utf-8"
+        )
+
+    documents = sample_documents(str(tmp_path / "out*.jsonl"), sample_size=3)
+
+    assert documents == [
+        ProbeDocument(id="q1__0", query="text q1__0"),
+        ProbeDocument(id="q2__0", query="text q2__0"),
+        ProbeDocument(id="q3__0", query="text q3__0"),
+    ]
@@ -0,0 +1,141 @@
+"""Tests for the parallel Vector Search upsert writer used by ingest_data."""
+
+import threading
+
+import pytest
+
+from agent_starter_pack.data_ingestion.data_ingestion_pipeline.components.vector_search_writer import (
+    Checkpoint,
+    ParallelUpsertWriter,
+    UpsertBatch,
+    make_batches,
+)
+
+
+def _batches(rows: int = 10, batch_size: int = 3) -> list[UpsertBatch]:
+    return list(
+        make_batches(
+            {
+                "question_id": list(range(rows)),
+                "text_chunk": [f"text {i}" for i in range(rows)],
+                "chunk_id": [f"{i}__0" for i in range(rows)],
+                "embedding": [[float(i), 1.0] for i in range(rows)],
+            },
+            batch_size=batch_size,
+            id_column="question_id",
+            text_column="text_chunk",
+            embedding_column="embedding",
+            metadata_columns=["question_id", "chunk_id"],
+        )
+    )
+
+
+def test_make_batches_slices_columns() -> None:
+    batches = _batches()
+
+    assert [len(batch.ids) for batch in batches] == [3, 3, 3, 1]
+    assert batches[1].ids == ["3", "4", "5"]
+    assert batches[1].embeddings[0] == [3.0, 1.0]
+    assert batches[3].metadatas == [{"question_id": 9, "chunk_id": "9__0"}]
+
+
+def test_writer_bounds_concurrency_and_retries_failed_batches() -> None:
+    lock = threading.Lock()
+    in_flight = 0
+    max_seen = 0
+    attempts: dict[int, int] = {}
+    written: list[int] = []
+
+    def upsert(batch: UpsertBatch) -> None:
+        nonlocal in_flight, max_seen
+        with lock:
+            in_flight += 1
+            max_seen = max(max_seen, in_flight)
+            attempts[batch.index] = attempts.get(batch.index, 0) + 1
+            first_attempt = attempts[batch.index] == 1
+        threading.Event().wait(0.01)
+        with lock:
+            in_flight -= 1
+        if batch.index == 2 and first_attempt:
+            raise ConnectionError("transient")
+        with lock:
+            written.append(batch.index)
+
+    writer = ParallelUpsertWriter(upsert, max_in_flight=2, sleep=lambda _: None)
+    result = writer.write(_batches())
+
+    assert result.written == 4
+    assert result.failed == []
+    assert sorted(written) == [0, 1, 2, 3]
+    assert attempts[2] == 2
+    assert max_seen <= 2
+
+
+def test_rerun_resumes_from_checkpoint(tmp_path) -> None:
+    checkpoint_path = str(tmp_path / "checkpoints" / "table.json")
+
+    def flaky_upsert(batch: UpsertBatch) -> None:
+        if batch.index == 1:
+            raise ConnectionError("down")
+
+    first = ParallelUpsertWriter(
+        flaky_upsert,
+        max_attempts=2,
+        checkpoint=Checkpoint(checkpoint_path),
+        sleep=lambda _: None,
+    ).write(_batches())
+    assert first.written == 3
+    assert first.failed == [1]
+
+    rerun_indices: list[int] = []
+    checkpoint = Checkpoint(checkpoint_path)
+    second = ParallelUpsertWriter(
+        lambda batch: rerun_indices.append(batch.index), checkpoint=checkpoint
+    ).write(_batches())
+
+    assert second.skipped == 3
+    assert second.written == 1
+    assert rerun_indices == [1]
+    checkpoint.clear()
+    assert Checkpoint(checkpoint_path).completed == set()
+
+
+class CountingCheckpoint(Checkpoint):
+    def __init__(self, uri: str, *, fail: bool = False) -> None:
+        super().__init__(uri)
+        self.fail = fail
+        self.writes: list[int] = []
+
+    def _write(self, data: str) -> None:
+        if self.fail:
+            raise PermissionError("checkpoint bucket is read-only")
+        self.writes.append(threading.get_ident())
+        super()._write(data)
+
+
+def test_checkpoint_writes_are_coalesced_on_the_calling_thread(tmp_path) -> None:
+    checkpoint = CountingCheckpoint(str(tmp_path / "table.json"))
+
+    result = ParallelUpsertWriter(
+        lambda _batch: None,
+        max_in_flight=2,
+        checkpoint=checkpoint,
+        checkpoint_interval=3600,
+        checkpoint_batches=20,
+    ).write(_batches(rows=100, batch_size=2))
+
+    assert result.written == 50
+    # Two saves forced by the batch count, then the final one
+    assert len(checkpoint.writes) == 3
+    assert set(checkpoint.writes) == {threading.get_ident()}
+    assert len(Checkpoint(checkpoint.uri).completed) == 50
+
+
+def test_checkpoint_write_errors_are_raised(tmp_path) -> None:
+    writer = ParallelUpsertWriter(
+        lambda _batch: None,
+        checkpoint=CountingCheckpoint(str(tmp_path / "table.json"), fail=True),
+    )
+
+    with pytest.raises(PermissionError):
+        writer.write(_batches())